@@ -0,0 +1,34 @@
+"""
+NovaMart Analytics
+=============================================
+Headless KPI computations behind the dashboard pages.
+
+Every function takes DataFrames (plus filter parameters) and returns a
+result table or a dict of scalars. Nothing here imports Streamlit or
+Plotly, so the same code runs in batch jobs and benchmarks.
+"""
+
+from analytics.campaigns import (
+    overview_kpis, monthly_revenue, revenue_by, filter_campaigns, campaign_kpis,
+    campaign_type_performance, daily_performance, channel_matrix, period_comparison, cohort_comparison,
+    rolling_metrics,
+)
+from analytics.customers import (
+    segment_distribution, segment_ltv, nps_distribution, churn_risk_summary, rfm_summary, cluster_profile,
+)
+from analytics.products import category_sales, top_subcategories, top_products, quarterly_sales, product_hierarchy
+from analytics.funnel import (
+    funnel_rates, encode_journeys, journey_attribution, attribution_shares, attribution_by_model, journey_counts,
+)
+from analytics.leads import threshold_sweep, lead_metrics
+
+__all__ = [
+    'overview_kpis', 'monthly_revenue', 'revenue_by', 'filter_campaigns', 'campaign_kpis',
+    'campaign_type_performance', 'daily_performance', 'channel_matrix', 'period_comparison', 'cohort_comparison',
+    'rolling_metrics',
+    'segment_distribution', 'segment_ltv', 'nps_distribution', 'churn_risk_summary', 'rfm_summary', 'cluster_profile',
+    'category_sales', 'top_subcategories', 'top_products', 'quarterly_sales', 'product_hierarchy',
+    'funnel_rates', 'encode_journeys', 'journey_attribution', 'attribution_shares', 'attribution_by_model',
+    'journey_counts',
+    'threshold_sweep', 'lead_metrics',
+]
@@ -0,0 +1,105 @@
+"""Campaign KPIs, answered from the day x channel x type x region rollup"""
+
+import numpy as np
+
+from rollup import totals, rollup_by, rollup_by_month
+from windows import KPIS
+
+
+def overview_kpis(rollup):
+    """Total revenue, conversions and spend-weighted ROAS"""
+    kpis = totals(rollup)
+    return {
+        'revenue': kpis['revenue'],
+        'conversions': int(kpis['conversions']),
+        'roas': kpis['ROAS'],
+    }
+
+
+def monthly_revenue(rollup):
+    """Revenue per calendar month"""
+    return rollup_by_month(rollup)[['date', 'revenue']]
+
+
+def revenue_by(rollup, dimension):
+    """Revenue per value of one dimension, smallest first"""
+    return rollup_by(rollup, dimension)[[dimension, 'revenue']].sort_values('revenue', ascending=True)
+
+
+def filter_campaigns(rollup, channels=None, campaign_types=None, start=None, end=None, index=None):
+    """Rows matching the page filters (isin on each list, inclusive calendar dates)
+
+    Pass a prebuilt FilterIndex over the same rollup as ``index`` to
+    answer the filter from bitmaps instead of scanning.
+    """
+    if index is not None:
+        return index.filter(start, end, channel=channels, campaign_type=campaign_types)
+
+    mask = np.ones(len(rollup), dtype=bool)
+    if channels is not None:
+        mask &= rollup['channel'].isin(channels).to_numpy()
+    if campaign_types is not None:
+        mask &= rollup['campaign_type'].isin(campaign_types).to_numpy()
+    days = rollup['date'].to_numpy().astype('datetime64[D]')
+    if start is not None:
+        mask &= days >= np.datetime64(start, 'D')
+    if end is not None:
+        mask &= days <= np.datetime64(end, 'D')
+    return rollup[mask]
+
+
+def campaign_kpis(rollup):
+    """Total spend and impressions with weighted CTR and CVR (in %)"""
+    kpis = totals(rollup)
+    return {
+        'spend': kpis['spend'],
+        'impressions': kpis['impressions'],
+        'ctr': kpis['CTR'],
+        'cvr': kpis['CVR'],
+    }
+
+
+def campaign_type_performance(rollup):
+    """Spend, revenue, conversions and ROAS per campaign type"""
+    return rollup_by(rollup, 'campaign_type')[['campaign_type', 'spend', 'revenue', 'conversions', 'ROAS']]
+
+
+def daily_performance(rollup):
+    """Spend, revenue and conversions per day"""
+    return rollup_by(rollup, 'date')[['date', 'spend', 'revenue', 'conversions']]
+
+
+def channel_matrix(rollup):
+    """CTR, CVR and ROAS per channel, rounded for display"""
+    matrix = rollup_by(rollup, 'channel').round({'CTR': 2, 'CVR': 2, 'ROAS': 2})
+    return matrix[['channel', 'CTR', 'CVR', 'ROAS']]
+
+
+def period_comparison(windows, days=None, end=None):
+    """KPIs over the last `days` days up to `end` (default: the latest date) with the prior
+    equal-length window and the change in %; all history, with nothing to compare, when days is None"""
+    if days is None:
+        if windows.empty:
+            return {kpi: {'current': np.nan, 'previous': np.nan, 'change': np.nan} for kpi in KPIS}
+        table = windows.window(windows.first, windows.last).iloc[0]
+        return {kpi: {'current': float(table[kpi]), 'previous': np.nan, 'change': np.nan} for kpi in KPIS}
+    start, end = windows.last_days(days, end) or (None, None)
+    table = windows.compare(start, end).set_index('kpi')
+    return {kpi: table.loc[kpi, ['current', 'previous', 'change']].astype(float).to_dict() for kpi in KPIS}
+
+
+def cohort_comparison(windows, days, kpi='revenue', end=None):
+    """One KPI per cohort (the index's dimension) for the last `days` days and the prior window"""
+    start, end = windows.last_days(days, end) or (None, None)
+    table = windows.compare(start, end)
+    table = table[table['kpi'] == kpi].drop(columns='kpi')
+    return table.sort_values('current', ascending=False).reset_index(drop=True)
+
+
+def rolling_metrics(windows, kpi='revenue', days=(7, 28)):
+    """Trailing sums (or ratios) of one KPI for each window length, one column per length"""
+    out = None
+    for length in days:
+        series = windows.rolling(length)[['date', kpi]].rename(columns={kpi: f"{length}-day"})
+        out = series if out is None else out.merge(series, on='date', how='left')
+    return out
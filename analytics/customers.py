@@ -0,0 +1,59 @@
+"""Customer segment, satisfaction and churn statistics"""
+
+
+def segment_distribution(customers):
+    """Number of customers per segment"""
+    counts = customers['customer_segment'].value_counts().reset_index()
+    counts.columns = ['Segment', 'Count']
+    return counts
+
+
+def segment_ltv(customers):
+    """Average lifetime value per segment, smallest first"""
+    return (
+        customers.groupby('customer_segment', observed=True)['lifetime_value']
+        .mean()
+        .sort_values(ascending=True)
+        .reset_index()
+    )
+
+
+def nps_distribution(customers):
+    """Number of customers per NPS category"""
+    counts = customers['nps_category'].value_counts().reset_index()
+    counts.columns = ['NPS Category', 'Count']
+    return counts
+
+
+def churn_risk_summary(customers, risk_col='churn_risk', high='High'):
+    """Customers per churn-risk band, plus stats for the high-risk band"""
+    counts = customers.groupby(risk_col, observed=True).size().reset_index(name='Count')
+    high_risk = customers[customers[risk_col] == high]
+    stats = {
+        'high_risk': len(high_risk),
+        'high_risk_share': len(high_risk) / len(customers) if len(customers) else 0.0,
+        'avg_satisfaction': high_risk['satisfaction_score'].mean(),
+        'avg_support_tickets': high_risk['support_tickets'].mean(),
+    }
+    return counts, stats
+
+
+def rfm_summary(customers):
+    """Customers, average lifetime value and days since last purchase per RFM segment"""
+    return (
+        customers.groupby('rfm_segment', observed=True)
+        .agg(Count=('rfm_segment', 'size'), lifetime_value=('lifetime_value', 'mean'),
+             last_purchase_days=('last_purchase_days', 'mean'))
+        .reset_index()
+    )
+
+
+def cluster_profile(customers):
+    """Size and average RFM values and churn probability of each k-means cluster"""
+    return (
+        customers.groupby('cluster')
+        .agg(Count=('cluster', 'size'), last_purchase_days=('last_purchase_days', 'mean'),
+             total_purchases=('total_purchases', 'mean'), lifetime_value=('lifetime_value', 'mean'),
+             churn_probability=('churn_probability', 'mean'))
+        .reset_index()
+    )
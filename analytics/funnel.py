@@ -0,0 +1,47 @@
+"""Marketing funnel, attribution and customer journey tables"""
+
+import numpy as np
+
+from attribution import MODELS, PathSet
+
+
+def funnel_rates(funnel):
+    """Visitors per stage with overall and step-over-step conversion (in %)"""
+    visitors = funnel['visitors'].to_numpy(dtype='float64')
+    result = funnel[['stage', 'visitors']].copy()
+    top = visitors[0] if len(visitors) else np.nan
+    result['overall_rate'] = visitors / top * 100
+    result['step_rate'] = np.r_[100.0, visitors[1:] / visitors[:-1] * 100] if len(visitors) else []
+    return result
+
+
+def encode_journeys(journey):
+    """Encode the journey table (touchpoint_1..N, customer_count) once for the models below"""
+    return PathSet.from_journey(journey)
+
+
+def journey_attribution(paths, models=MODELS):
+    """Credit per channel (converting customers) under every attribution model"""
+    return paths.attribution(models)
+
+
+def attribution_shares(attribution):
+    """Long table of each channel's share (%) of the credit under each model"""
+    models = [m for m in MODELS if m in attribution.columns]
+    long = attribution.melt(id_vars='channel', value_vars=models, var_name='model', value_name='credit')
+    totals = long.groupby('model', sort=False)['credit'].transform('sum')
+    long['share'] = long['credit'] / totals.where(totals != 0) * 100
+    return long
+
+
+def attribution_by_model(attribution, model):
+    """Channel credit under one attribution model, smallest first"""
+    return attribution[['channel', model]].sort_values(model, ascending=True)
+
+
+def journey_counts(paths, top=8):
+    """The most common journey paths, weighted by customer count"""
+    counts = paths.top_paths(top)
+    counts['count'] = counts['count'].astype('int64')
+    counts.columns = ['Journey Path', 'Count']
+    return counts
@@ -0,0 +1,13 @@
+"""Lead scoring model evaluation"""
+
+from model_metrics import threshold_table, metrics_at
+
+
+def threshold_sweep(leads):
+    """Confusion counts and metrics at every distinct predicted probability"""
+    return threshold_table(leads['actual_converted'], leads['predicted_probability'])
+
+
+def lead_metrics(sweep, threshold=0.5):
+    """Accuracy, precision, recall, F1 and confusion counts at one threshold"""
+    return metrics_at(sweep, threshold)
@@ -0,0 +1,28 @@
+"""Product sales by category, subcategory, product and quarter, answered from the product rollup"""
+
+
+def category_sales(rollup, regions=None, quarters=None):
+    """Total sales per category, smallest first"""
+    return rollup.by('category', regions, quarters)[['category', 'sales']].sort_values('sales', ascending=True)
+
+
+def top_subcategories(rollup, n=10, regions=None, quarters=None):
+    """The n subcategories with the highest total sales"""
+    return rollup.top('subcategory', n, regions=regions, quarters=quarters)[['category', 'subcategory', 'sales']]
+
+
+def top_products(rollup, n=10, regions=None, quarters=None):
+    """The n products with the highest total sales, labelled "name (subcategory)" since names repeat"""
+    top = rollup.top('product_name', n, regions=regions, quarters=quarters)
+    top['product'] = top['product_name'] + ' (' + top['subcategory'] + ')'
+    return top[['category', 'subcategory', 'product_name', 'product', 'sales', 'units_sold', 'profit_margin']]
+
+
+def quarterly_sales(rollup, regions=None):
+    """Total sales per quarter, in calendar order"""
+    return rollup.by_quarter(regions)[['quarter', 'sales']]
+
+
+def product_hierarchy(rollup, top=10, regions=None, quarters=None):
+    """Treemap nodes: categories, subcategories and the top products of each subcategory"""
+    return rollup.hierarchy(top, regions, quarters)
@@ -15,10 +15,86 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from sklearn.metrics import confusion_matrix, roc_curve, auc
+import logging
+import os
+import threading
 import warnings
+from data_store import PAGE_TABLES, dataset_version
+from filter_engine import FilterIndex
+from figure_cache import FigureCache, figure_size
+from profiler import Profiler
+from page_tasks import ChartTasks, make_pool
+from ingest import CampaignIngestor
+from schema import memory_by_column
+from downsample import SCATTER_MODES, bin_2d, density_sample, lttb_frame
+from distributions import box_stats, histogram
+from geo_grid import DETAIL_LEVELS, cell_km, map_zoom
+from page_data import CHURN_BANDS, build_page_data, campaign_windows
+from snapshot import load_or_build
+from windows import PERIODS
+from correlation import strongest_pairs
+from model_metrics import confusion, roc_points, roc_auc, pr_points, average_precision
+from analytics import (
+    monthly_revenue, revenue_by, filter_campaigns, campaign_kpis,
+    campaign_type_performance, daily_performance, channel_matrix, period_comparison, cohort_comparison,
+    rolling_metrics, churn_risk_summary, rfm_summary, cluster_profile,
+    category_sales, top_subcategories, top_products, quarterly_sales, product_hierarchy,
+    funnel_rates, attribution_shares, attribution_by_model, journey_counts,
+    lead_metrics,
+)
 warnings.filterwarnings('ignore')
 
+# Storage backend: 'parquet' (default) or 'csv'
+DATA_BACKEND = os.environ.get('NOVAMART_DATA_BACKEND', 'parquet')
+
+# Memory cap for cached Plotly figures, in MB
+FIGURE_CACHE_MB = int(os.environ.get('NOVAMART_FIGURE_CACHE_MB', '64'))
+
+# Point budgets for downsampled scatters and time series
+POINT_BUDGETS = [1000, 2000, 5000, 10000, 20000, 50000]
+POINT_BUDGET = int(os.environ.get('NOVAMART_POINT_BUDGET', '5000'))
+TIMESERIES_BUDGET = int(os.environ.get('NOVAMART_TIMESERIES_BUDGET', '1000'))
+
+# Incremental ingest: parse only rows appended to campaign_performance.csv
+# (or dropped into incoming/campaigns/) instead of reloading the whole file
+INCREMENTAL = os.environ.get('NOVAMART_INCREMENTAL', '0') == '1'
+
+# Query engine for the campaign and customer aggregations: 'pandas' (in memory),
+# or 'duckdb' / 'polars' to aggregate straight from the files on disk
+QUERY_ENGINE = os.environ.get('NOVAMART_QUERY_ENGINE', 'pandas')
+
+# Page data is loaded once per process and shared read-only by every session.
+# Set NOVAMART_SHARED_DATA=0 to fall back to a pickled copy per session (st.cache_data).
+SHARED_DATA = os.environ.get('NOVAMART_SHARED_DATA', '1') == '1'
+
+# Load every page in a background thread on the first run, before other users arrive
+WARM_UP = os.environ.get('NOVAMART_WARM_UP', '1') == '1'
+
+# Page data is saved as a memory-mapped snapshot under .cache/snapshots/ and mapped back on
+# restart (prebuild with `python snapshot.py`). Set NOVAMART_SNAPSHOTS=0 to always rebuild.
+SNAPSHOTS = os.environ.get('NOVAMART_SNAPSHOTS', '1') == '1'
+
+# Threads that build a page's chart figures concurrently (1 builds them one by one)
+CHART_WORKERS = int(os.environ.get('NOVAMART_CHART_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# Opt-in timing breakdown per run, shown in the sidebar "Performance" expander.
+# NOVAMART_PROFILE_TRACE appends every span to a .jsonl or .csv file;
+# NOVAMART_PROFILE_ALLOC=0 skips allocation tracking (tracemalloc slows the run down)
+PROFILE = os.environ.get('NOVAMART_PROFILE', '0') == '1'
+PROFILE_ALLOC = os.environ.get('NOVAMART_PROFILE_ALLOC', '1') == '1'
+PROFILE_TRACE = os.environ.get('NOVAMART_PROFILE_TRACE')
+
+# The script module is re-executed on every run, so each run gets its own profiler
+PROFILER = Profiler(enabled=PROFILE, allocations=PROFILE_ALLOC, trace_path=PROFILE_TRACE)
+
+# Every figure a page draws is also appended here when set (headless report export, see export.py)
+FIGURE_SINK = None
+
+# Copy-on-write makes the per-session shallow copies of shared frames free
+# (it is always on from pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
 # =============================================================================
 # PAGE CONFIG
 # =============================================================================
@@ -52,30 +128,234 @@ st.markdown("""
 # =============================================================================
 # DATA LOADING (with caching)
 # =============================================================================
-@st.cache_data
-def load_data():
-    """Load all datasets from CSV files"""
-    data = {}
-    
+PAGES = {
+    "🏠 Executive Overview": 'executive_overview',
+    "📈 Campaign Analytics": 'campaign_analytics',
+    "👥 Customer Insights": 'customer_insights',
+    "📦 Product Performance": 'product_performance',
+    "🗺️ Geographic Analysis": 'geographic_analysis',
+    "🎯 Attribution & Funnel": 'attribution_funnel',
+    "🔗 Metric Correlations": 'metric_correlations',
+    "🤖 ML Model Evaluation": 'ml_model_evaluation',
+}
+
+def page_data(page_id, backend, incremental, query_engine):
+    """Page data from its on-disk snapshot when snapshots are on, otherwise built from the tables"""
+    if SNAPSHOTS:
+        return load_or_build(page_id, backend, incremental, query_engine)
+    return build_page_data(page_id, backend, incremental, query_engine)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2 * len(PAGES))
+def shared_page_data(page_id, version, backend=DATA_BACKEND, incremental=INCREMENTAL, query_engine=QUERY_ENGINE):
+    """Process-wide page data, built once per source version and shared read-only by every session"""
+    return page_data(page_id, backend, incremental, query_engine)
+
+
+@st.cache_data(show_spinner="Loading data...", max_entries=2 * len(PAGES))
+def copied_page_data(page_id, version, backend=DATA_BACKEND, incremental=INCREMENTAL, query_engine=QUERY_ENGINE):
+    """Page data pickled into a fresh copy on every call (NOVAMART_SHARED_DATA=0)"""
+    return page_data(page_id, backend, incremental, query_engine)
+
+
+def session_view(shared):
+    """This session's view of shared page data: shallow frame copies, so nothing is duplicated"""
+    # with copy-on-write a write to a session's frame copies it instead of touching the shared one
+    return {key: value.copy(deep=False) if isinstance(value, pd.DataFrame) else value
+            for key, value in shared.items()}
+
+
+def load_data(page_id):
+    """Page data for this session (shared across sessions unless NOVAMART_SHARED_DATA=0)"""
     try:
-        data['campaigns'] = pd.read_csv('campaign_performance.csv', parse_dates=['date'])
-        data['customers'] = pd.read_csv('customer_data.csv')
-        data['products'] = pd.read_csv('product_sales.csv')
-        data['leads'] = pd.read_csv('lead_scoring_results.csv')
-        data['feature_importance'] = pd.read_csv('feature_importance.csv')
-        data['learning_curve'] = pd.read_csv('learning_curve.csv')
-        data['geographic'] = pd.read_csv('geographic_data.csv')
-        data['attribution'] = pd.read_csv('channel_attribution.csv')
-        data['funnel'] = pd.read_csv('funnel_data.csv')
-        data['journey'] = pd.read_csv('customer_journey.csv')
-        data['correlation'] = pd.read_csv('correlation_matrix.csv', index_col=0)
-        
-        return data
+        # keyed by the source files' version, so edited CSVs are picked up on the next run
+        version = dataset_version(PAGE_TABLES[page_id])
+        if SHARED_DATA:
+            return session_view(shared_page_data(page_id, version))
+        return copied_page_data(page_id, version)
     except FileNotFoundError as e:
         st.error(f"❌ Data file not found: {e}")
         st.info("Please ensure all CSV files are in the same directory as app.py")
         return None
 
+
+def warm_up(page_ids=None):
+    """Build the shared data of every page (a failure is logged; the page reports it when opened)"""
+    for page_id in page_ids or PAGES.values():
+        try:
+            shared_page_data(page_id, dataset_version(PAGE_TABLES[page_id]))
+        except Exception:
+            # keep warming the other pages, but leave a trace of the broken one
+            logging.getLogger(__name__).exception("warm-up failed for %s", page_id)
+
+
+@st.cache_resource
+def start_warm_up():
+    """Start warming every page once per process, in the background"""
+    thread = threading.Thread(target=warm_up, name='novamart-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource
+def get_campaign_ingestor():
+    """Process-wide campaign frame and rollup kept current by incremental polls"""
+    return CampaignIngestor()
+
+
+@st.cache_resource(max_entries=2)
+def live_campaign_index(version):
+    """Filter index over the ingested rollup, rebuilt once per ingest version"""
+    return FilterIndex(get_campaign_ingestor().rollup, dimensions=('channel', 'campaign_type'))
+
+
+@st.cache_resource(max_entries=2)
+def live_campaign_windows(version):
+    """Window indexes over the ingested rollup, rebuilt once per ingest version"""
+    return campaign_windows(get_campaign_ingestor().rollup)
+
+
+def with_live_campaigns(data):
+    """Fold newly appended campaign rows into the page data (incremental mode)"""
+    if 'campaign_rollup' not in PAGE_TABLES[data['page_id']]:
+        return data
+    ingestor = get_campaign_ingestor()
+    ingestor.poll()
+    data = dict(data)
+    data['campaign_rollup'] = ingestor.rollup
+    data['version'] = f"{data['version']}-{ingestor.version}"
+    if data['page_id'] == 'campaign_analytics':
+        data['campaign_index'] = live_campaign_index(ingestor.version)
+    if data['page_id'] == 'executive_overview':
+        data['campaign_windows'] = live_campaign_windows(ingestor.version)
+    return data
+
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide figure cache shared by every session"""
+    return FigureCache(max_bytes=FIGURE_CACHE_MB * 1024 * 1024)
+
+
+def cached_chart(data, chart_id, build, **filters):
+    """Serve a chart from the figure cache, calling build() on a miss"""
+    key = FigureCache.make_key(data['page_id'], chart_id, data['version'], filters)
+    if not PROFILER.enabled:
+        return get_figure_cache().get_or_build(key, build)
+    
+    with PROFILER.span('build', chart_id, cache='hit') as record:
+        def timed_build():
+            record['cache'] = 'miss'
+            return build()
+        fig = get_figure_cache().get_or_build(key, timed_build)
+    PROFILER.name_figure(fig, chart_id)
+    return fig
+
+
+@st.cache_resource
+def get_chart_pool():
+    """Process-wide thread pool for chart builds (None when CHART_WORKERS <= 1)"""
+    return make_pool(CHART_WORKERS)
+
+
+def chart_tasks(data):
+    """Submit a page's chart builds up front, then take the figures in render order"""
+    return ChartTasks(data['page_id'], data['version'], get_figure_cache(), pool=get_chart_pool(),
+                      profiler=PROFILER if PROFILER.enabled else None)
+
+
+def plotly_chart(fig, **kwargs):
+    """st.plotly_chart, timed with its payload size when profiling"""
+    with PROFILER.chart(fig):
+        st.plotly_chart(fig, **kwargs)
+    if FIGURE_SINK is not None:
+        FIGURE_SINK.append(fig)
+
+# =============================================================================
+# PAYLOAD REPORTING
+# =============================================================================
+def estimate_payload(make_fig, frame, probe_rows=1000):
+    """Estimate the full-resolution payload by scaling a small probe figure"""
+    probe = frame.iloc[:probe_rows]
+    if len(probe) == 0:
+        return 0
+    return figure_size(make_fig(probe)) / len(probe) * len(frame)
+
+
+def with_payload_meta(fig, shown, total, full_bytes, cells=None, cell_unit='cells'):
+    """Record shown/total points and payload sizes in the figure layout"""
+    payload = figure_size(fig)
+    full = payload if shown >= total else full_bytes()
+    meta = dict(points=shown, total_points=total, payload_bytes=payload, full_payload_bytes=int(full))
+    if cells is not None:
+        meta['cells'] = cells
+        meta['cell_unit'] = cell_unit
+    fig.update_layout(meta=meta)
+    return fig
+
+
+def format_delta(change):
+    """st.metric delta for a % change (None hides it when there is nothing to compare with)"""
+    return None if change is None or not np.isfinite(change) else f"{change:+.1f}%"
+
+
+def payload_caption(fig, unit):
+    """One-line summary of the downsampling applied to a figure"""
+    meta = fig.layout.meta or {}
+    if not meta:
+        return ""
+    if 'cells' in meta:
+        text = f"Aggregated {meta['total_points']:,} {unit} into {meta['cells']:,} {meta.get('cell_unit', 'cells')}"
+    else:
+        text = f"Showing {meta['points']:,} of {meta['total_points']:,} {unit}"
+    text += f" · payload {meta['payload_bytes']/1e3:,.0f} KB"
+    if meta['points'] < meta['total_points']:
+        text += f" (full resolution ≈ {meta['full_payload_bytes']/1e3:,.0f} KB)"
+    return text
+
+# =============================================================================
+# PRE-BINNED DISTRIBUTIONS
+# =============================================================================
+def histogram_figure(frame, column, title, label, count_label, bins=30):
+    """Histogram drawn from server-side bin counts instead of every raw value"""
+    counts = histogram(frame[column].to_numpy(), bins=bins)
+    fig = go.Figure(go.Bar(
+        x=(counts['left'] + counts['right']) / 2, y=counts['count'], width=counts['right'] - counts['left'],
+        customdata=counts[['left', 'right']], name=label,
+        hovertemplate=label + ' %{customdata[0]:,.4~g} – %{customdata[1]:,.4~g}<br>' + count_label + ' %{y:,}<extra></extra>',
+    ))
+    fig.update_layout(title=title, xaxis_title=label, yaxis_title=count_label, bargap=0)
+    
+    def raw(probe):
+        return px.histogram(probe, x=column, nbins=bins)
+    
+    return with_payload_meta(fig, 0, len(frame), lambda: estimate_payload(raw, frame[[column]]), cells=len(counts),
+                             cell_unit='bins')
+
+
+def box_figure(frame, column, title, label):
+    """Box plot drawn from server-side quartiles, whiskers and an outlier sample"""
+    stats = box_stats(frame[column].to_numpy())
+    fig = go.Figure()
+    if stats is not None:
+        fig.add_trace(go.Box(
+            x=[label], q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+            lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']], mean=[stats['mean']],
+            name=label, boxpoints=False,
+        ))
+        if len(stats['outliers']):
+            fig.add_trace(go.Scatter(
+                x=[label] * len(stats['outliers']), y=stats['outliers'], mode='markers', marker=dict(size=4),
+                name=f"Outliers ({len(stats['outliers']):,} of {stats['outlier_count']:,})",
+            ))
+    fig.update_layout(title=title, yaxis_title=label, showlegend=False)
+    
+    def raw(probe):
+        return px.box(probe, y=column)
+    
+    shown = 5 + len(stats['outliers']) if stats else 0
+    return with_payload_meta(fig, shown, len(frame), lambda: estimate_payload(raw, frame[[column]]))
+
 # =============================================================================
 # SIDEBAR NAVIGATION
 # =============================================================================
@@ -86,15 +366,7 @@ def sidebar():
     
     page = st.sidebar.radio(
         "Navigate to:",
-        [
-            "🏠 Executive Overview",
-            "📈 Campaign Analytics",
-            "👥 Customer Insights",
-            "📦 Product Performance",
-            "🗺️ Geographic Analysis",
-            "🎯 Attribution & Funnel",
-            "🤖 ML Model Evaluation"
-        ]
+        list(PAGES)
     )
     
     st.sidebar.markdown("---")
@@ -102,6 +374,42 @@ def sidebar():
     
     return page
 
+
+def sidebar_memory(data):
+    """Show the memory held by this page's tables (run `python schema.py` for before/after)"""
+    frames = {name: df for name, df in data.items() if isinstance(df, pd.DataFrame)}
+    with st.sidebar.expander("Memory"):
+        for name, df in frames.items():
+            st.write(f"**{name}**: {memory_by_column(df).sum()/1e6:.2f} MB ({len(df):,} rows)")
+
+
+def sidebar_cache_stats():
+    """Show figure cache counters (rendered after the page so they are current)"""
+    stats = get_figure_cache().stats()
+    with st.sidebar.expander("Figure cache"):
+        st.write(f"**Hits**: {stats['hits']:,} ({stats['hit_rate']:.0%})")
+        st.write(f"**Misses**: {stats['misses']:,}")
+        st.write(f"**Entries**: {stats['entries']:,} ({stats['bytes']/1e6:.1f} MB)")
+        st.write(f"**Evictions**: {stats['evictions']:,}")
+
+
+def sidebar_performance():
+    """Show where this run's time went (NOVAMART_PROFILE=1)"""
+    spans = PROFILER.frame()
+    totals = PROFILER.summary()
+    with st.sidebar.expander("Performance", expanded=True):
+        st.write(f"**Run**: {totals.get('run', 0):,.0f} ms")
+        for phase in ('load', 'filter', 'aggregate', 'build', 'render'):
+            if phase in totals:
+                st.write(f"**{phase.title()}**: {totals[phase]:,.0f} ms")
+        table = spans[['phase', 'name', 'ms', 'cache']].copy()
+        for col in ('alloc_bytes', 'peak_bytes', 'payload_bytes'):
+            if spans[col].notna().any():
+                table[col.replace('_bytes', ' KB')] = spans[col] / 1e3
+        st.dataframe(table.round(1), hide_index=True, use_container_width=True)
+        if PROFILE_TRACE:
+            st.caption(f"Trace: {PROFILE_TRACE}")
+
 # =============================================================================
 # PAGE: EXECUTIVE OVERVIEW
 # =============================================================================
@@ -110,61 +418,128 @@ def page_executive_overview(data):
     st.title("🏠 Executive Overview")
     st.markdown("Key performance metrics and trends at a glance")
     
-    campaigns = data['campaigns']
-    customers = data['customers']
+    rollup = data['campaign_rollup']
+    windows = data['campaign_windows']
+    
+    # KPI window: the last N days up to the latest campaign date, compared with the N days before
+    period = st.selectbox("Compare period", list(PERIODS) + ['All time'], index=1,
+                          help="KPI cards show this window and its change against the prior window of equal length")
+    days = PERIODS.get(period)
+    with PROFILER.span('aggregate', 'period_comparison'):
+        kpis = period_comparison(windows['all'], days)
+    
+    # Chart builders: submitted together so independent charts are prepared concurrently
+    def build_revenue_trend():
+        fig_revenue = px.line(
+            monthly_revenue(rollup), 
+            x='date', 
+            y='revenue',
+            title='Monthly Revenue Trend (₹)',
+            labels={'date': 'Month', 'revenue': 'Revenue'},
+            markers=True
+        )
+        fig_revenue.update_layout(hovermode='x unified', height=400)
+        return fig_revenue
+    
+    def build_rolling_revenue():
+        rolling = rolling_metrics(windows['all'], 'revenue', days=(7, 28))
+        fig_rolling = px.line(
+            rolling,
+            x='date',
+            y=['7-day', '28-day'],
+            title='Rolling Revenue (₹, trailing 7 and 28 days)',
+            labels={'date': 'Date', 'value': 'Revenue', 'variable': 'Window'}
+        )
+        fig_rolling.update_layout(hovermode='x unified', height=400)
+        return fig_rolling
+    
+    def build_channel_revenue():
+        channel_revenue = revenue_by(rollup, 'channel')
+        fig_channel = px.bar(channel_revenue, x='revenue', y='channel', title='Revenue by Channel')
+        fig_channel.update_layout(height=400)
+        return fig_channel
+    
+    def build_region_revenue():
+        region_revenue = revenue_by(rollup, 'region')
+        fig_region = px.bar(region_revenue, x='revenue', y='region', title='Revenue by Region')
+        fig_region.update_layout(height=400)
+        return fig_region
+    
+    def build_segment_count():
+        return px.pie(data['segment_counts'], values='Count', names='Segment', title='Customer Distribution by Segment')
+    
+    def build_segment_ltv():
+        return px.bar(data['segment_ltv'], x='lifetime_value', y='customer_segment', title='Avg Lifetime Value by Segment')
+    
+    charts = chart_tasks(data)
+    charts.submit('revenue_trend', build_revenue_trend)
+    charts.submit('rolling_revenue', build_rolling_revenue)
+    charts.submit('channel_revenue', build_channel_revenue)
+    charts.submit('region_revenue', build_region_revenue)
+    charts.submit('segment_count', build_segment_count)
+    charts.submit('segment_ltv', build_segment_ltv)
     
     # KPI Cards
     col1, col2, col3, col4 = st.columns(4)
     
+    # NaN KPIs mean there are no campaign rows (e.g. nothing ingested yet)
     with col1:
-        total_revenue = campaigns['revenue'].sum()
-        st.metric("Total Revenue", f"₹{total_revenue/1e7:.2f} Cr", delta="+12.5%")
+        total_revenue = kpis['revenue']['current']
+        st.metric("Revenue", f"₹{total_revenue/1e7:.2f} Cr" if np.isfinite(total_revenue) else "No data",
+                  delta=format_delta(kpis['revenue']['change']))
     
     with col2:
-        total_conversions = campaigns['conversions'].sum()
-        st.metric("Total Conversions", f"{total_conversions:,}", delta="+8.3%")
+        total_conversions = kpis['conversions']['current']
+        st.metric("Conversions", f"{int(total_conversions):,}" if np.isfinite(total_conversions) else "No data",
+                  delta=format_delta(kpis['conversions']['change']))
     
     with col3:
-        avg_roas = campaigns[campaigns['roas'] > 0]['roas'].mean()
-        st.metric("Avg ROAS", f"{avg_roas:.2f}x", delta="-2.1%")
+        # spend-weighted ROAS: window revenue over window spend
+        avg_roas = kpis['ROAS']['current']
+        st.metric("Avg ROAS", f"{avg_roas:.2f}x" if np.isfinite(avg_roas) else "No data",
+                  delta=format_delta(kpis['ROAS']['change']))
     
     with col4:
-        total_customers = len(customers)
-        st.metric("Total Customers", f"{total_customers:,}", delta="+5.2%")
+        total_customers = data['customer_count']
+        st.metric("Total Customers", f"{total_customers:,}",
+                  help="All customers to date (customer records carry no acquisition date to compare periods)")
+    
+    if windows['all'].empty:
+        st.caption("No campaign data yet")
+    elif days is not None:
+        start, end = windows['all'].last_days(days)
+        versus = f"deltas vs the previous {days} days" if np.isfinite(kpis['revenue']['previous']) \
+            else "no earlier data to compare with"
+        st.caption(f"{start:%d %b %Y} – {end:%d %b %Y}, {versus}")
     
     st.markdown("---")
     
     # Revenue Trend
     st.subheader("📈 Revenue Trend Over Time")
-    monthly_revenue = campaigns.groupby(pd.Grouper(key='date', freq='M'))['revenue'].sum().reset_index()
-    
-    fig_revenue = px.line(
-        monthly_revenue, 
-        x='date', 
-        y='revenue',
-        title='Monthly Revenue Trend (₹)',
-        labels={'date': 'Month', 'revenue': 'Revenue'},
-        markers=True
-    )
-    fig_revenue.update_layout(hovermode='x unified', height=400)
-    st.plotly_chart(fig_revenue, use_container_width=True)
+    plotly_chart(charts['revenue_trend'], use_container_width=True)
+    plotly_chart(charts['rolling_revenue'], use_container_width=True)
     
     # Channel Performance
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("📊 Revenue by Channel")
-        channel_revenue = campaigns.groupby('channel')['revenue'].sum().sort_values(ascending=True).reset_index()
-        fig_channel = px.bar(channel_revenue, x='revenue', y='channel', title='Revenue by Channel')
-        fig_channel.update_layout(height=400)
-        st.plotly_chart(fig_channel, use_container_width=True)
+        plotly_chart(charts['channel_revenue'], use_container_width=True)
     
     with col2:
         st.subheader("📍 Revenue by Region")
-        region_revenue = campaigns.groupby('region')['revenue'].sum().sort_values(ascending=True).reset_index()
-        fig_region = px.bar(region_revenue, x='revenue', y='region', title='Revenue by Region')
-        fig_region.update_layout(height=400)
-        st.plotly_chart(fig_region, use_container_width=True)
+        plotly_chart(charts['region_revenue'], use_container_width=True)
+    
+    # Channel cohorts over the selected window against the prior window
+    if days is not None:
+        st.subheader(f"🔁 Channel Revenue: {period} vs Previous {days} Days")
+        channels = cohort_comparison(windows['channel'], days, 'revenue')
+        if channels.empty:
+            st.info("No campaign data to compare.")
+        else:
+            channels = channels.rename(columns={'channel': 'Channel', 'current': 'Revenue',
+                                                'previous': 'Previous Period', 'change': 'Change (%)'})
+            st.dataframe(channels.round(1), hide_index=True, use_container_width=True)
     
     st.markdown("---")
     
@@ -173,15 +548,10 @@ def page_executive_overview(data):
     col1, col2 = st.columns(2)
     
     with col1:
-        segment_count = customers['customer_segment'].value_counts().reset_index()
-        segment_count.columns = ['Segment', 'Count']
-        fig_segment = px.pie(segment_count, values='Count', names='Segment', title='Customer Distribution by Segment')
-        st.plotly_chart(fig_segment, use_container_width=True)
+        plotly_chart(charts['segment_count'], use_container_width=True)
     
     with col2:
-        segment_ltv = customers.groupby('customer_segment')['lifetime_value'].mean().sort_values(ascending=True).reset_index()
-        fig_ltv = px.bar(segment_ltv, x='lifetime_value', y='customer_segment', title='Avg Lifetime Value by Segment')
-        st.plotly_chart(fig_ltv, use_container_width=True)
+        plotly_chart(charts['segment_ltv'], use_container_width=True)
 
 # =============================================================================
 # PAGE: CAMPAIGN ANALYTICS
@@ -191,94 +561,95 @@ def page_campaign_analytics(data):
     st.title("📈 Campaign Analytics")
     st.markdown("Detailed campaign performance metrics and insights")
     
-    campaigns = data['campaigns']
+    index = data['campaign_index']
     
     # Add filters
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        selected_channel = st.multiselect("Select Channel(s)", campaigns['channel'].unique(), default=campaigns['channel'].unique())
+        channels = index.options['channel']
+        selected_channel = st.multiselect("Select Channel(s)", channels, default=channels)
     
     with col2:
-        selected_campaign = st.multiselect("Select Campaign Type(s)", campaigns['campaign_type'].unique(), default=campaigns['campaign_type'].unique())
+        campaign_types = index.options['campaign_type']
+        selected_campaign = st.multiselect("Select Campaign Type(s)", campaign_types, default=campaign_types)
     
     with col3:
-        date_range = st.date_input("Select Date Range", [campaigns['date'].min(), campaigns['date'].max()])
-    
-    # Filter data
-    filtered_campaigns = campaigns[
-        (campaigns['channel'].isin(selected_channel)) &
-        (campaigns['campaign_type'].isin(selected_campaign)) &
-        (campaigns['date'].dt.date >= date_range[0]) &
-        (campaigns['date'].dt.date <= date_range[1])
-    ]
+        date_range = st.date_input("Select Date Range", list(index.date_bounds()))
+    
+    # Filter data (binary search on date, bitmap intersection on the multiselects)
+    with PROFILER.span('filter', 'campaigns'):
+        filtered_rollup = filter_campaigns(
+            data['campaign_rollup'],
+            channels=selected_channel,
+            campaign_types=selected_campaign,
+            start=date_range[0],
+            end=date_range[-1],
+            index=index,
+        )
+    full_resolution = st.checkbox("Full-resolution daily trend", value=False)
+    filters = dict(channel=selected_channel, campaign_type=selected_campaign, date_range=date_range)
+    with PROFILER.span('aggregate', 'campaign_kpis'):
+        kpis = campaign_kpis(filtered_rollup)
     
     # Key Metrics
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Spend", f"₹{filtered_campaigns['spend'].sum()/1e5:.2f} Lakhs")
+        st.metric("Total Spend", f"₹{kpis['spend']/1e5:.2f} Lakhs")
     with col2:
-        st.metric("Total Impressions", f"{filtered_campaigns['impressions'].sum()/1e6:.2f}M")
+        st.metric("Total Impressions", f"{kpis['impressions']/1e6:.2f}M")
     with col3:
-        st.metric("Avg CTR", f"{(filtered_campaigns['clicks'].sum() / filtered_campaigns['impressions'].sum() * 100):.2f}%")
+        st.metric("Avg CTR", f"{kpis['ctr']:.2f}%")
     with col4:
-        st.metric("Avg CVR", f"{(filtered_campaigns['conversions'].sum() / filtered_campaigns['clicks'].sum() * 100):.2f}%")
+        st.metric("Avg CVR", f"{kpis['cvr']:.2f}%")
     
     st.markdown("---")
     
     # Campaign Performance Comparison
     st.subheader("📊 Campaign Type Performance")
-    campaign_perf = filtered_campaigns.groupby('campaign_type').agg({
-        'spend': 'sum',
-        'revenue': 'sum',
-        'conversions': 'sum',
-        'roas': 'mean'
-    }).reset_index()
     
     col1, col2 = st.columns(2)
     
     with col1:
-        fig1 = px.bar(campaign_perf, x='campaign_type', y='spend', title='Spend by Campaign Type', text_auto=True)
-        st.plotly_chart(fig1, use_container_width=True)
+        def build_type_spend():
+            campaign_perf = campaign_type_performance(filtered_rollup)
+            return px.bar(campaign_perf, x='campaign_type', y='spend', title='Spend by Campaign Type', text_auto=True)
+        
+        plotly_chart(cached_chart(data, 'type_spend', build_type_spend, **filters), use_container_width=True)
     
     with col2:
-        fig2 = px.bar(campaign_perf, x='campaign_type', y='revenue', title='Revenue by Campaign Type', text_auto=True)
-        st.plotly_chart(fig2, use_container_width=True)
+        def build_type_revenue():
+            campaign_perf = campaign_type_performance(filtered_rollup)
+            return px.bar(campaign_perf, x='campaign_type', y='revenue', title='Revenue by Campaign Type', text_auto=True)
+        
+        plotly_chart(cached_chart(data, 'type_revenue', build_type_revenue, **filters), use_container_width=True)
     
     # Daily Trend
     st.subheader("📅 Daily Performance Trends")
-    daily_perf = filtered_campaigns.groupby('date').agg({
-        'spend': 'sum',
-        'revenue': 'sum',
-        'conversions': 'sum'
-    }).reset_index()
-    
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.add_trace(go.Scatter(x=daily_perf['date'], y=daily_perf['revenue'], name='Revenue', line=dict(color='#1f77b4')), secondary_y=False)
-    fig.add_trace(go.Bar(x=daily_perf['date'], y=daily_perf['spend'], name='Spend', marker=dict(color='#ff7f0e'), opacity=0.6), secondary_y=True)
     
-    fig.update_layout(hovermode='x unified', height=400, title_text='Revenue vs Spend Trend')
-    fig.update_xaxes(title_text='Date')
-    fig.update_yaxes(title_text='Revenue', secondary_y=False)
-    fig.update_yaxes(title_text='Spend', secondary_y=True)
+    def build_daily_trend():
+        all_days = daily_performance(filtered_rollup)
+        daily_perf = all_days if full_resolution else lttb_frame(all_days, 'date', ['revenue', 'spend'], TIMESERIES_BUDGET)
+        
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        fig.add_trace(go.Scatter(x=daily_perf['date'], y=daily_perf['revenue'], name='Revenue', line=dict(color='#1f77b4')), secondary_y=False)
+        fig.add_trace(go.Bar(x=daily_perf['date'], y=daily_perf['spend'], name='Spend', marker=dict(color='#ff7f0e'), opacity=0.6), secondary_y=True)
+        
+        fig.update_layout(hovermode='x unified', height=400, title_text='Revenue vs Spend Trend')
+        fig.update_xaxes(title_text='Date')
+        fig.update_yaxes(title_text='Revenue', secondary_y=False)
+        fig.update_yaxes(title_text='Spend', secondary_y=True)
+        return with_payload_meta(fig, len(daily_perf), len(all_days), lambda: figure_size(fig) * len(all_days) / max(len(daily_perf), 1))
     
-    st.plotly_chart(fig, use_container_width=True)
+    fig_daily = cached_chart(data, 'daily_trend', build_daily_trend, full_resolution=full_resolution, **filters)
+    plotly_chart(fig_daily, use_container_width=True)
+    st.caption(payload_caption(fig_daily, 'days'))
     
     # Channel Performance Comparison
     st.subheader("🎯 Channel Performance Matrix")
-    channel_metrics = filtered_campaigns.groupby('channel').agg({
-        'impressions': 'sum',
-        'clicks': 'sum',
-        'conversions': 'sum',
-        'spend': 'sum',
-        'revenue': 'sum'
-    }).reset_index()
-    
-    channel_metrics['CTR'] = (channel_metrics['clicks'] / channel_metrics['impressions'] * 100).round(2)
-    channel_metrics['CVR'] = (channel_metrics['conversions'] / channel_metrics['clicks'] * 100).round(2)
-    channel_metrics['ROAS'] = (channel_metrics['revenue'] / channel_metrics['spend']).round(2)
-    
-    st.dataframe(channel_metrics[['channel', 'CTR', 'CVR', 'ROAS']], use_container_width=True)
+    with PROFILER.span('aggregate', 'channel_matrix'):
+        matrix = channel_matrix(filtered_rollup)
+    st.dataframe(matrix, use_container_width=True)
 
 # =============================================================================
 # PAGE: CUSTOMER INSIGHTS
@@ -295,59 +666,146 @@ def page_customer_insights(data):
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_age = px.histogram(customers, x='age', nbins=30, title='Age Distribution', labels={'age': 'Age', 'count': 'Number of Customers'})
-        fig_age.update_layout(height=400)
-        st.plotly_chart(fig_age, use_container_width=True)
+        def build_age():
+            fig_age = histogram_figure(customers, 'age', 'Age Distribution', 'Age', 'Number of Customers')
+            fig_age.update_layout(height=400)
+            return fig_age
+        
+        fig_age = cached_chart(data, 'age_histogram', build_age)
+        plotly_chart(fig_age, use_container_width=True)
+        st.caption(payload_caption(fig_age, 'customers'))
     
     with col2:
-        fig_income = px.histogram(customers, x='income', nbins=30, title='Income Distribution', labels={'income': 'Income', 'count': 'Number of Customers'})
-        fig_income.update_layout(height=400)
-        st.plotly_chart(fig_income, use_container_width=True)
+        def build_income():
+            fig_income = histogram_figure(customers, 'income', 'Income Distribution', 'Income', 'Number of Customers')
+            fig_income.update_layout(height=400)
+            return fig_income
+        
+        fig_income = cached_chart(data, 'income_histogram', build_income)
+        plotly_chart(fig_income, use_container_width=True)
+        st.caption(payload_caption(fig_income, 'customers'))
     
     # Income vs Lifetime Value
     st.subheader("💰 Income vs Lifetime Value")
-    fig_scatter = px.scatter(
-        customers, 
-        x='income', 
-        y='lifetime_value', 
-        color='customer_segment',
-        size='purchase_frequency',
-        hover_data=['age', 'satisfaction_score'],
-        title='Customer Income vs LTV'
-    )
-    fig_scatter.update_layout(height=500)
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        scatter_mode = st.radio("Rendering", SCATTER_MODES, horizontal=True)
+    
+    with col2:
+        point_budget = st.select_slider("Point budget", POINT_BUDGETS, value=POINT_BUDGET,
+                                        disabled=scatter_mode != 'Sampled')
+    
+    def make_scatter(frame):
+        return px.scatter(
+            frame, 
+            x='income', 
+            y='lifetime_value', 
+            color='customer_segment',
+            size='total_purchases',
+            hover_data=['age', 'satisfaction_score'],
+            title='Customer Income vs LTV'
+        )
+    
+    def build_income_ltv():
+        if scatter_mode == 'Binned density':
+            x_centers, y_centers, counts = bin_2d(customers['income'], customers['lifetime_value'])
+            fig_scatter = go.Figure(go.Heatmap(x=x_centers, y=y_centers, z=counts.T, colorscale='Blues',
+                                               colorbar=dict(title='Customers')))
+            fig_scatter.update_layout(title='Customer Income vs LTV (binned density)',
+                                      xaxis_title='income', yaxis_title='lifetime_value')
+            cells = int((counts > 0).sum())
+            shown = 0
+        else:
+            cells = None
+            frame = customers
+            if scatter_mode == 'Sampled':
+                rows = density_sample(customers['income'], customers['lifetime_value'], point_budget,
+                                      groups=customers['customer_segment'])
+                frame = customers.iloc[rows]
+            fig_scatter = make_scatter(frame)
+            shown = len(frame)
+        fig_scatter.update_layout(height=500)
+        return with_payload_meta(fig_scatter, shown, len(customers), lambda: estimate_payload(make_scatter, customers), cells=cells)
+    
+    fig_scatter = cached_chart(data, 'income_ltv', build_income_ltv, mode=scatter_mode, budget=point_budget)
+    plotly_chart(fig_scatter, use_container_width=True)
+    st.caption(payload_caption(fig_scatter, 'customers'))
     
     # Satisfaction Analysis
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("😊 Satisfaction Score Distribution")
-        fig_satisfaction = px.box(customers, y='satisfaction_score', title='Satisfaction Score Distribution')
-        fig_satisfaction.update_layout(height=400)
-        st.plotly_chart(fig_satisfaction, use_container_width=True)
+        
+        def build_satisfaction():
+            fig_satisfaction = box_figure(customers, 'satisfaction_score', 'Satisfaction Score Distribution',
+                                          'satisfaction_score')
+            fig_satisfaction.update_layout(height=400)
+            return fig_satisfaction
+        
+        fig_satisfaction = cached_chart(data, 'satisfaction_box', build_satisfaction)
+        plotly_chart(fig_satisfaction, use_container_width=True)
+        st.caption(payload_caption(fig_satisfaction, 'customers'))
     
     with col2:
         st.subheader("🎯 NPS Category Distribution")
-        nps_counts = customers['nps_category'].value_counts().reset_index()
-        nps_counts.columns = ['NPS Category', 'Count']
-        fig_nps = px.pie(nps_counts, values='Count', names='NPS Category', title='NPS Category Distribution')
-        st.plotly_chart(fig_nps, use_container_width=True)
+        
+        def build_nps():
+            return px.pie(data['nps_counts'], values='Count', names='NPS Category', title='NPS Category Distribution')
+        
+        plotly_chart(cached_chart(data, 'nps_pie', build_nps), use_container_width=True)
     
     # Churn Analysis
     st.subheader("⚠️ Churn Risk Analysis")
-    churn_data = customers.groupby('churn_risk').size().reset_index(name='Count')
+    with PROFILER.span('aggregate', 'churn_risk_summary'):
+        churn_data, churn_stats = churn_risk_summary(customers)
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_churn = px.pie(churn_data, values='Count', names='churn_risk', title='Churn Risk Distribution')
-        st.plotly_chart(fig_churn, use_container_width=True)
+        def build_churn():
+            return px.pie(churn_data, values='Count', names='churn_risk', title='Churn Risk Distribution')
+        
+        plotly_chart(cached_chart(data, 'churn_pie', build_churn), use_container_width=True)
     
     with col2:
-        high_risk = customers[customers['churn_risk'] == 'High']
-        st.metric("High Risk Customers", len(high_risk), delta=f"{len(high_risk)/len(customers)*100:.1f}%")
-        st.write(f"**Average Satisfaction**: {high_risk['satisfaction_score'].mean():.2f}/10")
-        st.write(f"**Average Support Tickets**: {high_risk['support_tickets'].mean():.1f}")
+        st.metric("High Risk Customers", churn_stats['high_risk'], delta=f"{churn_stats['high_risk_share']*100:.1f}%")
+        st.write(f"**Average Satisfaction**: {churn_stats['avg_satisfaction']:.2f}/5")
+        st.write(f"**Average Support Tickets**: {churn_stats['avg_support_tickets']:.1f}")
+    
+    low, high = CHURN_BANDS[0], CHURN_BANDS[-1]
+    st.caption(f"Bands from churn probability: Low < {low:.0%} ≤ Medium < {high:.0%} ≤ High")
+    
+    # RFM Segmentation
+    st.subheader("🧮 RFM Segments")
+    with PROFILER.span('aggregate', 'rfm_summary'):
+        rfm = rfm_summary(customers)
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        def build_rfm_count():
+            fig_rfm = px.bar(rfm.sort_values('Count'), x='Count', y='rfm_segment', orientation='h',
+                             title='Customers by RFM Segment')
+            fig_rfm.update_layout(height=400)
+            return fig_rfm
+        
+        plotly_chart(cached_chart(data, 'rfm_count', build_rfm_count), use_container_width=True)
+    
+    with col2:
+        def build_rfm_ltv():
+            fig_rfm_ltv = px.bar(rfm.sort_values('lifetime_value'), x='lifetime_value', y='rfm_segment',
+                                 orientation='h', title='Avg Lifetime Value by RFM Segment')
+            fig_rfm_ltv.update_layout(height=400)
+            return fig_rfm_ltv
+        
+        plotly_chart(cached_chart(data, 'rfm_ltv', build_rfm_ltv), use_container_width=True)
+    
+    st.caption("Recency, frequency and monetary value scored 1-5 against quintiles of last purchase days, "
+               "total purchases and lifetime value")
+    
+    if 'cluster' in customers:
+        st.write("### Behavioural Clusters (mini-batch k-means on RFM)")
+        st.dataframe(cluster_profile(customers).round(2), hide_index=True, use_container_width=True)
 
 # =============================================================================
 # PAGE: PRODUCT PERFORMANCE
@@ -357,40 +815,85 @@ def page_product_performance(data):
     st.title("📦 Product Performance")
     st.markdown("Product sales, categories, and performance metrics")
     
-    products = data['products']
+    rollup = data['product_rollup']
     
-    # Sales by Category
-    st.subheader("📊 Sales by Product Category")
-    category_sales = products.groupby('category')['sales'].sum().sort_values(ascending=True).reset_index()
+    # Add filters
+    col1, col2, col3 = st.columns(3)
     
-    fig_category = px.bar(category_sales, x='sales', y='category', title='Total Sales by Category')
-    fig_category.update_layout(height=400)
-    st.plotly_chart(fig_category, use_container_width=True)
+    with col1:
+        selected_region = st.multiselect("Select Region(s)", rollup.regions, default=rollup.regions)
     
-    # Sales by Subcategory
-    st.subheader("🔍 Sales by Subcategory")
-    subcategory_sales = products.groupby('subcategory')['sales'].sum().sort_values(ascending=False).head(10).reset_index()
+    with col2:
+        selected_quarter = st.multiselect("Select Quarter(s)", rollup.quarters, default=rollup.quarters)
     
-    fig_subcat = px.bar(subcategory_sales, x='sales', y='subcategory', orientation='h', title='Top 10 Subcategories by Sales')
-    fig_subcat.update_layout(height=400)
-    st.plotly_chart(fig_subcat, use_container_width=True)
+    with col3:
+        top_n = st.slider("Top N", min_value=5, max_value=25, value=10, step=5)
+    
+    filters = dict(region=selected_region, quarter=selected_quarter)
+    
+    # Chart builders: submitted together so independent charts are prepared concurrently
+    def build_category():
+        fig_category = px.bar(category_sales(rollup, selected_region, selected_quarter), x='sales', y='category',
+                              title='Total Sales by Category')
+        fig_category.update_layout(height=400)
+        return fig_category
+    
+    def build_subcategory():
+        fig_subcat = px.bar(top_subcategories(rollup, top_n, selected_region, selected_quarter), x='sales', y='subcategory',
+                            orientation='h', title=f'Top {top_n} Subcategories by Sales')
+        fig_subcat.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
+        return fig_subcat
+    
+    def build_products():
+        fig_products = px.bar(top_products(rollup, top_n, selected_region, selected_quarter), x='sales', y='product',
+                              color='category', orientation='h', hover_data=['units_sold', 'profit_margin'],
+                              labels={'product': 'Product'}, title=f'Top {top_n} Products by Sales')
+        fig_products.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
+        return fig_products
+    
+    def build_treemap():
+        nodes = product_hierarchy(rollup, top_n, selected_region, selected_quarter)
+        fig_tree = go.Figure(go.Treemap(
+            ids=nodes['id'], parents=nodes['parent'], labels=nodes['label'], values=nodes['sales'],
+            branchvalues='total', customdata=nodes[['units_sold', 'profit_margin']],
+            hovertemplate='<b>%{label}</b><br>Sales ₹%{value:,.0f}<br>Units %{customdata[0]:,}'
+                          '<br>Margin %{customdata[1]:.1f}%<extra></extra>',
+        ))
+        fig_tree.update_layout(title='Product Sales Treemap', margin=dict(t=50, l=10, r=10, b=10))
+        return fig_tree
+    
+    def build_quarterly():
+        return px.line(quarterly_sales(rollup, selected_region), x='quarter', y='sales', title='Sales by Quarter', markers=True)
+    
+    charts = chart_tasks(data)
+    charts.submit('category_sales', build_category, **filters)
+    charts.submit('subcategory_sales', build_subcategory, top=top_n, **filters)
+    charts.submit('product_sales', build_products, top=top_n, **filters)
+    charts.submit('product_treemap', build_treemap, top=top_n, **filters)
+    charts.submit('quarterly_sales', build_quarterly, region=selected_region)
+    
+    # Sales by Category
+    st.subheader("📊 Sales by Product Category")
+    plotly_chart(charts['category_sales'], use_container_width=True)
+    
+    # Top Subcategories and Products
+    st.subheader("🔍 Top Subcategories and Products")
+    col1, col2 = st.columns(2)
+    with col1:
+        plotly_chart(charts['subcategory_sales'], use_container_width=True)
+    with col2:
+        plotly_chart(charts['product_sales'], use_container_width=True)
     
     # Treemap
     st.subheader("🌳 Product Hierarchy (Treemap)")
-    fig_tree = px.treemap(
-        products,
-        labels='product_name',
-        parents='category',
-        values='sales',
-        title='Product Sales Treemap'
-    )
-    st.plotly_chart(fig_tree, use_container_width=True)
+    fig_tree = charts['product_treemap']
+    plotly_chart(fig_tree, use_container_width=True)
+    st.caption(f"{len(fig_tree.data[0].ids):,} hierarchy nodes from {rollup.rows:,} sales rows "
+               f"(top {top_n} products per subcategory, the rest grouped) · payload {figure_size(fig_tree)/1e3:,.0f} KB")
     
     # Quarterly Trends
     st.subheader("📈 Quarterly Sales Trends")
-    quarterly_sales = products.groupby('quarter')['sales'].sum().reset_index()
-    fig_quarter = px.line(quarterly_sales, x='quarter', y='sales', title='Sales by Quarter', markers=True)
-    st.plotly_chart(fig_quarter, use_container_width=True)
+    plotly_chart(charts['quarterly_sales'], use_container_width=True)
 
 # =============================================================================
 # PAGE: GEOGRAPHIC ANALYSIS
@@ -401,6 +904,9 @@ def page_geographic_analysis(data):
     st.markdown("Regional performance and geographic insights")
     
     geographic = data['geographic']
+    grid = data['geo_grid']
+    state_bounds = data['state_bounds']
+    city_bounds = data['city_bounds']
     
     # Geographic Distribution
     st.subheader("🌍 Geographic Distribution")
@@ -408,34 +914,80 @@ def page_geographic_analysis(data):
     
     with col1:
         st.subheader("📊 Revenue by State")
-        state_revenue = geographic.sort_values('revenue', ascending=True)
-        fig_state = px.bar(state_revenue, x='revenue', y='state', title='Revenue by State')
-        fig_state.update_layout(height=500)
-        st.plotly_chart(fig_state, use_container_width=True)
+        
+        def build_state_revenue():
+            state_revenue = geographic.sort_values('total_revenue', ascending=True)
+            fig_state = px.bar(state_revenue, x='total_revenue', y='state', title='Revenue by State')
+            fig_state.update_layout(height=500)
+            return fig_state
+        
+        plotly_chart(cached_chart(data, 'state_revenue', build_state_revenue), use_container_width=True)
     
     with col2:
         st.subheader("⭐ Satisfaction by State")
-        state_sat = geographic.sort_values('satisfaction_score', ascending=True)
-        fig_sat = px.bar(state_sat, x='satisfaction_score', y='state', title='Satisfaction Score by State')
-        fig_sat.update_layout(height=500)
-        st.plotly_chart(fig_sat, use_container_width=True)
-    
-    # Choropleth Map
-    st.subheader("🗺️ Revenue Map (Geographic)")
-    fig_map = px.scatter_geo(
-        geographic,
-        lat='latitude',
-        lon='longitude',
-        size='revenue',
-        hover_name='state',
-        hover_data=['store_count', 'satisfaction_score'],
-        title='Revenue by Geographic Location'
-    )
-    st.plotly_chart(fig_map, use_container_width=True)
+        
+        def build_state_satisfaction():
+            state_sat = geographic.sort_values('customer_satisfaction', ascending=True)
+            fig_sat = px.bar(state_sat, x='customer_satisfaction', y='state', title='Customer Satisfaction by State')
+            fig_sat.update_layout(height=500)
+            return fig_sat
+        
+        plotly_chart(cached_chart(data, 'state_satisfaction', build_state_satisfaction), use_container_width=True)
+    
+    # Customer Map: pre-binned grid cells at the level that suits the view
+    st.subheader("🗺️ Customer Map")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        state = st.selectbox("Focus state", ['All states'] + sorted(state_bounds.index.astype(str)))
+    with col2:
+        cities = sorted(city_bounds.loc[state].index.astype(str)) if state != 'All states' else []
+        city = st.selectbox("Focus city", ['All cities'] + cities, disabled=not cities)
+    with col3:
+        detail = st.select_slider("Detail", options=['Auto'] + list(DETAIL_LEVELS), value='Auto')
+    
+    if city != 'All cities' and cities:
+        box = city_bounds.loc[(state, city)]
+    elif state != 'All states':
+        box = state_bounds.loc[state]
+    else:
+        box = state_bounds.agg({'lat_min': 'min', 'lat_max': 'max', 'lon_min': 'min', 'lon_max': 'max'})
+    # pad the view so customers just outside the focus box still show
+    lat_pad = max(0.05, 0.1 * (box['lat_max'] - box['lat_min']))
+    lon_pad = max(0.05, 0.1 * (box['lon_max'] - box['lon_min']))
+    bounds = (box['lat_min'] - lat_pad, box['lat_max'] + lat_pad, box['lon_min'] - lon_pad, box['lon_max'] + lon_pad)
+    
+    with PROFILER.span('aggregate', 'map_cells'):
+        level, cells = grid.view(bounds, level=DETAIL_LEVELS.get(detail), max_cells=POINT_BUDGET)
+    
+    def build_map():
+        fig = px.scatter_map(
+            cells,
+            lat='latitude',
+            lon='longitude',
+            size='lifetime_value',
+            color='satisfaction_score',
+            hover_data={'customers': ':,', 'lifetime_value': ':,.0f', 'satisfaction_score': ':.2f',
+                        'latitude': False, 'longitude': False},
+            labels={'lifetime_value': 'Lifetime value', 'satisfaction_score': 'Satisfaction', 'customers': 'Customers'},
+            color_continuous_scale='RdYlGn',
+            map_style='carto-positron',
+            center={'lat': (bounds[0] + bounds[1]) / 2, 'lon': (bounds[2] + bounds[3]) / 2},
+            zoom=map_zoom(bounds[3] - bounds[2]),
+            title='Customer Lifetime Value and Satisfaction by Area'
+        )
+        fig.update_layout(height=550)
+        return fig
+    
+    fig_map = cached_chart(data, 'customer_map', build_map, state=state, city=city, level=level,
+                           budget=POINT_BUDGET)
+    plotly_chart(fig_map, use_container_width=True)
+    km = cell_km(level, (bounds[0] + bounds[1]) / 2)
+    st.caption(f"{int(cells['customers'].sum()):,} customers in view, aggregated into {len(cells):,} cells of about "
+               f"{km:,.1f} km (grid level {level}) · payload {figure_size(fig_map)/1e3:,.0f} KB")
     
     # State Performance Table
     st.subheader("📋 State Performance Summary")
-    st.dataframe(geographic[['state', 'store_count', 'revenue', 'satisfaction_score']], use_container_width=True)
+    st.dataframe(geographic[['state', 'store_count', 'total_revenue', 'customer_satisfaction']], use_container_width=True)
 
 # =============================================================================
 # PAGE: ATTRIBUTION & FUNNEL
@@ -447,33 +999,76 @@ def page_attribution_funnel(data):
     
     attribution = data['attribution']
     funnel = data['funnel']
-    journey = data['journey']
+    paths = data['journey_paths']
+    top_journeys = journey_counts(paths, top=8)
+    
+    # Chart builders: submitted together so independent charts are prepared concurrently
+    def build_first_touch():
+        return px.bar(attribution_by_model(attribution, 'first_touch'), x='first_touch', y='channel', title='First-Touch Attribution')
+    
+    def build_last_touch():
+        return px.bar(attribution_by_model(attribution, 'last_touch'), x='last_touch', y='channel', title='Last-Touch Attribution')
+    
+    def build_markov():
+        return px.bar(attribution_by_model(attribution, 'markov'), x='markov', y='channel',
+                      title='Markov Removal-Effect Attribution')
+    
+    def build_model_comparison():
+        return px.bar(
+            attribution_shares(attribution),
+            x='channel',
+            y='share',
+            color='model',
+            barmode='group',
+            title='Channel Share of Conversions (%) by Model'
+        )
+    
+    def build_funnel():
+        return px.funnel(
+            funnel_rates(funnel),
+            x='visitors',
+            y='stage',
+            hover_data={'overall_rate': ':.1f', 'step_rate': ':.1f'},
+            title='Marketing Funnel - Visitor Flow'
+        )
+    
+    def build_journeys():
+        return px.bar(top_journeys, x='Journey Path', y='Count', title='Top Customer Journey Paths')
+    
+    charts = chart_tasks(data)
+    charts.submit('first_touch', build_first_touch)
+    charts.submit('last_touch', build_last_touch)
+    charts.submit('markov', build_markov)
+    charts.submit('model_comparison', build_model_comparison)
+    charts.submit('funnel', build_funnel)
+    charts.submit('top_journeys', build_journeys)
     
     # Attribution Models Comparison
     st.subheader("📊 Attribution Model Comparison")
+    st.caption(f"Credit in converting customers, computed from {len(paths):,} journey paths")
     col1, col2 = st.columns(2)
     
     with col1:
         st.write("### First-Touch Attribution")
-        first_touch = attribution[['channel', 'first_touch']].sort_values('first_touch', ascending=True)
-        fig_first = px.bar(first_touch, x='first_touch', y='channel', title='First-Touch Attribution')
-        st.plotly_chart(fig_first, use_container_width=True)
+        plotly_chart(charts['first_touch'], use_container_width=True)
     
     with col2:
         st.write("### Last-Touch Attribution")
-        last_touch = attribution[['channel', 'last_touch']].sort_values('last_touch', ascending=True)
-        fig_last = px.bar(last_touch, x='last_touch', y='channel', title='Last-Touch Attribution')
-        st.plotly_chart(fig_last, use_container_width=True)
+        plotly_chart(charts['last_touch'], use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("### Data-Driven (Markov) Attribution")
+        plotly_chart(charts['markov'], use_container_width=True)
+    
+    with col2:
+        st.write("### Share of Credit by Model")
+        plotly_chart(charts['model_comparison'], use_container_width=True)
     
     # Marketing Funnel
     st.subheader("🔀 Marketing Conversion Funnel")
-    fig_funnel = px.funnel(
-        funnel,
-        x='visitors',
-        y='stage',
-        title='Marketing Funnel - Visitor Flow'
-    )
-    st.plotly_chart(fig_funnel, use_container_width=True)
+    plotly_chart(charts['funnel'], use_container_width=True)
     
     # Customer Journey
     st.subheader("🛤️ Multi-Touchpoint Customer Journeys")
@@ -481,13 +1076,66 @@ def page_attribution_funnel(data):
     
     with col1:
         st.write("### Top Customer Journeys")
-        journey_counts = journey['path'].value_counts().head(8).reset_index()
-        journey_counts.columns = ['Journey Path', 'Count']
-        st.dataframe(journey_counts, use_container_width=True)
+        st.dataframe(top_journeys, use_container_width=True)
+    
+    with col2:
+        plotly_chart(charts['top_journeys'], use_container_width=True)
+
+# =============================================================================
+# PAGE: METRIC CORRELATIONS
+# =============================================================================
+def page_metric_correlations(data):
+    """Correlation heatmaps and summary statistics computed from the raw tables"""
+    st.title("🔗 Metric Correlations")
+    st.markdown("How campaign metrics and customer attributes move together")
+    
+    statistics = data['metric_statistics']
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        metric_set = st.selectbox("Metrics", list(statistics))
+    with col2:
+        method = st.radio("Method", ['Pearson', 'Spearman'], horizontal=True,
+                          help="Pearson measures linear association; Spearman compares ranks, so any monotonic relationship counts")
+    
+    stats = statistics[metric_set]
+    matrix = stats[method.lower()]
+    
+    def build_heatmap():
+        fig_heatmap = px.imshow(
+            matrix.round(2),
+            text_auto=True,
+            zmin=-1,
+            zmax=1,
+            color_continuous_scale='RdBu_r',
+            aspect='auto',
+            title=f'{metric_set}: {method} Correlation'
+        )
+        fig_heatmap.update_layout(height=600)
+        return fig_heatmap
+    
+    charts = chart_tasks(data)
+    charts.submit('correlation_heatmap', build_heatmap, metric_set=metric_set, method=method)
+    
+    # Correlation Heatmap
+    st.subheader("🌡️ Correlation Matrix")
+    plotly_chart(charts['correlation_heatmap'], use_container_width=True)
+    caption = f"Computed from {stats['rows']:,} rows with every metric present"
+    if method == 'Spearman' and stats['sampled'] < stats['rows']:
+        caption += f"; ranks from a uniform sample of {stats['sampled']:,} rows"
+    st.caption(caption)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("🔝 Strongest Relationships")
+        pairs = strongest_pairs(matrix, top=8)
+        pairs.columns = ['Metric A', 'Metric B', 'Correlation']
+        st.dataframe(pairs.round(3), hide_index=True, use_container_width=True)
     
     with col2:
-        fig_journey = px.bar(journey_counts, x='Journey Path', y='Count', title='Top Customer Journey Paths')
-        st.plotly_chart(fig_journey, use_container_width=True)
+        st.subheader("📋 Summary Statistics")
+        st.dataframe(stats['summary'].round(2), use_container_width=True)
 
 # =============================================================================
 # PAGE: ML MODEL EVALUATION
@@ -501,26 +1149,133 @@ def page_ml_model_evaluation(data):
     feature_importance = data['feature_importance']
     learning_curve = data['learning_curve']
     
+    sweep = data['threshold_table']
+    
     # Model Performance Metrics
     st.subheader("📊 Model Performance Metrics")
     
+    # predicted_class in the file corresponds to a 0.5 cut-off
+    threshold = st.slider("Decision threshold", 0.0, 1.0, 0.5, 0.01,
+                          help="A lead is predicted to convert when its probability is at or above this value")
+    
     col1, col2, col3, col4 = st.columns(4)
     
-    # Calculate metrics
-    tn, fp, fn, tp = confusion_matrix(leads['actual_converted'], leads['predicted_class']).ravel()
-    accuracy = (tp + tn) / (tp + tn + fp + fn)
-    precision = tp / (tp + fp)
-    recall = tp / (tp + fn)
-    f1 = 2 * (precision * recall) / (precision + recall)
+    # Look up metrics in the precomputed threshold sweep (binary search)
+    metrics = lead_metrics(sweep, threshold)
+    accuracy = metrics['accuracy']
+    precision = metrics['precision']
+    recall = metrics['recall']
+    f1 = metrics['f1']
+    
+    # Re-scored leads: compare with the scores in the lead file at the same threshold
+    model = data.get('lead_model')
+    deltas = {}
+    if model is not None:
+        previous = lead_metrics(data['file_threshold_table'], threshold)
+        deltas = {name: (metrics[name] - previous[name]) / previous[name] * 100 if previous[name] else None
+                  for name in ('accuracy', 'precision', 'recall', 'f1')}
+    
+    # Chart builders: submitted together so independent charts are prepared concurrently
+    def build_confusion():
+        cm = confusion(metrics)
+        return px.imshow(
+            cm,
+            labels=dict(x="Predicted", y="Actual", color="Count"),
+            x=['No Conversion', 'Conversion'],
+            y=['No Conversion', 'Conversion'],
+            title='Confusion Matrix',
+            text_auto=True,
+            color_continuous_scale='Blues'
+        )
+    
+    def build_roc():
+        fpr, tpr = roc_points(sweep)
+        curve = lttb_frame(pd.DataFrame({'fpr': fpr, 'tpr': tpr}), 'fpr', ['tpr'], TIMESERIES_BUDGET)
+        
+        fig_roc = px.line(curve, x='fpr', y='tpr', title=f'ROC Curve (AUC = {roc_auc(sweep):.3f})')
+        fig_roc.add_shape(type='line', line=dict(dash='dash'), x0=0, x1=1, y0=0, y1=1)
+        # current operating point
+        negatives = sweep.attrs['negatives']
+        fig_roc.add_trace(go.Scatter(
+            x=[metrics['fp'] / negatives if negatives else 0.0], y=[metrics['recall']],
+            mode='markers', marker=dict(size=12, color='#d62728'), name=f'Threshold {threshold:.2f}'
+        ))
+        fig_roc.update_layout(xaxis_title='False Positive Rate', yaxis_title='True Positive Rate', height=400)
+        return fig_roc
+    
+    def build_pr():
+        precision_curve, recall_curve = pr_points(sweep)
+        curve = lttb_frame(pd.DataFrame({'recall': recall_curve, 'precision': precision_curve}),
+                           'recall', ['precision'], TIMESERIES_BUDGET)
+        fig_pr = px.line(curve, x='recall', y='precision',
+                         title=f'Precision-Recall Curve (AP = {average_precision(sweep):.3f})')
+        fig_pr.add_trace(go.Scatter(
+            x=[metrics['recall']], y=[metrics['precision']],
+            mode='markers', marker=dict(size=12, color='#d62728'), name=f'Threshold {threshold:.2f}'
+        ))
+        fig_pr.update_layout(xaxis_title='Recall', yaxis_title='Precision', height=400)
+        return fig_pr
+    
+    def build_sweep():
+        curve = sweep.sort_values('threshold')
+        curve = lttb_frame(curve, 'threshold', ['precision', 'recall', 'f1'], TIMESERIES_BUDGET)
+        fig_sweep = px.line(curve, x='threshold', y=['precision', 'recall', 'f1'],
+                            title='Precision, Recall and F1 vs Threshold',
+                            labels={'value': 'Score', 'variable': 'Metric'})
+        fig_sweep.add_vline(x=threshold, line_dash='dash', line_color='#d62728')
+        fig_sweep.update_layout(height=400)
+        return fig_sweep
+    
+    def build_importance():
+        fig_importance = px.bar(
+            feature_importance.sort_values('importance'),
+            x='importance',
+            y='feature',
+            error_x='importance_std',
+            title='Feature Importance Scores'
+        )
+        fig_importance.update_layout(height=400)
+        return fig_importance
+    
+    def build_learning():
+        fig_learning = px.line(
+            learning_curve,
+            x='training_size',
+            y=['train_score', 'validation_score'],
+            title='Model Performance vs Training Data Size',
+            labels={'training_size': 'Training Leads', 'value': 'Score', 'variable': 'Dataset'}
+        )
+        fig_learning.update_layout(height=400)
+        return fig_learning
+    
+    def build_probability():
+        return histogram_figure(leads, 'predicted_probability', 'Distribution of Predicted Probabilities',
+                                'Predicted Probability', 'Number of Leads')
+    
+    charts = chart_tasks(data)
+    charts.submit('confusion_matrix', build_confusion, threshold=threshold)
+    charts.submit('roc_curve', build_roc, threshold=threshold)
+    charts.submit('pr_curve', build_pr, threshold=threshold)
+    charts.submit('threshold_sweep', build_sweep, threshold=threshold)
+    charts.submit('feature_importance', build_importance)
+    charts.submit('learning_curve', build_learning)
+    charts.submit('probability_histogram', build_probability)
     
     with col1:
-        st.metric("Accuracy", f"{accuracy:.3f}", delta="+2.1%")
+        st.metric("Accuracy", f"{accuracy:.3f}", delta=format_delta(deltas.get('accuracy')))
     with col2:
-        st.metric("Precision", f"{precision:.3f}")
+        st.metric("Precision", f"{precision:.3f}", delta=format_delta(deltas.get('precision')))
     with col3:
-        st.metric("Recall", f"{recall:.3f}")
+        st.metric("Recall", f"{recall:.3f}", delta=format_delta(deltas.get('recall')))
     with col4:
-        st.metric("F1-Score", f"{f1:.3f}")
+        st.metric("F1-Score", f"{f1:.3f}", delta=format_delta(deltas.get('f1')))
+    
+    if model is not None:
+        st.caption(f"Leads re-scored by a logistic regression trained on {model['train_rows']:,} of "
+                   f"{model['labelled_rows']:,} labelled leads. Metrics and charts cover the "
+                   f"{model['holdout_rows']:,} held-out leads it never trained on (ROC AUC "
+                   f"{model['holdout_auc']:.3f}); changes are against the lead file's scores for the same leads "
+                   "at the same threshold.")
     
     st.markdown("---")
     
@@ -529,77 +1284,82 @@ def page_ml_model_evaluation(data):
     
     with col1:
         st.subheader("🎯 Confusion Matrix")
-        cm = confusion_matrix(leads['actual_converted'], leads['predicted_class'])
-        fig_cm = px.imshow(
-            cm,
-            labels=dict(x="Predicted", y="Actual", color="Count"),
-            x=['No Conversion', 'Conversion'],
-            y=['No Conversion', 'Conversion'],
-            title='Confusion Matrix',
-            text_auto=True,
-            color_continuous_scale='Blues'
-        )
-        st.plotly_chart(fig_cm, use_container_width=True)
+        plotly_chart(charts['confusion_matrix'], use_container_width=True)
     
     with col2:
         st.subheader("📈 ROC Curve")
-        fpr, tpr, _ = roc_curve(leads['actual_converted'], leads['predicted_probability'])
-        roc_auc = auc(fpr, tpr)
-        
-        fig_roc = px.line(x=fpr, y=tpr, title=f'ROC Curve (AUC = {roc_auc:.3f})')
-        fig_roc.add_shape(type='line', line=dict(dash='dash'), x0=0, x1=1, y0=0, y1=1)
-        fig_roc.update_layout(xaxis_title='False Positive Rate', yaxis_title='True Positive Rate', height=400)
-        st.plotly_chart(fig_roc, use_container_width=True)
+        plotly_chart(charts['roc_curve'], use_container_width=True)
+    
+    # Precision-Recall and threshold sweep
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("🎚️ Precision-Recall Curve")
+        plotly_chart(charts['pr_curve'], use_container_width=True)
+    
+    with col2:
+        st.subheader("📉 Metrics by Threshold")
+        plotly_chart(charts['threshold_sweep'], use_container_width=True)
     
     # Feature Importance
     st.subheader("🔝 Feature Importance (Top Features)")
-    fig_importance = px.bar(
-        feature_importance.sort_values('importance'),
-        x='importance',
-        y='feature',
-        title='Feature Importance Scores'
-    )
-    fig_importance.update_layout(height=400)
-    st.plotly_chart(fig_importance, use_container_width=True)
+    plotly_chart(charts['feature_importance'], use_container_width=True)
+    if model is not None:
+        st.caption("Permutation importance: the drop in held-out ROC AUC when a feature's values are shuffled.")
     
     # Learning Curve
     st.subheader("📚 Learning Curve")
-    fig_learning = px.line(
-        learning_curve,
-        x='data_size',
-        y=['training_score', 'validation_score'],
-        title='Model Performance vs Training Data Size',
-        labels={'x': 'Data Size', 'value': 'Score', 'variable': 'Dataset'}
-    )
-    fig_learning.update_layout(height=400)
-    st.plotly_chart(fig_learning, use_container_width=True)
+    plotly_chart(charts['learning_curve'], use_container_width=True)
+    if model is not None:
+        st.caption("Mean ROC AUC over 5 cross-validation folds at each training size.")
     
     # Prediction Distribution
     st.subheader("📊 Prediction Probability Distribution")
-    fig_dist = px.histogram(
-        leads,
-        x='predicted_probability',
-        nbins=30,
-        title='Distribution of Predicted Probabilities',
-        labels={'predicted_probability': 'Predicted Probability', 'count': 'Number of Leads'}
-    )
-    st.plotly_chart(fig_dist, use_container_width=True)
+    plotly_chart(charts['probability_histogram'], use_container_width=True)
+    st.caption(payload_caption(charts['probability_histogram'], 'leads'))
 
 # =============================================================================
 # MAIN APP
 # =============================================================================
 def main():
     """Main application entry point"""
-    # Load data
-    data = load_data()
+    if WARM_UP and SHARED_DATA:
+        start_warm_up()
+    
+    # Sidebar navigation
+    page = sidebar()
+    PROFILER.page = PAGES[page]
+    
+    with PROFILER.span('run', PAGES[page]):
+        route(page)
+    
+    if PROFILE:
+        sidebar_performance()
+        PROFILER.finish()
+
+
+def route(page):
+    """Load a page's data and render it"""
+    # Load only the data this page needs
+    with PROFILER.span('load', PAGES[page]):
+        data = load_data(PAGES[page])
     
     if data is None:
         st.stop()
     
-    # Sidebar navigation
-    page = sidebar()
+    if INCREMENTAL:
+        data = with_live_campaigns(data)
     
     # Route to appropriate page
+    with PROFILER.span('page', PAGES[page]):
+        render_page(page, data)
+    
+    sidebar_memory(data)
+    sidebar_cache_stats()
+
+
+def render_page(page, data):
+    """Call the page function for the selected page"""
     if page == "🏠 Executive Overview":
         page_executive_overview(data)
     elif page == "📈 Campaign Analytics":
@@ -612,6 +1372,8 @@ def main():
         page_geographic_analysis(data)
     elif page == "🎯 Attribution & Funnel":
         page_attribution_funnel(data)
+    elif page == "🔗 Metric Correlations":
+        page_metric_correlations(data)
     elif page == "🤖 ML Model Evaluation":
         page_ml_model_evaluation(data)
 
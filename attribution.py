@@ -0,0 +1,183 @@
+"""
+NovaMart Attribution
+=============================================
+Multi-touch attribution computed from customer journey paths.
+
+Each path is a sequence of touchpoints ending in a conversion
+('Purchase') or a drop-out ('Exit'), with the number of customers who
+took it. Paths are encoded once as a padded integer matrix (one row per
+distinct path, -1 after the last touch), so every model below is a
+weighted bincount over that matrix:
+
+- first_touch / last_touch: all credit to the first / last touch;
+- linear: equal credit to every touch;
+- time_decay: credit halves for every step further from the conversion;
+- position_based: 40% first, 40% last, 20% shared by the middle touches;
+- markov: first-order Markov chain removal effect. Transitions between
+  touches are counted from the paths; removing a channel sends its
+  inbound traffic to drop-out, and its credit is the resulting fall in
+  conversion probability. All channels are removed in one batched
+  linear solve.
+
+Credit is expressed in converting customers, so every model's column
+sums to the number of conversions.
+"""
+
+import numpy as np
+import pandas as pd
+
+CONVERSION = 'Purchase'
+DROPOUT = 'Exit'
+MODELS = ['first_touch', 'last_touch', 'linear', 'time_decay', 'position_based', 'markov']
+
+
+class PathSet:
+    """Journey paths encoded as a padded integer matrix with counts and outcomes"""
+
+    def __init__(self, codes, counts, converted, channels):
+        self.codes = np.asarray(codes, dtype='int32')
+        self.counts = np.asarray(counts, dtype='float64')
+        self.converted = np.asarray(converted, dtype=bool)
+        self.channels = list(channels)
+        self.lengths = (self.codes >= 0).sum(axis=1)
+        # flat (row, position, channel) of every touch
+        self._row, self._pos = np.nonzero(self.codes >= 0)
+        self._touch = self.codes[self._row, self._pos]
+
+    @classmethod
+    def from_journey(cls, journey, count_col='customer_count', conversion=CONVERSION, dropout=DROPOUT):
+        """Encode a journey table with touchpoint_1..N columns and a count column"""
+        touch_cols = sorted((c for c in journey.columns if c.startswith('touchpoint_')),
+                            key=lambda c: int(c.rsplit('_', 1)[1]))
+        # factorize column by column (cheap for categoricals), then merge the vocabularies
+        uniques = pd.Index([])
+        columns = []
+        for col in touch_cols:
+            col_codes, col_uniques = pd.factorize(journey[col])
+            uniques = uniques.append(pd.Index(col_uniques).difference(uniques))
+            lookup = np.append(uniques.get_indexer(col_uniques), -1)
+            columns.append(lookup[col_codes])
+        cell_codes = np.column_stack(columns) if columns else np.empty((len(journey), 0), dtype='int64')
+        uniques = uniques.to_numpy()
+
+        # map factorized values to channel codes; terminals and blanks become -1
+        is_channel = ~pd.Index(uniques).isin([conversion, dropout, ''])
+        channels = list(uniques[is_channel])
+        lookup = np.full(len(uniques) + 1, -1, dtype='int32')
+        lookup[:-1][is_channel] = np.arange(len(channels))
+        codes = lookup[cell_codes]  # -1 (missing) indexes the trailing -1
+
+        # a path stops at its first terminal; shift the remaining touches left
+        terminal = (cell_codes >= 0) & ~is_channel[np.maximum(cell_codes, 0)]
+        codes[np.cumsum(terminal, axis=1) > 0] = -1
+        order = np.argsort(codes < 0, axis=1, kind='stable')
+        codes = np.take_along_axis(codes, order, axis=1)
+
+        conv_code = np.flatnonzero(pd.Index(uniques) == conversion)
+        converted = (cell_codes == conv_code[0]).any(axis=1) if len(conv_code) else np.zeros(len(journey), bool)
+        return cls(codes, journey[count_col].to_numpy(), converted, channels)
+
+    def __len__(self):
+        return len(self.codes)
+
+    # -------------------------------------------------------------------------
+    def heuristic(self, model, half_life=1.0):
+        """Credit per channel under a rule-based model"""
+        row, pos, touch = self._row, self._pos, self._touch
+        length = self.lengths[row]
+        if model == 'first_touch':
+            weights = (pos == 0).astype('float64')
+        elif model == 'last_touch':
+            weights = (pos == length - 1).astype('float64')
+        elif model == 'linear':
+            weights = 1 / length
+        elif model == 'time_decay':
+            decay = 0.5 ** (1 / half_life)
+            # normalise by the geometric series sum over the path length
+            weights = decay ** (length - 1 - pos) * (1 - decay) / (1 - decay ** length)
+        elif model == 'position_based':
+            ends = (pos == 0) | (pos == length - 1)
+            weights = np.select(
+                [length == 1, length == 2, ends],
+                [1.0, 0.5, 0.4],
+                default=0.2 / np.maximum(length - 2, 1),
+            )
+        else:
+            raise ValueError(f"Unknown attribution model: {model}")
+        converting = (self.counts * self.converted)[row]
+        return np.bincount(touch, weights=weights * converting, minlength=len(self.channels))
+
+    # -------------------------------------------------------------------------
+    def transitions(self):
+        """Weighted transition counts: (channel x channel, start row, to-conversion, to-dropout)"""
+        k = len(self.channels)
+        counts = self.counts
+        has_touch = self.lengths > 0
+
+        start = np.bincount(self.codes[has_touch, 0], weights=counts[has_touch], minlength=k)
+        src, dst = self.codes[:, :-1], self.codes[:, 1:]
+        step = dst >= 0
+        pair_weights = np.broadcast_to(counts[:, None], src.shape)[step]
+        between = np.bincount(src[step] * k + dst[step], weights=pair_weights, minlength=k * k).reshape(k, k)
+
+        last = self.codes[has_touch, self.lengths[has_touch] - 1]
+        to_conv = np.bincount(last, weights=(counts * self.converted)[has_touch], minlength=k)
+        to_drop = np.bincount(last, weights=(counts * ~self.converted)[has_touch], minlength=k)
+        return between, start, to_conv, to_drop
+
+    def conversion_probability(self):
+        """P(conversion) from the start state, and the same with each channel removed"""
+        between, start, to_conv, to_drop = self.transitions()
+        k = len(self.channels)
+        # transient states: channels 0..k-1 and start (k)
+        direct_conv = float((self.counts * self.converted)[self.lengths == 0].sum())
+        direct_drop = float((self.counts * ~self.converted)[self.lengths == 0].sum())
+        flows = np.zeros((k + 1, k + 1))
+        flows[:k, :k] = between
+        flows[k, :k] = start
+        conv = np.r_[to_conv, direct_conv]
+        out = flows.sum(axis=1) + conv + np.r_[to_drop, direct_drop]
+        out[out == 0] = 1.0
+        q = flows / out[:, None]
+        r = conv / out
+
+        eye = np.eye(k + 1)
+        base = np.linalg.solve(eye - q, r)[k]
+        # removing channel j: every transition into j goes to drop-out instead
+        removed = np.broadcast_to(q, (k, k + 1, k + 1)).copy()
+        removed[np.arange(k), :, np.arange(k)] = 0.0
+        without = np.linalg.solve(eye - removed, np.broadcast_to(r, (k, k + 1))[..., None])[:, k, 0]
+        return base, without
+
+    def markov(self):
+        """Credit per channel from the Markov removal effect, scaled to total conversions"""
+        base, without = self.conversion_probability()
+        effect = np.clip(1 - without / base, 0, None) if base > 0 else np.zeros(len(self.channels))
+        total = float((self.counts * self.converted)[self.lengths > 0].sum())
+        return effect / effect.sum() * total if effect.sum() > 0 else effect
+
+    def attribution(self, models=MODELS):
+        """Per-channel credit (converting customers) under every model"""
+        table = pd.DataFrame({'channel': self.channels})
+        for model in models:
+            table[model] = self.markov() if model == 'markov' else self.heuristic(model)
+        return table
+
+    def labels(self, sep=' → '):
+        """Human-readable path strings ending in the outcome"""
+        names = np.array(self.channels + [''], dtype=object)
+        parts = names[self.codes]  # -1 picks the trailing ''
+        outcome = np.where(self.converted, CONVERSION, DROPOUT).astype(object)
+        labels = pd.Series(parts[:, 0])
+        for i in range(1, parts.shape[1]):
+            column = pd.Series(parts[:, i])
+            labels = labels.where(column == '', labels + sep + column)
+        return (labels + sep + outcome).str.lstrip(sep)
+
+    def top_paths(self, n=10):
+        """The n most travelled paths (identical rows merged) with their customer counts"""
+        keys = pd.DataFrame(self.codes).assign(converted=self.converted)
+        totals = pd.Series(self.counts).groupby([keys[c] for c in keys.columns], sort=False).sum().nlargest(n)
+        index = totals.index.to_frame(index=False)
+        top = PathSet(index.iloc[:, :-1].to_numpy(), totals.to_numpy(), index['converted'].to_numpy(), self.channels)
+        return pd.DataFrame({'path': top.labels().to_numpy(), 'count': totals.to_numpy()})
@@ -0,0 +1,91 @@
+"""
+Attribution engine timing over millions of journey paths.
+
+Builds a random journey table (touchpoint_1..N plus customer_count),
+times the path encoding and every attribution model, and checks the
+batched Markov removal effect against a plain per-channel value
+iteration on a small sample.
+
+Run: python benchmarks/attribution_paths.py [--paths 1000000 3000000] [--touches 6]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attribution import MODELS, PathSet  # noqa: E402
+
+CHANNELS = ['Paid Search', 'Social Media', 'Organic Search', 'Email', 'Website', 'Retargeting', 'Referral',
+            'Direct', 'Display', 'Affiliate', 'SMS', 'Push']
+
+
+def random_journeys(n, touches, seed=0):
+    """n journeys of 1..touches channel touches followed by Purchase or Exit"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, touches + 1, n)
+    cells = np.array(CHANNELS, dtype=object)[rng.integers(0, len(CHANNELS), (n, touches + 1))]
+    # conversion is more likely on longer paths that include Email or Retargeting
+    boost = ((cells == 'Email') | (cells == 'Retargeting')).sum(axis=1)
+    outcome = np.where(rng.random(n) < 0.15 + 0.05 * lengths + 0.1 * boost, 'Purchase', 'Exit')
+    pos = np.arange(touches + 1)
+    cells = np.where(pos < lengths[:, None], cells, '')
+    cells[np.arange(n), lengths] = outcome
+    journey = pd.DataFrame({f"touchpoint_{i + 1}": cells[:, i] for i in range(touches + 1)})
+    journey['customer_count'] = rng.integers(1, 200, n)
+    return journey
+
+
+def reference_removal(paths):
+    """Conversion probability with each channel removed, by value iteration on a dict graph"""
+    graph = defaultdict(lambda: defaultdict(float))
+    for codes, count, converted in zip(paths.codes, paths.counts, paths.converted):
+        states = ['start'] + [paths.channels[c] for c in codes if c >= 0] + ['conv' if converted else 'null']
+        for a, b in zip(states, states[1:]):
+            graph[a][b] += count
+
+    def solve(removed):
+        p = defaultdict(float, conv=1.0)
+        for _ in range(200):
+            for state, edges in graph.items():
+                total = sum(edges.values())
+                p[state] = sum(w / total * (0.0 if b == removed else p[b]) for b, w in edges.items())
+        return p['start']
+
+    return solve(None), np.array([solve(c) for c in paths.channels])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--paths', type=int, nargs='+', default=[1_000_000, 3_000_000])
+    parser.add_argument('--touches', type=int, default=6, help="maximum touches before the outcome")
+    args = parser.parse_args()
+
+    sample = PathSet.from_journey(random_journeys(2000, args.touches, seed=1))
+    base, without = sample.conversion_probability()
+    ref_base, ref_without = reference_removal(sample)
+    error = max(abs(base - ref_base), np.abs(without - ref_without).max())
+    print(f"markov removal vs value iteration: max abs diff {error:.2e} ({'ok' if error < 1e-9 else 'MISMATCH'})")
+
+    print(f"{'paths':>12}{'encode (s)':>12}" + ''.join(f"{m:>16}" for m in MODELS))
+    for n in args.paths:
+        journey = random_journeys(n, args.touches)
+        start = time.perf_counter()
+        paths = PathSet.from_journey(journey)
+        encode = time.perf_counter() - start
+        timings = []
+        for model in MODELS:
+            start = time.perf_counter()
+            paths.markov() if model == 'markov' else paths.heuristic(model)
+            timings.append(time.perf_counter() - start)
+        print(f"{n:>12,}{encode:>12.2f}" + ''.join(f"{t:>16.3f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
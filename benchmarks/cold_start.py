@@ -0,0 +1,65 @@
+"""
+Cold-start timing per page for the Parquet and CSV backends.
+
+Each measurement runs in a fresh interpreter so nothing is shared between
+runs. The "all tables (csv)" row is what the old load_data() paid on the
+first request regardless of the page opened.
+
+Run: python benchmarks/cold_start.py [--repeat 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import data_store  # noqa: E402
+
+CHILD = """
+import sys, time
+sys.path.insert(0, {root!r})
+import data_store
+start = time.perf_counter()
+if {page!r} == '*':
+    for name in data_store.DATASETS:
+        data_store.load_table(name, backend={backend!r})
+else:
+    data_store.load_page_data({page!r}, backend={backend!r})
+print(time.perf_counter() - start)
+"""
+
+
+def time_cold(page, backend, repeat):
+    """Median load time of a page in fresh interpreters, in milliseconds"""
+    code = CHILD.format(root=ROOT, page=page, backend=backend)
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip()) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if data_store.HAS_PYARROW:
+        data_store.convert_all()
+    else:
+        print("pyarrow not installed: the parquet column falls back to CSV")
+
+    print(f"{'page':<24}{'parquet (ms)':>14}{'csv (ms)':>12}{'speedup':>10}")
+    for page in list(data_store.PAGE_TABLES) + ['*']:
+        parquet_ms = time_cold(page, 'parquet', args.repeat)
+        csv_ms = time_cold(page, 'csv', args.repeat)
+        label = 'all tables' if page == '*' else page
+        print(f"{label:<24}{parquet_ms:>14.1f}{csv_ms:>12.1f}{csv_ms / parquet_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Streaming correlation statistics vs loading whole tables, with parity and peak memory.
+
+Generates synthetic campaigns and customers at the chosen scale (see
+synthetic.py) and computes the correlation page's metric sets in a fresh
+interpreter per mode:
+
+- load: the table's metric columns loaded whole, then DataFrame.corr
+  (Pearson and Spearman) and describe-style summaries;
+- stream: correlation.table_moments folding Parquet row groups (or CSV
+  blocks) one at a time, in one process or split across --workers.
+
+Pearson matrices and summaries must match the full load to 1e-9. Spearman
+is exact while the complete rows fit in the rank sample; above that the
+largest deviation from the exact matrix is reported (and must stay under
+0.01). The parity checks run at a small scale under pytest in
+tests/test_correlation.py.
+
+Run: python benchmarks/correlation_stream.py [--scale 200] [--source parquet|csv] [--workers 4]
+"""
+
+import argparse
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CHILD = """
+import pickle, resource, sys, time
+sys.path.insert(0, {root!r})
+import pandas as pd
+from correlation import METRIC_SETS, table_moments
+from data_store import load_table
+results, timings = {{}}, {{}}
+for title, (name, labels) in METRIC_SETS.items():
+    columns = list(labels)
+    start = time.perf_counter()
+    if {mode!r} == 'load':
+        frame = load_table(name, columns, backend={source!r})[columns].astype('float64')
+        complete = frame.dropna()
+        summary = pd.DataFrame({{'count': frame.count(), 'mean': frame.mean(), 'std': frame.std(),
+                                'min': frame.min(), 'max': frame.max()}})
+        results[title] = (complete.corr(), complete.corr(method='spearman'), summary, len(complete), len(complete))
+    else:
+        acc = table_moments(name, columns, backend={source!r}, workers={workers})
+        summary = acc.summary()[['count', 'mean', 'std', 'min', 'max']]
+        results[title] = (acc.pearson(), acc.spearman(), summary, acc.n, len(acc.sample))
+    timings[title] = time.perf_counter() - start
+try:
+    with open('/proc/self/status') as f:
+        peak = next(int(line.split()[1]) for line in f if line.startswith('VmHWM')) / 1024
+except OSError:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+with open({out!r}, 'wb') as f:
+    pickle.dump((results, timings, peak), f)
+"""
+
+CONVERT = """
+import sys
+sys.path.insert(0, {root!r})
+import data_store
+for name in ('campaigns', 'customers'):
+    data_store.convert(name)
+"""
+
+
+def run_child(code, data_dir):
+    env = dict(os.environ, NOVAMART_DATA_DIR=data_dir)
+    subprocess.run([sys.executable, '-c', code], env=env, check=True)
+
+
+def max_diff(expected, actual):
+    return float(np.nanmax(np.abs(expected.to_numpy('float64') - actual.loc[expected.index, expected.columns].to_numpy('float64'))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', type=float, default=200, help="synthetic scale factor (1 = sample size)")
+    parser.add_argument('--source', choices=['parquet', 'csv'], default='parquet')
+    parser.add_argument('--workers', type=int, default=4, help="processes for the parallel streaming run")
+    parser.add_argument('--data-dir', help="reuse an existing data directory instead of generating one")
+    args = parser.parse_args()
+
+    modes = {'load': 1, 'stream': 1, f"stream x{args.workers}": args.workers}
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir
+        if data_dir is None:
+            import synthetic
+            data_dir = os.path.join(tmp, 'data')
+            rows = synthetic.write_all(data_dir, scale=args.scale, tables=['campaigns', 'customers'])
+            print(f"generated {rows['campaigns']:,} campaign rows and {rows['customers']:,} customers")
+        if args.source == 'parquet':
+            run_child(CONVERT.format(root=ROOT), data_dir)
+
+        reports = {}
+        for mode, workers in modes.items():
+            out = os.path.join(tmp, f"{len(reports)}.pkl")
+            code = CHILD.format(root=ROOT, mode=mode.split()[0], source=args.source, workers=workers, out=out)
+            run_child(code, data_dir)
+            with open(out, 'rb') as f:
+                reports[mode] = pickle.load(f)
+
+    reference = reports['load'][0]
+    failures = 0
+    print(f"\n{'metric set':<22}" + ''.join(f"{m + ' (ms)':>18}" for m in reports)
+          + f"{'pearson':>10}{'spearman':>10}{'summary':>10}{'sampled':>12}")
+    for title, (pearson, spearman, summary, complete, _) in reference.items():
+        row = ''.join(f"{reports[m][1][title] * 1000:>18.1f}" for m in reports)
+        worst = {'pearson': 0.0, 'spearman': 0.0, 'summary': 0.0}
+        sampled = complete
+        for mode in list(reports)[1:]:
+            got = reports[mode][0][title]
+            worst['pearson'] = max(worst['pearson'], max_diff(pearson, got[0]))
+            worst['spearman'] = max(worst['spearman'], max_diff(spearman, got[1]))
+            scale = summary.abs().where(summary.abs() > 1, 1)
+            worst['summary'] = max(worst['summary'], max_diff(summary / scale, got[2] / scale))
+            sampled = got[4]
+        exact = sampled >= complete
+        ok = worst['pearson'] < 1e-9 and worst['summary'] < 1e-9 and worst['spearman'] < (1e-9 if exact else 0.01)
+        failures += not ok
+        print(f"{title:<22}{row}{worst['pearson']:>10.1e}{worst['spearman']:>10.1e}{worst['summary']:>10.1e}"
+              f"{sampled:>12,}{'' if ok else '  MISMATCH'}")
+    print(f"{'peak RSS (MB)':<22}" + ''.join(f"{reports[m][2]:>18.0f}" for m in reports))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Accuracy and payload of the pre-binned histogram and box-plot statistics.
+
+For several distributions (integer ages, log-normal incomes,
+probabilities in [0, 1] with point masses), the script checks that:
+
+- chunked and partition-merged histograms equal np.histogram on the same
+  edges, exactly;
+- box_stats matches np.quantile and brute-force Tukey whiskers, exactly;
+- the t-digest quantiles and the merged BoxSketch stay within a small
+  rank error of the exact values, and its whiskers and outlier counts
+  stay close.
+
+It then compares the payload of px.histogram / px.box on the raw rows
+with the payload of the pre-binned figures. The accuracy checks also run
+on 200k rows under pytest in tests/test_distributions.py.
+
+Run: python benchmarks/distribution_stats.py [--rows 1000000] [--partitions 16]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from distributions import BoxSketch, QuantileDigest, box_stats, histogram, merge_histograms  # noqa: E402
+from figure_cache import figure_size  # noqa: E402
+
+QUANTILES = [0.001, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 0.999]
+KEYS = ['q1', 'median', 'q3', 'lowerfence', 'upperfence']
+
+
+def datasets(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    probability = rng.beta(2, 8, rows)
+    probability[rng.random(rows) < 0.02] = 1.0  # point mass, as in churn_probability
+    return {
+        'age (int)': rng.integers(18, 75, rows),
+        'income (lognormal)': rng.lognormal(11, 0.6, rows).round(),
+        'probability': probability,
+    }
+
+
+def exact_box(values):
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {'q1': q1, 'median': median, 'q3': q3, 'lowerfence': inside.min(), 'upperfence': inside.max(),
+            'outlier_count': len(values) - len(inside)}
+
+
+def rank_error(sorted_values, estimates, quantiles):
+    """Largest |rank(estimate) - q| over the quantiles, as a share of rows"""
+    lo = np.searchsorted(sorted_values, estimates, side='left') / len(sorted_values)
+    hi = np.searchsorted(sorted_values, estimates, side='right') / len(sorted_values)
+    q = np.asarray(quantiles)
+    # inside a run of ties any rank in [lo, hi] is correct
+    return float(np.max(np.clip(lo - q, 0, None) + np.clip(q - hi, 0, None)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--partitions', type=int, default=16)
+    args = parser.parse_args()
+
+    failures = 0
+    for name, values in datasets(args.rows).items():
+        parts = np.array_split(values, args.partitions)
+        print(f"== {name}, {len(values):,} rows, {args.partitions} partitions")
+
+        hist = histogram(values, chunk_rows=100_000)
+        edges = np.r_[hist['left'].to_numpy(), hist['right'].to_numpy()[-1]]
+        merged = merge_histograms(*(histogram(p, edges=edges) for p in parts))
+        reference = np.histogram(values, bins=edges)[0]
+        ok = (hist['count'].to_numpy() == reference).all() and (merged['count'].to_numpy() == reference).all()
+        ok = ok and hist['count'].sum() == len(values)
+        failures += not ok
+        print(f"histogram ({len(hist)} bins): chunked and merged equal np.histogram: {'ok' if ok else 'MISMATCH'}")
+
+        exact = exact_box(values.astype('float64'))
+        stats = box_stats(values)
+        ok = all(stats[k] == exact[k] for k in KEYS + ['outlier_count'])
+        failures += not ok
+        print(f"box_stats equals np.quantile / brute-force whiskers: {'ok' if ok else 'MISMATCH'}")
+
+        sorted_values = np.sort(values)
+        digest = QuantileDigest()
+        sketch = BoxSketch()
+        for part in parts:
+            digest.merge(QuantileDigest().update(part))
+            sketch.merge(BoxSketch().update(part))
+        error = rank_error(sorted_values, digest.quantile(QUANTILES), QUANTILES)
+        print(f"t-digest ({len(digest.means)} centroids) max rank error: {error:.5f}")
+        merged_stats = sketch.stats()
+        for key in KEYS:
+            print(f"  {key:<11} exact {exact[key]:>14,.4f}  sketch {merged_stats[key]:>14,.4f}")
+        print(f"  {'outliers':<11} exact {exact['outlier_count']:>14,}  sketch {merged_stats['outlier_count']:>14,}")
+        failures += error > 0.005
+
+        frame = pd.DataFrame({'value': values})
+        raw_hist = figure_size(px.histogram(frame, x='value', nbins=30))
+        binned = figure_size(go.Figure(go.Bar(x=(hist['left'] + hist['right']) / 2, y=hist['count'])))
+        raw_box = figure_size(px.box(frame, y='value'))
+        box_payload = figure_size(go.Figure(go.Box(q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+                                                   lowerfence=[stats['lowerfence']],
+                                                   upperfence=[stats['upperfence']]))) + 16 * len(stats['outliers'])
+        print(f"payload: histogram {raw_hist / 1e6:,.1f} MB -> {binned / 1e3:,.1f} KB, "
+              f"box {raw_box / 1e6:,.1f} MB -> {box_payload / 1e3:,.1f} KB\n")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Figure payload before and after downsampling.
+
+Builds the Income vs LTV scatter and the Revenue vs Spend trend from
+synthetic data at full resolution and through downsample.py, and prints
+the JSON payload each would send to the browser.
+
+Run: python benchmarks/downsampling.py [--customers 1000000] [--days 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downsample import bin_2d, density_sample, lttb_frame  # noqa: E402
+from figure_cache import figure_size  # noqa: E402
+
+SEGMENTS = ['Premium', 'Regular', 'Budget', 'Occasional']
+
+
+def synthetic_customers(rows, seed=0):
+    """Income / LTV pairs with a segment-dependent correlation"""
+    rng = np.random.default_rng(seed)
+    segment = rng.integers(0, len(SEGMENTS), rows)
+    income = rng.lognormal(11.2, 0.5, rows)
+    ltv = income * (0.1 + 0.1 * segment) * rng.lognormal(0, 0.4, rows)
+    return pd.DataFrame({
+        'income': income.round(),
+        'lifetime_value': ltv.round(),
+        'customer_segment': pd.Categorical.from_codes(segment, SEGMENTS),
+        'total_purchases': rng.integers(1, 200, rows),
+    })
+
+
+def synthetic_daily(days, seed=0):
+    """Noisy seasonal revenue and spend series"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    spend = 50000 + 20000 * np.sin(t / 58) + rng.normal(0, 5000, days)
+    revenue = spend * (3 + np.sin(t / 180)) + rng.normal(0, 20000, days)
+    return pd.DataFrame({'date': pd.date_range('1990-01-01', periods=days, freq='D'),
+                         'revenue': revenue, 'spend': spend})
+
+
+def scatter(frame):
+    return px.scatter(frame, x='income', y='lifetime_value', color='customer_segment', size='total_purchases')
+
+
+def trend(frame):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=frame['date'], y=frame['revenue'], name='Revenue'))
+    fig.add_trace(go.Bar(x=frame['date'], y=frame['spend'], name='Spend'))
+    return fig
+
+
+def report(label, points, build):
+    start = time.perf_counter()
+    size = figure_size(build())
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{label:<34}{points:>12,}{size / 1e6:>14.2f}{elapsed:>12.0f}")
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--customers', type=int, default=1_000_000)
+    parser.add_argument('--days', type=int, default=100_000)
+    parser.add_argument('--budget', type=int, default=5000)
+    parser.add_argument('--series-budget', type=int, default=1000)
+    args = parser.parse_args()
+
+    customers = synthetic_customers(args.customers)
+    daily = synthetic_daily(args.days)
+
+    print(f"{'figure':<34}{'points':>12}{'payload (MB)':>14}{'build (ms)':>12}")
+    full = report('scatter: full resolution', len(customers), lambda: scatter(customers))
+    rows = density_sample(customers['income'], customers['lifetime_value'], args.budget,
+                          groups=customers['customer_segment'])
+    sampled = report('scatter: density sample', len(rows), lambda: scatter(customers.iloc[rows]))
+
+    def binned():
+        x, y, counts = bin_2d(customers['income'], customers['lifetime_value'])
+        return go.Figure(go.Heatmap(x=x, y=y, z=counts.T))
+    cells = report('scatter: binned density', 60 * 60, binned)
+
+    series_full = report('trend: full resolution', len(daily), lambda: trend(daily))
+    reduced = lttb_frame(daily, 'date', ['revenue', 'spend'], args.series_budget)
+    series_lttb = report('trend: LTTB', len(reduced), lambda: trend(reduced))
+
+    print()
+    print(f"scatter reduction: {full / sampled:.0f}x sampled, {full / cells:.0f}x binned")
+    print(f"trend reduction:   {series_full / series_lttb:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Campaign filter benchmark: boolean masks vs FilterIndex.
+
+Builds a synthetic campaign frame, then runs the same filter both ways.
+The mask path is what page_campaign_analytics used before, including the
+per-row .dt.date conversion. Results are checked for equality.
+
+Run: python benchmarks/filters.py [--rows 1000000 10000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filter_engine import FilterIndex  # noqa: E402
+
+CHANNELS = ['Google Ads', 'Facebook', 'Instagram', 'LinkedIn', 'Email', 'YouTube', 'Affiliate', 'Twitter']
+CAMPAIGN_TYPES = ['Brand Awareness', 'Lead Generation', 'Retargeting', 'Seasonal Sale', 'Product Launch']
+
+
+def synthetic_campaigns(rows, seed=0):
+    """Random campaign rows spread over 2023-2024"""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range('2023-01-01', '2024-12-31', freq='D')
+    return pd.DataFrame({
+        'date': days[rng.integers(0, len(days), rows)],
+        'channel': pd.Categorical.from_codes(rng.integers(0, len(CHANNELS), rows), CHANNELS),
+        'campaign_type': pd.Categorical.from_codes(rng.integers(0, len(CAMPAIGN_TYPES), rows), CAMPAIGN_TYPES),
+        'spend': rng.random(rows) * 1000,
+    })
+
+
+def mask_filter(df, channels, campaign_types, start, end):
+    """The original page filter"""
+    return df[
+        (df['channel'].isin(channels)) &
+        (df['campaign_type'].isin(campaign_types)) &
+        (df['date'].dt.date >= start) &
+        (df['date'].dt.date <= end)
+    ]
+
+
+def timed(fn, repeat=3):
+    """Best-of-n wall time in ms and the last result"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    channels, campaign_types = CHANNELS[:5], CAMPAIGN_TYPES[1:4]
+    start, end = date(2023, 10, 1), date(2024, 3, 31)
+
+    print(f"{'rows':>12}{'build (ms)':>12}{'mask (ms)':>12}{'index (ms)':>12}{'speedup':>10}")
+    for rows in args.rows:
+        df = synthetic_campaigns(rows)
+        build_ms, index = timed(lambda: FilterIndex(df), repeat=1)
+
+        mask_ms, expected = timed(lambda: mask_filter(df, channels, campaign_types, start, end))
+        index_ms, actual = timed(lambda: index.filter(start, end, channel=channels, campaign_type=campaign_types))
+
+        expected = expected.sort_values(['date', 'spend']).reset_index(drop=True)
+        actual = actual.sort_values(['date', 'spend']).reset_index(drop=True)
+        pd.testing.assert_frame_equal(expected, actual)
+
+        print(f"{rows:>12,}{build_ms:>12.1f}{mask_ms:>12.1f}{index_ms:>12.1f}{mask_ms / index_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Spatial grid build time, exactness and map payload at millions of customers.
+
+Geocodes synthetic customers (synthetic.geocode) and builds the cell
+pyramid. Every level is checked against a direct group-by of the raw
+points at that level (customers, summed lifetime value and mean
+satisfaction must match exactly). It then times a few map views and
+compares the payload of a scatter of raw points with the binned cells.
+The same exactness check runs on 20k customers under pytest in
+tests/test_geo_grid.py.
+
+Run: python benchmarks/geo_grid.py [--rows 1000000 10000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic  # noqa: E402
+from figure_cache import figure_size  # noqa: E402
+from geo_grid import DETAIL_LEVELS, GeoGrid, bounds_by, tile_xy  # noqa: E402
+
+REGIONS = ['North', 'South', 'East', 'West', 'Central']
+
+
+def points(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    regions = np.asarray(REGIONS, dtype=object)[rng.integers(0, len(REGIONS), rows)]
+    tiers = np.asarray(['Tier 1', 'Tier 2', 'Tier 3'], dtype=object)[rng.integers(0, 3, rows)]
+    frame = synthetic.geocode(rng, np.arange(rows), regions, tiers)
+    frame['lifetime_value'] = rng.lognormal(9.5, 1.0, rows).round()
+    frame['satisfaction_score'] = np.where(rng.random(rows) < 0.01, np.nan, rng.normal(3.4, 0.55, rows).round(2))
+    return frame
+
+
+def reference(frame, level):
+    """Direct group-by of the raw points at one level"""
+    x, y = tile_xy(frame['latitude'], frame['longitude'], level)
+    grouped = frame.assign(x=x, y=y).groupby(['x', 'y'])
+    return pd.DataFrame({
+        'customers': grouped.size(),
+        'lifetime_value': grouped['lifetime_value'].sum(),
+        'satisfaction_score': grouped['satisfaction_score'].mean(),
+    })
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    failures = 0
+    for rows in args.rows:
+        frame = points(rows)
+        grid, build_s = timed(lambda: GeoGrid(frame, sums=('lifetime_value',), means=('satisfaction_score',)))
+        print(f"== {rows:,} customers: pyramid of {len(grid.levels)} levels built in {build_s:.2f} s "
+              f"({rows / build_s:,.0f} rows/s)")
+
+        for level in (grid.min_level, 6, 9, 12, grid.max_level):
+            cells = grid.cells(level).set_index(['x', 'y']).sort_index()
+            expected = reference(frame, level).sort_index()
+            ok = cells.index.equals(expected.index)
+            ok = ok and (cells['customers'].to_numpy() == expected['customers'].to_numpy()).all()
+            ok = ok and np.allclose(cells['lifetime_value'], expected['lifetime_value'], rtol=1e-12)
+            ok = ok and np.allclose(cells['satisfaction_score'], expected['satisfaction_score'], rtol=1e-12,
+                                    equal_nan=True)
+            failures += not ok
+            print(f"level {level:>2}: {len(cells):>9,} cells, equal to a direct group-by: {'ok' if ok else 'MISMATCH'}")
+
+        states = bounds_by(frame, 'state')
+        cities = bounds_by(frame, ['state', 'city'])
+        views = {
+            'all states, auto': ((states['lat_min'].min(), states['lat_max'].max(),
+                                  states['lon_min'].min(), states['lon_max'].max()), None),
+            'Maharashtra, auto': (tuple(states.loc['Maharashtra']), None),
+            'Pune, auto': (tuple(cities.loc[('Maharashtra', 'Pune')]), None),
+            'Pune, street': (tuple(cities.loc[('Maharashtra', 'Pune')]), DETAIL_LEVELS['Street']),
+        }
+        for name, (bounds, level) in views.items():
+            (shown, cells), view_s = timed(lambda: grid.view(bounds, level=level))
+            print(f"view {name:<18} level {shown:>2}, {len(cells):>5,} cells in {view_s * 1000:6.1f} ms")
+
+        sample = frame.sample(min(rows, 100_000), random_state=0)
+        raw = figure_size(px.scatter_map(sample, lat='latitude', lon='longitude')) * rows / len(sample)
+        _, cells = grid.view(views['all states, auto'][0])
+        binned = figure_size(px.scatter_map(cells, lat='latitude', lon='longitude', size='lifetime_value',
+                                            color='satisfaction_score', hover_data=['customers']))
+        print(f"payload: raw points ≈ {raw / 1e6:,.1f} MB -> cells {binned / 1e3:,.1f} KB\n")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
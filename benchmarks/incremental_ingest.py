@@ -0,0 +1,98 @@
+"""
+Incremental ingestion check: appended rows vs a full reload.
+
+Copies campaign_performance.csv into a temporary directory, starts a
+CampaignIngestor on the first part of it, then appends the remaining
+rows in batches (to the CSV, and as delta files written aside and
+renamed into a drop directory, read without a settle delay). After
+every poll the in-memory frame and rollup must equal a full reload of
+everything written so far. Poll and full-reload times are printed side
+by side. The same check runs on the sample file under pytest in
+tests/test_ingest.py.
+
+Run: python benchmarks/incremental_ingest.py [--tile 20] [--batches 5]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_store import csv_path  # noqa: E402
+from ingest import CATEGORICAL, COLUMNS, CampaignIngestor  # noqa: E402
+from rollup import DIMENSIONS, build_campaign_rollup  # noqa: E402
+
+
+def full_reload(path, drop_dir):
+    """Reference: parse the CSV and every delta file from scratch"""
+    frames = [pd.read_csv(path, usecols=COLUMNS, parse_dates=['date'])[COLUMNS]]
+    for name in sorted(os.listdir(drop_dir)):
+        frames.append(pd.read_csv(os.path.join(drop_dir, name), usecols=COLUMNS, parse_dates=['date'])[COLUMNS])
+    campaigns = pd.concat(frames, ignore_index=True)
+    return campaigns, build_campaign_rollup(campaigns)
+
+
+def normalized(df, keys):
+    """Plain-dtype frame sorted by keys, for comparison"""
+    df = df.astype({c: object for c in CATEGORICAL})
+    return df.sort_values(keys, kind='stable').reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tile', type=int, default=20, help="repeat the sample rows this many times")
+    parser.add_argument('--batches', type=int, default=5)
+    args = parser.parse_args()
+
+    source = pd.read_csv(csv_path('campaigns'))
+    source = pd.concat([source] * args.tile, ignore_index=True).sort_values('date', kind='stable')
+    split = int(len(source) * 0.9)
+    base, rest = source.iloc[:split], source.iloc[split:]
+    batches = [rest.iloc[i::args.batches] for i in range(args.batches)]
+
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, 'campaign_performance.csv')
+        drop_dir = os.path.join(workdir, 'incoming')
+        os.makedirs(drop_dir)
+        base.to_csv(path, index=False)
+        ingestor = CampaignIngestor(path, drop_dir=drop_dir, settle=0)
+
+        print(f"base rows: {len(base):,}")
+        print(f"{'batch':>6}{'source':>8}{'rows':>8}{'poll (ms)':>12}{'reload (ms)':>13}  match")
+        for i, batch in enumerate(batches):
+            if i % 2 == 0:
+                batch.to_csv(path, mode='a', header=False, index=False)
+                kind = 'append'
+            else:
+                target = os.path.join(drop_dir, f"delta_{i:03d}.csv")
+                batch.to_csv(target + '.tmp', index=False)
+                os.replace(target + '.tmp', target)
+                kind = 'drop'
+
+            start = time.perf_counter()
+            added = ingestor.poll()
+            poll_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            campaigns, rollup = full_reload(path, drop_dir)
+            reload_ms = (time.perf_counter() - start) * 1000
+
+            assert added == len(batch)
+            pd.testing.assert_frame_equal(normalized(ingestor.campaigns, COLUMNS), normalized(campaigns, COLUMNS),
+                                          check_dtype=False)
+            pd.testing.assert_frame_equal(normalized(ingestor.rollup, DIMENSIONS), normalized(rollup, DIMENSIONS),
+                                          check_dtype=False)
+            print(f"{i:>6}{kind:>8}{added:>8,}{poll_ms:>12.1f}{reload_ms:>13.1f}  ok")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark suite for the headless analytics package.
+
+Times every analytics function on synthetic data at several row counts
+(10k, 1M and 10M by default) and prints one line per function with the
+best-of-n wall time at each size. Use it locally to spot regressions
+before and after a change. tests/test_analytics.py runs every function
+at 10k rows under pytest-benchmark and checks the rollup answers against
+the raw rows.
+
+Run: python benchmarks/kpi_suite.py [--sizes 10000 1000000] [--only campaigns]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics  # noqa: E402
+from product_rollup import ProductRollup  # noqa: E402
+from rollup import build_campaign_rollup  # noqa: E402
+
+
+def _categorical(rng, values, rows):
+    return pd.Categorical.from_codes(rng.integers(0, len(values), rows), values)
+
+
+def synthetic_tables(rows, seed=0):
+    """Campaign, customer, product, lead and journey frames with `rows` rows each"""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range('2023-01-01', '2024-12-31', freq='D')
+    impressions = rng.integers(5000, 1_000_000, rows)
+    clicks = (impressions * rng.uniform(0.01, 0.07, rows)).astype('int64')
+    spend = rng.uniform(0, 100_000, rows)
+    campaigns = pd.DataFrame({
+        'date': days[rng.integers(0, len(days), rows)],
+        'channel': _categorical(rng, ['Google Ads', 'Facebook', 'Instagram', 'LinkedIn', 'Email',
+                                      'YouTube', 'Referral', 'Direct'], rows),
+        'campaign_type': _categorical(rng, ['Brand Awareness', 'Lead Generation', 'Retargeting',
+                                            'Seasonal Sale', 'Product Launch'], rows),
+        'region': _categorical(rng, ['North', 'South', 'East', 'West', 'Central'], rows),
+        'impressions': impressions,
+        'clicks': clicks,
+        'conversions': (clicks * rng.uniform(0.005, 0.09, rows)).astype('int64'),
+        'spend': spend,
+        'revenue': spend * rng.uniform(0.5, 6, rows),
+    })
+    customers = pd.DataFrame({
+        'customer_segment': _categorical(rng, ['Premium', 'Regular', 'Budget', 'Occasional'], rows),
+        'lifetime_value': rng.integers(26, 250_000, rows),
+        'nps_category': _categorical(rng, ['Promoter', 'Passive', 'Detractor'], rows),
+        'churn_risk': _categorical(rng, ['Low', 'Medium', 'High'], rows),
+        'satisfaction_score': rng.uniform(1, 5, rows).astype('float32'),
+        'support_tickets': rng.integers(0, 9, rows).astype('int16'),
+    })
+    product = rng.integers(0, 500, rows)
+    sales = rng.uniform(10_000, 150_000, rows)
+    products = pd.DataFrame({
+        'category': pd.Categorical.from_codes(product % 5, ['Electronics', 'Fashion', 'Home & Living', 'Beauty', 'Sports']),
+        'subcategory': pd.Categorical.from_codes(product % 25, [f"Sub {i}" for i in range(25)]),
+        'product_name': pd.Categorical.from_codes(product, [f"Product {i}" for i in range(500)]),
+        'region': _categorical(rng, ['North', 'South', 'East', 'West', 'Central'], rows),
+        'quarter': _categorical(rng, [f"Q{q} {y}" for y in (2023, 2024) for q in range(1, 5)], rows),
+        'sales': sales,
+        'units_sold': rng.integers(2, 60, rows),
+        'profit': sales * rng.uniform(0.08, 0.45, rows),
+    })
+    converted = rng.random(rows) < 0.4
+    leads = pd.DataFrame({
+        'actual_converted': converted.astype('int8'),
+        'predicted_probability': np.clip(rng.normal(0.35 + 0.3 * converted, 0.2), 0, 1).round(4),
+    })
+    touches = ['Paid Search', 'Social Media', 'Organic Search', 'Email', 'Website', 'Retargeting', 'Referral', 'Direct']
+    journey = pd.DataFrame({f"touchpoint_{i}": _categorical(rng, touches, rows) for i in range(1, 4)})
+    journey['touchpoint_4'] = _categorical(rng, ['Purchase', 'Exit'], rows)
+    journey['customer_count'] = rng.integers(1, 500, rows)
+    return {'campaigns': campaigns, 'customers': customers, 'products': products,
+            'leads': leads, 'journey': journey}
+
+
+def cases(tables):
+    """(group, name, callable) for every analytics function"""
+    raw = tables['campaigns']
+    rollup = build_campaign_rollup(raw)
+    customers, products = tables['customers'], tables['products']
+    product_rollup = ProductRollup(products)
+    sweep = analytics.threshold_sweep(tables['leads'])
+    paths = analytics.encode_journeys(tables['journey'])
+    funnel = pd.DataFrame({'stage': [f"Stage {i}" for i in range(6)],
+                           'visitors': [100000, 45000, 22000, 11000, 6400, 3200]})
+    return [
+        ('campaigns', 'build_campaign_rollup', lambda: build_campaign_rollup(raw)),
+        ('campaigns', 'overview_kpis', lambda: analytics.overview_kpis(rollup)),
+        ('campaigns', 'monthly_revenue', lambda: analytics.monthly_revenue(rollup)),
+        ('campaigns', 'revenue_by', lambda: analytics.revenue_by(rollup, 'channel')),
+        ('campaigns', 'filter_campaigns', lambda: analytics.filter_campaigns(
+            rollup, ['Email', 'Facebook', 'Google Ads'], ['Retargeting', 'Seasonal Sale'],
+            date(2023, 10, 1), date(2024, 3, 31))),
+        ('campaigns', 'campaign_kpis', lambda: analytics.campaign_kpis(rollup)),
+        ('campaigns', 'campaign_type_performance', lambda: analytics.campaign_type_performance(rollup)),
+        ('campaigns', 'daily_performance', lambda: analytics.daily_performance(rollup)),
+        ('campaigns', 'channel_matrix', lambda: analytics.channel_matrix(rollup)),
+        ('customers', 'segment_distribution', lambda: analytics.segment_distribution(customers)),
+        ('customers', 'segment_ltv', lambda: analytics.segment_ltv(customers)),
+        ('customers', 'nps_distribution', lambda: analytics.nps_distribution(customers)),
+        ('customers', 'churn_risk_summary', lambda: analytics.churn_risk_summary(customers)),
+        ('products', 'build_product_rollup', lambda: ProductRollup(products)),
+        ('products', 'category_sales', lambda: analytics.category_sales(product_rollup)),
+        ('products', 'top_subcategories', lambda: analytics.top_subcategories(product_rollup)),
+        ('products', 'top_products', lambda: analytics.top_products(product_rollup, regions=['North', 'West'])),
+        ('products', 'quarterly_sales', lambda: analytics.quarterly_sales(product_rollup)),
+        ('products', 'product_hierarchy', lambda: analytics.product_hierarchy(product_rollup)),
+        ('funnel', 'funnel_rates', lambda: analytics.funnel_rates(funnel)),
+        ('funnel', 'encode_journeys', lambda: analytics.encode_journeys(tables['journey'])),
+        ('funnel', 'journey_attribution', lambda: analytics.journey_attribution(paths)),
+        ('funnel', 'journey_counts', lambda: analytics.journey_counts(paths)),
+        ('leads', 'threshold_sweep', lambda: analytics.threshold_sweep(tables['leads'])),
+        ('leads', 'lead_metrics', lambda: analytics.lead_metrics(sweep, 0.5)),
+    ]
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--only', help="run one group: campaigns, customers, products, funnel, leads")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    results = {}
+    for rows in args.sizes:
+        for group, name, fn in cases(synthetic_tables(rows)):
+            if args.only and group != args.only:
+                continue
+            results.setdefault((group, name), {})[rows] = best_of(fn, args.repeat)
+
+    header = ''.join(f"{f'{rows:,} (ms)':>18}" for rows in args.sizes)
+    print(f"{'function':<38}{header}")
+    for (group, name), timings in results.items():
+        cells = ''.join(f"{timings[rows]:>18.2f}" for rows in args.sizes)
+        print(f"{group + '.' + name:<38}{cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Lead re-scoring throughput: chunked sparse inference in memory and across processes.
+
+Generates synthetic leads at each chosen scale (see synthetic.py; scale 1
+is the 2,000-lead sample), trains the lead model (lead_model.py) and
+scores every lead in a fresh interpreter:
+
+- pipeline: the fitted sklearn pipeline's predict_proba over the whole
+  table at once (one matrix for every lead);
+- chunked: LeadModel.predict_proba, encoding and scoring CHUNK_ROWS leads
+  at a time;
+- table xN: score_table streaming the Parquet file, its row groups split
+  across N processes that each load the persisted model.
+
+All paths must give the same probabilities (to 1e-12) in the same lead
+order. Also reported: the CSR matrix size against a dense float64 one-hot
+matrix of the same leads, and the ROC AUC of the new scores. The same
+parity checks, and the held-out rows the page evaluates on, are tested on
+10k leads under pytest in tests/test_lead_model.py.
+
+Run: python benchmarks/lead_scoring.py [--scale 500 2500] [--workers 4]
+"""
+
+import argparse
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CHILD = """
+import pickle, sys, time
+sys.path.insert(0, {root!r})
+import numpy as np
+import data_store
+from data_store import load_table
+from lead_model import FEATURES, TARGET, load_or_train, model_path, score_table
+from sklearn.metrics import roc_auc_score
+data_store.convert('leads')
+leads = load_table('leads', ['lead_id'] + FEATURES + [TARGET])
+start = time.perf_counter()
+model = load_or_train(leads, retrain=True)
+report = {{'rows': len(leads), 'train': time.perf_counter() - start, 'seconds': {{}}, 'diff': {{}}}}
+start = time.perf_counter()
+expected = model.pipeline.predict_proba(leads[FEATURES])[:, 1]
+report['seconds']['pipeline'] = time.perf_counter() - start
+start = time.perf_counter()
+chunked = model.predict_proba(leads)
+report['seconds']['chunked'] = time.perf_counter() - start
+report['diff']['chunked'] = float(np.abs(chunked - expected).max())
+path = model_path(leads)
+for workers in sorted({{1, {workers}}}):
+    start = time.perf_counter()
+    scores = score_table(path, workers=workers)
+    report['seconds'][f"table x{{workers}}"] = time.perf_counter() - start
+    same_order = np.array_equal(scores['lead_id'].to_numpy(), leads['lead_id'].to_numpy())
+    diff = float(np.abs(scores['predicted_probability'].to_numpy() - expected).max())
+    report['diff'][f"table x{{workers}}"] = diff if same_order else np.inf
+sample = leads.iloc[:100_000]
+matrix = model.pipeline.named_steps['encode'].transform(sample)
+report['sparse_bytes'] = (matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / len(sample)
+report['dense_bytes'] = matrix.shape[1] * 8
+report['auc'] = roc_auc_score(leads[TARGET], chunked)
+report['holdout_auc'] = model.summary['holdout_auc']
+with open({out!r}, 'wb') as f:
+    pickle.dump(report, f)
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', type=float, nargs='+', default=[500, 2500],
+                        help="synthetic scale factors (500 = 1M leads)")
+    parser.add_argument('--workers', type=int, default=4, help="processes for the parallel table run")
+    args = parser.parse_args()
+
+    import synthetic
+
+    failures = 0
+    modes = ['pipeline', 'chunked'] + [f"table x{w}" for w in sorted({1, args.workers})]
+    print(f"{'leads':>12}{'train (s)':>11}" + ''.join(f"{m + ' (leads/s)':>22}" for m in modes)
+          + f"{'CSR B/row':>11}{'dense B/row':>13}{'AUC':>8}")
+    for scale in args.scale:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = os.path.join(tmp, 'data')
+            synthetic.write_all(data_dir, scale=scale, tables=['leads'])
+            out = os.path.join(tmp, 'report.pkl')
+            code = CHILD.format(root=ROOT, workers=args.workers, out=out)
+            subprocess.run([sys.executable, '-c', code], env=dict(os.environ, NOVAMART_DATA_DIR=data_dir), check=True)
+            with open(out, 'rb') as f:
+                report = pickle.load(f)
+        ok = all(diff < 1e-12 for diff in report['diff'].values())
+        failures += not ok
+        rates = ''.join(f"{report['rows'] / report['seconds'][m]:>22,.0f}" for m in modes)
+        print(f"{report['rows']:>12,}{report['train']:>11.1f}{rates}{report['sparse_bytes']:>11.0f}"
+              f"{report['dense_bytes']:>13.0f}{report['auc']:>8.3f}{'' if ok else '  MISMATCH'}")
+
+    print('\nparity ok' if not failures else f"\nMISMATCH at {failures} scale(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
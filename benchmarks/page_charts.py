@@ -0,0 +1,70 @@
+"""
+Page render time with chart builds run serially vs on the chart thread pool.
+
+Every page is rendered headlessly (Streamlit AppTest) with the figure
+cache disabled, so each run rebuilds every chart. The page span comes
+from the profiler trace. Each worker count runs in its own interpreter,
+and the median over the repeats is reported with the speedup over one
+worker.
+
+Run: python benchmarks/page_charts.py [--workers 1 2 4] [--repeat 5] [--data-dir DIR]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from profiler import read_trace  # noqa: E402
+
+CHILD = """
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=600)
+at.run()
+for page in at.sidebar.radio[0].options:
+    at.sidebar.radio[0].set_value(page)
+    for _ in range({repeat}):
+        at.run()
+"""
+
+
+def run_workers(workers, args, trace):
+    env = dict(os.environ, NOVAMART_CHART_WORKERS=str(workers), NOVAMART_FIGURE_CACHE_MB='0',
+               NOVAMART_PROFILE='1', NOVAMART_PROFILE_ALLOC='0', NOVAMART_PROFILE_TRACE=trace,
+               NOVAMART_WARM_UP='0')
+    if args.data_dir:
+        env['NOVAMART_DATA_DIR'] = args.data_dir
+    code = CHILD.format(app=os.path.join(ROOT, 'app.py'), repeat=args.repeat)
+    subprocess.run([sys.executable, '-c', code], env=env, check=True, capture_output=True)
+    spans = read_trace(trace)
+    pages = spans[spans['phase'] == 'page']
+    # the first visit of a page also loads its data; keep the rebuild-only runs
+    return pages.groupby('page', sort=False)['ms'].apply(lambda ms: ms.iloc[1:].median())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--repeat', type=int, default=5, help="runs per page (the first is discarded)")
+    parser.add_argument('--data-dir', help="dataset directory (e.g. from synthetic.py)")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            results[workers] = run_workers(workers, args, os.path.join(tmp, f"trace-{workers}.jsonl"))
+
+    base = results[args.workers[0]]
+    print(f"{os.cpu_count()} CPUs, median page time in ms (speedup vs {args.workers[0]} worker)\n")
+    print(f"{'page':<24}" + ''.join(f"{str(w) + ' workers':>20}" for w in args.workers))
+    for page in base.index:
+        cells = ''.join(f"{results[w][page]:>11.0f} ({base[page] / results[w][page]:4.2f}x)" for w in args.workers)
+        print(f"{page:<24}{cells}")
+
+
+if __name__ == "__main__":
+    main()
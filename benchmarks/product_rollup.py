@@ -0,0 +1,96 @@
+"""
+Product rollup parity, query time and treemap payload at scale.
+
+Builds the product x region x quarter cube from synthetic product sales
+(see synthetic.py) and checks category, subcategory, product and
+quarter totals, with and without region/quarter filters, against a
+plain pandas group-by of the rows. It then compares the old treemap
+(px.treemap over every row) with the rollup's hierarchy nodes, whose
+count is bounded by categories + subcategories + top N per subcategory.
+The parity checks run on about 10k rows under pytest in
+tests/test_product_rollup.py.
+
+Run: python benchmarks/product_rollup.py [--scales 1 100 1000] [--top 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic  # noqa: E402
+from figure_cache import figure_size  # noqa: E402
+from product_rollup import LEVELS, ProductRollup  # noqa: E402
+
+FILTERS = [
+    (None, None),
+    (['North', 'West'], None),
+    (None, ['Q1 2023', 'Q4 2024']),
+    (['South'], ['Q2 2024']),
+]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def reference(products, level, regions, quarters):
+    """Sales per node of a level from the raw rows"""
+    rows = products
+    if regions is not None:
+        rows = rows[rows['region'].isin(regions)]
+    if quarters is not None:
+        rows = rows[rows['quarter'].isin(quarters)]
+    depth = LEVELS.index(level) + 1
+    return rows.groupby(LEVELS[:depth], observed=True)['sales'].sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 100, 1000])
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    failures = 0
+    for scale in args.scales:
+        products = synthetic.make_frame('products', scale)
+        rollup, build_s = timed(lambda: ProductRollup(products))
+        print(f"== scale {scale:g}: {len(products):,} rows, {len(rollup.leaves):,} products, "
+              f"cube built in {build_s * 1000:,.0f} ms")
+
+        ok = True
+        for regions, quarters in FILTERS:
+            for level in LEVELS:
+                nodes = rollup.by(level, regions, quarters).set_index(LEVELS[:LEVELS.index(level) + 1])['sales']
+                expected = reference(products, level, regions, quarters)
+                expected.index = expected.index.map(lambda key: tuple(map(str, key)) if isinstance(key, tuple) else str(key))
+                nodes = nodes[nodes != 0]
+                ok = ok and np.allclose(nodes.sort_index().to_numpy(), expected.sort_index().to_numpy(), rtol=1e-9)
+            top, top_s = timed(lambda: rollup.top('product_name', args.top, regions=regions, quarters=quarters))
+            expected = reference(products, 'product_name', regions, quarters).nlargest(args.top)
+            ok = ok and np.allclose(top['sales'].to_numpy(), expected.to_numpy(), rtol=1e-9)
+            print(f"filter regions={regions} quarters={quarters}: top {args.top} products in {top_s * 1000:.2f} ms")
+        failures += not ok
+        print(f"levels and top-N equal a pandas group-by of the rows: {'ok' if ok else 'MISMATCH'}")
+
+        nodes, tree_s = timed(lambda: rollup.hierarchy(args.top))
+        binned = figure_size(go.Figure(go.Treemap(ids=nodes['id'], parents=nodes['parent'], labels=nodes['label'],
+                                                  values=nodes['sales'], branchvalues='total')))
+        sample = products.iloc[:min(len(products), 50_000)]
+        raw = figure_size(px.treemap(sample, labels='product_name', parents='category', values='sales'))
+        raw *= len(products) / len(sample)
+        print(f"treemap: {len(nodes):,} nodes in {tree_s * 1000:.1f} ms, payload {binned / 1e3:,.1f} KB "
+              f"(rows ≈ {raw / 1e6:,.2f} MB)\n")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
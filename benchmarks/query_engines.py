@@ -0,0 +1,118 @@
+"""
+Parity, latency and peak memory of the pandas, DuckDB and Polars query engines.
+
+Generates synthetic campaigns and customers at the chosen scale (see
+synthetic.py), then runs every engine query in a fresh interpreter per
+engine. Each child reports its latency per query and its peak RSS. The
+parent checks that every result matches the pandas reference exactly
+(frames) or to 1e-6 relative (floating-point means). The same parity
+check runs at a small scale, on Parquet and CSV sources, under pytest in
+tests/test_query_engine.py.
+
+Run: python benchmarks/query_engines.py [--scale 200] [--source parquet|csv] [--engines pandas duckdb polars]
+"""
+
+import argparse
+import math
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CHILD = """
+import pickle, resource, sys, time
+sys.path.insert(0, {root!r})
+import query_engine
+engine = query_engine.get_engine({engine!r})
+results, timings = {{}}, {{}}
+for query in query_engine.QUERIES:
+    start = time.perf_counter()
+    results[query] = getattr(engine, query)()
+    timings[query] = time.perf_counter() - start
+try:
+    # VmHWM belongs to this process image; ru_maxrss can carry the parent's peak across exec
+    with open('/proc/self/status') as f:
+        peak = next(int(line.split()[1]) for line in f if line.startswith('VmHWM')) / 1024
+except OSError:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+with open({out!r}, 'wb') as f:
+    pickle.dump((results, timings, peak), f)
+"""
+
+CONVERT = """
+import sys
+sys.path.insert(0, {root!r})
+import data_store
+for name in ('campaigns', 'customers'):
+    data_store.convert(name)
+"""
+
+
+def run_child(code, data_dir):
+    env = dict(os.environ, NOVAMART_DATA_DIR=data_dir)
+    subprocess.run([sys.executable, '-c', code], env=env, check=True)
+
+
+def same(expected, actual):
+    """Exact frame equality; floats in dicts/tuples compared to 1e-6 relative"""
+    if isinstance(expected, pd.DataFrame):
+        try:
+            pd.testing.assert_frame_equal(expected, actual)
+            return True
+        except AssertionError:
+            return False
+    if isinstance(expected, (tuple, list)):
+        return len(expected) == len(actual) and all(same(e, a) for e, a in zip(expected, actual))
+    if isinstance(expected, dict):
+        return expected.keys() == actual.keys() and all(same(expected[k], actual[k]) for k in expected)
+    if isinstance(expected, float) or isinstance(actual, float):
+        return (math.isnan(expected) and math.isnan(actual)) or math.isclose(expected, actual, rel_tol=1e-6)
+    return expected == actual
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', type=float, default=200, help="synthetic scale factor (1 = sample size)")
+    parser.add_argument('--source', choices=['parquet', 'csv'], default='parquet')
+    parser.add_argument('--engines', nargs='+', default=['pandas', 'duckdb', 'polars'])
+    parser.add_argument('--data-dir', help="reuse an existing data directory instead of generating one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir
+        if data_dir is None:
+            import synthetic
+            data_dir = os.path.join(tmp, 'data')
+            rows = synthetic.write_all(data_dir, scale=args.scale, tables=['campaigns', 'customers'])
+            print(f"generated {rows['campaigns']:,} campaign rows and {rows['customers']:,} customers")
+        if args.source == 'parquet':
+            run_child(CONVERT.format(root=ROOT), data_dir)
+
+        reports = {}
+        for engine in args.engines:
+            out = os.path.join(tmp, f"{engine}.pkl")
+            run_child(CHILD.format(root=ROOT, engine=engine, out=out), data_dir)
+            with open(out, 'rb') as f:
+                reports[engine] = pickle.load(f)
+
+    reference = reports.get('pandas', next(iter(reports.values())))[0]
+    print(f"\n{'query':<24}" + ''.join(f"{e + ' (ms)':>16}" for e in reports) + f"{'parity':>10}")
+    failures = 0
+    for query in reference:
+        row = ''.join(f"{reports[e][1][query] * 1000:>16.1f}" for e in reports)
+        ok = all(same(reference[query], reports[e][0][query]) for e in reports)
+        failures += not ok
+        print(f"{query:<24}{row}{'ok' if ok else 'MISMATCH':>10}")
+    print(f"{'total':<24}" + ''.join(f"{sum(reports[e][1].values()) * 1000:>16.1f}" for e in reports))
+    print(f"{'peak RSS (MB)':<24}" + ''.join(f"{reports[e][2]:>16.0f}" for e in reports))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
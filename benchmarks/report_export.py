@@ -0,0 +1,55 @@
+"""
+Report export wall time against worker count.
+
+Runs export.py once per worker count (after a warm-up run that builds
+the page snapshots) and reads each run's manifest. With pages spread
+across processes, wall time should fall towards the slowest page plus
+process start-up as workers approach min(pages, cores).
+
+Run: python benchmarks/report_export.py [--workers 1 2 4 8] [--data-dir /path/to/csvs]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def export(out, workers, env):
+    """One export.py run; returns its manifest"""
+    subprocess.run([sys.executable, os.path.join(ROOT, 'export.py'), '--out', out, '--workers', str(workers)],
+                   env=env, stdout=subprocess.DEVNULL)
+    with open(os.path.join(out, 'manifest.json')) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--data-dir')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.data_dir:
+        env['NOVAMART_DATA_DIR'] = args.data_dir
+    with tempfile.TemporaryDirectory() as tmp:
+        export(os.path.join(tmp, 'warm-up'), 1, env)
+        print(f"{'workers':>8}{'pages':>7}{'figures':>9}{'cores':>7}{'wall (s)':>10}{'page sum (s)':>14}"
+              f"{'speedup':>9}{'failed':>8}")
+        baseline = None
+        for workers in args.workers:
+            manifest = export(os.path.join(tmp, str(workers)), workers, env)
+            pages = manifest['pages']
+            wall = manifest['wall_seconds']
+            baseline = baseline or wall
+            print(f"{manifest['workers']:>8}{len(pages):>7}{sum(p['figures'] for p in pages):>9}"
+                  f"{manifest['cores']:>7}{wall:>10.2f}{sum(p['seconds'] for p in pages):>14.2f}"
+                  f"{baseline / wall:>8.2f}x{sum(bool(p['error']) for p in pages):>8}")
+
+
+if __name__ == "__main__":
+    main()
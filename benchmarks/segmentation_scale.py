@@ -0,0 +1,94 @@
+"""
+Segmentation engine timing and correctness at millions of customers.
+
+Generates synthetic customers (see synthetic.py) and times each stage
+of the segmentation engine: input hash, RFM scoring, churn banding and
+mini-batch k-means. It also times a full first call and a cached second
+call. The scores and bands are checked against a plain pandas reference
+(pd.cut on the same cut-offs). A per-row apply, which is what a naive
+implementation would do, is timed on a 100k-row sample.
+
+Run: python benchmarks/segmentation_scale.py [--rows 1000000 10000000] [--clusters 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic  # noqa: E402
+from segmentation import (  # noqa: E402
+    CHURN_CUTOFFS, RFM_COLUMNS, RISK_LABELS, Segmenter, churn_bands, input_hash, minibatch_kmeans,
+    quintile_cutoffs, rfm_features, rfm_scores,
+)
+
+
+def customers(rows):
+    columns = RFM_COLUMNS + ['churn_probability']
+    return pd.concat([block[columns] for block in synthetic.blocks('customers', rows)], ignore_index=True)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def reference(frame):
+    """pd.cut on the same cut-offs: R, F, M scores and churn bands"""
+    edges = [[-np.inf, *quintile_cutoffs(frame[c]), np.inf] for c in RFM_COLUMNS]
+    r = 6 - pd.cut(frame[RFM_COLUMNS[0]], edges[0], labels=False, right=True).to_numpy() - 1
+    f = pd.cut(frame[RFM_COLUMNS[1]], edges[1], labels=False, right=True).to_numpy() + 1
+    m = pd.cut(frame[RFM_COLUMNS[2]], edges[2], labels=False, right=True).to_numpy() + 1
+    bands = pd.cut(frame['churn_probability'], [-np.inf, *CHURN_CUTOFFS, np.inf], labels=RISK_LABELS, right=False)
+    return r, f, m, bands
+
+
+def row_apply(frame):
+    """Per-row scoring, as a loop over customers would do it"""
+    cuts = [quintile_cutoffs(frame[c]) for c in RFM_COLUMNS]
+    return frame.apply(
+        lambda row: (5 - int(np.searchsorted(cuts[0], row[RFM_COLUMNS[0]])),
+                     int(np.searchsorted(cuts[1], row[RFM_COLUMNS[1]])) + 1,
+                     int(np.searchsorted(cuts[2], row[RFM_COLUMNS[2]])) + 1),
+        axis=1,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--clusters', type=int, default=5)
+    args = parser.parse_args()
+
+    sample = customers(100_000)
+    r, f, m = rfm_scores(*(sample[c] for c in RFM_COLUMNS))
+    ref_r, ref_f, ref_m, ref_bands = reference(sample)
+    bands = churn_bands(sample['churn_probability'])
+    ok = (r == ref_r).all() and (f == ref_f).all() and (m == ref_m).all() and (bands == ref_bands).all()
+    print(f"scores and bands vs pd.cut on 100,000 rows: {'ok' if ok else 'MISMATCH'}")
+    _, apply_s = timed(lambda: row_apply(sample))
+    print(f"row-wise apply: {apply_s:.2f} s per 100,000 rows\n")
+
+    print(f"{'rows':>12}{'hash':>8}{'rfm':>8}{'bands':>8}{'kmeans':>8}{'first':>8}{'cached':>8}{'rows/s':>14}")
+    for rows in args.rows:
+        frame = customers(rows)
+        _, hash_s = timed(lambda: input_hash(frame, RFM_COLUMNS + ['churn_probability']))
+        _, rfm_s = timed(lambda: rfm_scores(*(frame[c] for c in RFM_COLUMNS)))
+        _, band_s = timed(lambda: churn_bands(frame['churn_probability']))
+        features = rfm_features(*(frame[c].to_numpy() for c in RFM_COLUMNS))
+        _, kmeans_s = timed(lambda: minibatch_kmeans(features, k=args.clusters))
+        segmenter = Segmenter(clusters=args.clusters)
+        _, first_s = timed(lambda: segmenter.segment(frame))
+        _, cached_s = timed(lambda: segmenter.segment(frame))
+        print(f"{rows:>12,}{hash_s:>8.2f}{rfm_s:>8.2f}{band_s:>8.2f}{kmeans_s:>8.2f}{first_s:>8.2f}{cached_s:>8.2f}"
+              f"{rows / first_s:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Load test: N concurrent simulated sessions against the dashboard.
+
+Each session is a headless Streamlit AppTest that opens every page in
+turn, several times. The sessions run concurrently in one process, so
+they share the process-wide caches just like users on one server. The
+test reports p50/p95 page latency and memory per session. Memory per
+session is the peak RSS growth during the test divided by N.
+
+Both data modes run in separate interpreters for comparison:
+shared (st.cache_resource, the default) and copied (st.cache_data,
+NOVAMART_SHARED_DATA=0).
+
+Run: python benchmarks/session_load.py [--sessions 8] [--rounds 3] [--data-dir DIR]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, threading, time
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+APP = {app!r}
+SESSIONS, ROUNDS = {sessions}, {rounds}
+
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmRSS')) / 1024
+
+
+def new_session():
+    at = AppTest.from_file(APP, default_timeout=300)
+    at.run()
+    return at
+
+
+# the first run starts the warm-up; wait for it so every mode starts from loaded data
+first = new_session()
+for thread in threading.enumerate():
+    if thread.name == 'novamart-warm-up':
+        thread.join()
+pages = list(first.sidebar.radio[0].options)
+baseline = rss_mb()
+
+peak = [baseline]
+running = True
+
+
+def sample():
+    while running:
+        peak[0] = max(peak[0], rss_mb())
+        time.sleep(0.01)
+
+
+latencies = {{page: [] for page in pages}}
+errors = []
+lock = threading.Lock()
+
+
+def session(number):
+    at = new_session()
+    for _ in range(ROUNDS):
+        for page in pages:
+            start = time.perf_counter()
+            at.sidebar.radio[0].set_value(page).run()
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[page].append(elapsed)
+                if len(at.exception):
+                    errors.append(page)
+
+
+sampler = threading.Thread(target=sample, daemon=True)
+sampler.start()
+workers = [threading.Thread(target=session, args=(i,)) for i in range(SESSIONS)]
+for w in workers:
+    w.start()
+for w in workers:
+    w.join()
+running = False
+
+print(json.dumps({{
+    'latency': {{page: [float(np.percentile(v, 50)), float(np.percentile(v, 95))] for page, v in latencies.items()}},
+    'baseline_mb': baseline,
+    'peak_mb': peak[0],
+    'errors': sorted(set(errors)),
+}}))
+"""
+
+
+def run_mode(shared, args):
+    env = dict(os.environ, NOVAMART_SHARED_DATA='1' if shared else '0')
+    if args.data_dir:
+        env['NOVAMART_DATA_DIR'] = args.data_dir
+    code = CHILD.format(app=os.path.join(ROOT, 'app.py'), sessions=args.sessions, rounds=args.rounds)
+    out = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=3, help="visits of every page per session")
+    parser.add_argument('--data-dir', help="dataset directory (e.g. from synthetic.py)")
+    args = parser.parse_args()
+
+    results = {mode: run_mode(mode == 'shared', args) for mode in ('shared', 'copied')}
+
+    print(f"{args.sessions} sessions x {args.rounds} rounds\n")
+    print(f"{'page':<28}" + ''.join(f"{mode + ' p50/p95 (ms)':>26}" for mode in results))
+    for page in results['shared']['latency']:
+        cells = ''.join(
+            f"{results[m]['latency'][page][0] * 1000:>17.0f} /{results[m]['latency'][page][1] * 1000:>6.0f}"
+            for m in results
+        )
+        print(f"{page:<28}{cells}")
+    print()
+    for mode, r in results.items():
+        per_session = (r['peak_mb'] - r['baseline_mb']) / args.sessions
+        print(f"{mode:<8} baseline {r['baseline_mb']:7.0f} MB  peak {r['peak_mb']:7.0f} MB  "
+              f"per session {per_session:6.1f} MB")
+    errors = sorted({page for r in results.values() for page in r['errors']})
+    if errors:
+        print(f"\npages that raised (same in both modes): {', '.join(errors)}")
+
+
+if __name__ == "__main__":
+    main()
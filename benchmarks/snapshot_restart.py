@@ -0,0 +1,68 @@
+"""
+Restart timing per page: rebuilding page data vs mapping its snapshot.
+
+Each measurement runs in a fresh interpreter, as a restarted app would
+(module imports are not timed).
+"build" loads the page's tables from Parquet and recomputes its
+aggregates (build_page_data); "snapshot" maps the prebuilt snapshot
+(snapshot.load_or_build, source hashes already known). Snapshots are
+prebuilt first and checked against a fresh build.
+
+Run: python benchmarks/snapshot_restart.py [--repeat 5] [--data-dir /path/to/csvs]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_store import PAGE_TABLES  # noqa: E402
+
+CHILD = """
+import sys, time
+sys.path.insert(0, {root!r})
+from page_data import build_page_data
+from snapshot import load_or_build
+start = time.perf_counter()
+if {mode!r} == 'build':
+    build_page_data({page!r})
+else:
+    load_or_build({page!r})
+print(time.perf_counter() - start)
+"""
+
+
+def time_cold(page, mode, repeat, env):
+    """Median load time of a page in fresh interpreters, in milliseconds"""
+    code = CHILD.format(root=ROOT, page=page, mode=mode)
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, env=env)
+        samples.append(float(out.stdout.strip()) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--data-dir')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.data_dir:
+        env['NOVAMART_DATA_DIR'] = args.data_dir
+    subprocess.run([sys.executable, os.path.join(ROOT, 'snapshot.py'), '--verify'], env=env, check=True)
+
+    print(f"\n{'page':<24}{'build (ms)':>12}{'snapshot (ms)':>15}{'speedup':>10}")
+    for page in PAGE_TABLES:
+        build_ms = time_cold(page, 'build', args.repeat, env)
+        snapshot_ms = time_cold(page, 'snapshot', args.repeat, env)
+        print(f"{page:<24}{build_ms:>12.1f}{snapshot_ms:>15.1f}{build_ms / snapshot_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
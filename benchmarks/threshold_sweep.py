@@ -0,0 +1,68 @@
+"""
+Lead-scoring metrics: scikit-learn per rerun vs one precomputed sweep.
+
+The sklearn path is what page_ml_model_evaluation did on every rerun
+(confusion_matrix twice plus roc_curve). The sweep path sorts once and
+then answers each threshold with a binary search. Agreement with
+scikit-learn is tested in tests/test_model_metrics.py; this script
+times both paths at scale.
+
+Run: python benchmarks/threshold_sweep.py [--rows 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import auc, confusion_matrix, roc_curve
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_metrics  # noqa: E402
+
+
+def synthetic_leads(rows, seed=0):
+    """Labels and 4-decimal probabilities correlated with them"""
+    rng = np.random.default_rng(seed)
+    y = rng.random(rows) < 0.35
+    score = np.clip(rng.normal(0.35 + 0.3 * y, 0.2), 0, 1).round(4)
+    return y.astype(int), score
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=1000)
+    args = parser.parse_args()
+
+    y, score = synthetic_leads(args.rows)
+    thresholds = np.linspace(0, 1, args.lookups)
+
+    def sklearn_rerun(threshold=0.5):
+        pred = (score >= threshold).astype(int)
+        confusion_matrix(y, pred).ravel()
+        cm = confusion_matrix(y, pred)
+        fpr, tpr, _ = roc_curve(y, score)
+        return cm, auc(fpr, tpr)
+
+    sk_ms, _ = timed(sklearn_rerun)
+    build_ms, table = timed(lambda: model_metrics.threshold_table(y, score))
+    lookup_ms, _ = timed(lambda: [model_metrics.metrics_at(table, t) for t in thresholds])
+
+    print(f"rows:                         {args.rows:,}")
+    print(f"distinct thresholds:          {len(table):,}")
+    print(f"sklearn per rerun:            {sk_ms:.1f} ms")
+    print(f"sweep build (once):           {build_ms:.1f} ms")
+    print(f"threshold lookup:             {lookup_ms / args.lookups * 1000:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Window query benchmark: scanning the rollup vs prefix-sum lookups.
+
+Builds a synthetic day x channel campaign rollup for histories of
+increasing length, then answers random windows (and their prior windows)
+both ways: filtering the rollup and summing (what the KPI cards would
+otherwise do) and WindowIndex lookups. Sums, ratios and per-channel
+cohorts are checked for equality, and rolling 7/28-day sums against
+pandas rolling over the zero-filled daily series. Lookup time (window and
+prior window as arrays) should stay flat as the history grows; compare
+adds the cost of building the result table. The parity checks, and an
+empty rollup, run on the synthetic campaigns under pytest in
+tests/test_windows.py.
+
+Run: python benchmarks/window_queries.py [--years 2 20 200] [--queries 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.campaigns import filter_campaigns  # noqa: E402
+from rollup import MEASURES, rollup_by, totals  # noqa: E402
+from windows import KPIS, WindowIndex  # noqa: E402
+
+CHANNELS = ['Google Ads', 'Facebook', 'Instagram', 'LinkedIn', 'Email', 'YouTube', 'Affiliate', 'Twitter']
+
+
+def synthetic_rollup(years, seed=0):
+    """Day x channel rollup rows (about 10% of day/channel cells missing) over `years` years"""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range('2000-01-01', periods=int(years * 365), freq='D')
+    grid = pd.MultiIndex.from_product([days, CHANNELS], names=['date', 'channel']).to_frame(index=False)
+    grid = grid[rng.random(len(grid)) > 0.1].reset_index(drop=True)
+    rows = len(grid)
+    grid['channel'] = pd.Categorical(grid['channel'], CHANNELS)
+    grid['impressions'] = rng.integers(1_000, 100_000, rows)
+    grid['clicks'] = (grid['impressions'] * rng.uniform(0.005, 0.05, rows)).round()
+    grid['conversions'] = (grid['clicks'] * rng.uniform(0.01, 0.1, rows)).round()
+    grid['spend'] = rng.uniform(100, 10_000, rows).round(2)
+    grid['revenue'] = (grid['spend'] * rng.uniform(0.5, 6, rows)).round(2)
+    return grid
+
+
+def random_windows(rollup, count, seed=1):
+    """(start, end) pairs inside the history, 1 day to 1 year long"""
+    rng = np.random.default_rng(seed)
+    first, last = rollup['date'].min(), rollup['date'].max()
+    span = (last - first).days
+    out = []
+    for _ in range(count):
+        length = int(rng.integers(1, min(365, span) + 1))
+        start = first + pd.Timedelta(days=int(rng.integers(length, span - length + 2)))
+        out.append((start.date(), (start + pd.Timedelta(days=length - 1)).date()))
+    return out
+
+
+def scan(rollup, start, end):
+    """Window and prior-window KPIs by filtering the rollup"""
+    length = pd.Timedelta(days=(end - start).days + 1)
+    current = totals(filter_campaigns(rollup, start=start, end=end))
+    previous = totals(filter_campaigns(rollup, start=start - length, end=start - pd.Timedelta(days=1)))
+    return current, previous
+
+
+def close(a, b):
+    return np.allclose(np.asarray(a, dtype='float64'), np.asarray(b, dtype='float64'), rtol=1e-9, equal_nan=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--years', type=float, nargs='+', default=[2, 20, 200])
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'years':>7}{'rows':>12}{'build (ms)':>12}{'scan (ms/q)':>13}{'compare (ms/q)':>16}"
+          f"{'lookup (us/q)':>15}{'speedup':>10}")
+    for years in args.years:
+        rollup = synthetic_rollup(years)
+        start_time = time.perf_counter()
+        index = WindowIndex(rollup)
+        cohorts = WindowIndex(rollup, by='channel')
+        build_ms = (time.perf_counter() - start_time) * 1000
+        windows = random_windows(rollup, args.queries)
+
+        start_time = time.perf_counter()
+        expected = [scan(rollup, start, end) for start, end in windows]
+        scan_ms = (time.perf_counter() - start_time) * 1000 / len(windows)
+        start_time = time.perf_counter()
+        actual = [index.compare(start, end).set_index('kpi') for start, end in windows]
+        compare_ms = (time.perf_counter() - start_time) * 1000 / len(windows)
+        # the lookups alone: window and prior-window KPIs as arrays, without building the result frame
+        start_time = time.perf_counter()
+        for start, end in windows:
+            prior = timedelta(days=(end - start).days + 1)
+            index.kpis(start, end), index.kpis(start - prior, end - prior)
+        lookup_us = (time.perf_counter() - start_time) * 1e6 / len(windows)
+
+        for (current, previous), table in zip(expected, actual):
+            if not (close([current[k] for k in KPIS], table.loc[KPIS, 'current'])
+                    and close([previous[k] for k in KPIS], table.loc[KPIS, 'previous'])):
+                failures += 1
+                break
+
+        # cohorts: one channel's window equals the filtered channel totals
+        start, end = windows[0]
+        by_channel = rollup_by(filter_campaigns(rollup, start=start, end=end), 'channel').set_index('channel')
+        window = cohorts.window(start, end).set_index('channel')
+        if not close(by_channel.loc[CHANNELS, MEASURES], window.loc[CHANNELS, MEASURES]):
+            failures += 1
+
+        # rolling sums against pandas rolling over the zero-filled daily series
+        daily = rollup.groupby('date')[MEASURES].sum().asfreq('D', fill_value=0)
+        for days in (7, 28):
+            reference = daily.rolling(days).sum().dropna()
+            rolling = index.rolling(days).set_index('date')
+            if not close(reference[MEASURES], rolling[MEASURES]):
+                failures += 1
+
+        print(f"{years:>7g}{len(rollup):>12,}{build_ms:>12.1f}{scan_ms:>13.2f}{compare_ms:>16.2f}"
+              f"{lookup_us:>15.1f}{scan_ms * 1000 / lookup_us:>9.0f}x")
+
+    print('\nparity ok' if not failures else f"\nMISMATCH in {failures} check(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
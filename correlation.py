@@ -0,0 +1,203 @@
+"""
+NovaMart Correlation
+=============================================
+Correlation matrices and summary statistics computed from the raw
+campaign and customer tables in one streaming pass.
+
+Each chunk of a table is folded into a MomentAccumulator:
+
+- per column: count, mean, sum of squared deviations, min and max over
+  the column's present values (the summary statistics);
+- over rows with every column present: count, means and the co-moment
+  matrix, which give the Pearson matrix;
+- a uniform sample of those rows (the k with the smallest random keys),
+  which gives the Spearman matrix. Ranks need the whole column, so they
+  cannot be accumulated; the sample holds every row while the table
+  fits in it, and the result is then exact.
+
+Accumulators merge exactly (the pairwise update of Chan et al.), so
+chunks can be folded in any order and in separate processes, e.g. one
+worker per group of Parquet row groups. Each chunk's random keys are
+seeded by its position in the table, so the sample does not depend on
+how chunks are split between workers.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_store import chunk_count, iter_chunks
+
+# Rows kept for Spearman ranks (the matrix is exact up to this many complete rows)
+SAMPLE_ROWS = 250_000
+
+# Metric sets shown on the correlation page: table and {column: label}
+METRIC_SETS = {
+    'Campaign metrics': ('campaigns', {
+        'spend': 'Ad Spend', 'impressions': 'Impressions', 'clicks': 'Clicks', 'ctr': 'CTR',
+        'conversions': 'Conversions', 'conversion_rate': 'CVR', 'revenue': 'Revenue', 'roas': 'ROAS',
+        'cpc': 'CPC', 'cpa': 'CPA',
+    }),
+    'Customer attributes': ('customers', {
+        'age': 'Age', 'income': 'Income', 'tenure_months': 'Tenure', 'lifetime_value': 'Lifetime Value',
+        'total_purchases': 'Purchases', 'avg_order_value': 'Avg Order Value', 'last_purchase_days': 'Days Since Purchase',
+        'email_open_rate': 'Email Open Rate', 'website_visits_monthly': 'Website Visits',
+        'app_sessions_monthly': 'App Sessions', 'support_tickets': 'Support Tickets',
+        'satisfaction_score': 'Satisfaction', 'churn_probability': 'Churn Probability',
+    }),
+}
+
+
+class MomentAccumulator:
+    """Mergeable moments of a set of columns: per-column summaries, co-moments and a row sample"""
+
+    def __init__(self, columns, sample_rows=SAMPLE_ROWS, seed=0):
+        p = len(columns)
+        self.columns = list(columns)
+        self.sample_rows = sample_rows
+        self.seed = seed
+        # per column, over its present values
+        self.count = np.zeros(p, dtype='int64')
+        self.mean = np.zeros(p)
+        self.m2 = np.zeros(p)
+        self.min = np.full(p, np.inf)
+        self.max = np.full(p, -np.inf)
+        self.rows = 0
+        # over complete rows
+        self.n = 0
+        self.means = np.zeros(p)
+        self.comoment = np.zeros((p, p))
+        self.sample_keys = np.empty(0)
+        self.sample = np.empty((0, p))
+
+    def update(self, frame, key=()):
+        """Fold one chunk of rows in (`key`, the chunk's position in the table, seeds its sample keys)"""
+        values = np.column_stack([frame[c].to_numpy('float64', na_value=np.nan) for c in self.columns])
+        other = MomentAccumulator(self.columns, self.sample_rows, self.seed)
+        other.rows = len(values)
+        present = np.isfinite(values)
+        other.count = present.sum(axis=0)
+        seen = other.count > 0
+        filled = np.where(present, values, 0.0)
+        other.mean[seen] = filled.sum(axis=0)[seen] / other.count[seen]
+        other.m2 = (np.where(present, values - other.mean, 0.0) ** 2).sum(axis=0)
+        other.min[seen] = np.where(present, values, np.inf).min(axis=0)[seen]
+        other.max[seen] = np.where(present, values, -np.inf).max(axis=0)[seen]
+
+        complete = values[present.all(axis=1)]
+        other.n = len(complete)
+        if other.n:
+            other.means = complete.mean(axis=0)
+            deviations = complete - other.means
+            other.comoment = deviations.T @ deviations
+            keys = np.random.default_rng([self.seed, *key]).random(other.n)
+            other.sample_keys, other.sample = _smallest(keys, complete, self.sample_rows)
+        return self.merge(other)
+
+    def merge(self, other):
+        """Fold another accumulator over the same columns into this one"""
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(total > 0, other.count / np.maximum(total, 1), 0.0)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * weight
+        self.mean = self.mean + delta * weight
+        self.count = total
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.rows += other.rows
+
+        n = self.n + other.n
+        if other.n:
+            delta = other.means - self.means
+            self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * self.n * other.n / n
+            self.means = self.means + delta * other.n / n
+            self.n = n
+            self.sample_keys, self.sample = _smallest(
+                np.concatenate([self.sample_keys, other.sample_keys]),
+                np.vstack([self.sample, other.sample]), self.sample_rows)
+        return self
+
+    def pearson(self):
+        """Pearson correlation matrix over complete rows"""
+        sd = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.outer(sd, sd)
+        np.fill_diagonal(corr, np.where(sd > 0, 1.0, np.nan))
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns, columns=self.columns)
+
+    def spearman(self):
+        """Spearman correlation matrix: Pearson over average ranks of the sampled rows"""
+        ranks = pd.DataFrame(self.sample, columns=self.columns).rank()
+        ranked = MomentAccumulator(self.columns, sample_rows=0).update(ranks)
+        return ranked.pearson()
+
+    def summary(self):
+        """Count, missing, mean, standard deviation, min and max per column"""
+        seen = self.count > 0
+        std = np.full(len(self.columns), np.nan)
+        several = self.count > 1
+        std[several] = np.sqrt(self.m2[several] / (self.count[several] - 1))
+        return pd.DataFrame({
+            'count': self.count,
+            'missing': self.rows - self.count,
+            'mean': np.where(seen, self.mean, np.nan),
+            'std': std,
+            'min': np.where(seen, self.min, np.nan),
+            'max': np.where(seen, self.max, np.nan),
+        }, index=self.columns)
+
+
+def _smallest(keys, rows, k):
+    """The k rows with the smallest keys (all of them when there are at most k)"""
+    if len(keys) <= k:
+        return keys, rows
+    keep = np.argpartition(keys, k - 1)[:k]
+    return keys[keep], rows[keep]
+
+
+def _fold(name, columns, backend, parts, sample_rows):
+    """Accumulate the listed row groups of a table (one worker's share; None reads every chunk)"""
+    acc = MomentAccumulator(columns, sample_rows)
+    for key, chunk in iter_chunks(name, columns, backend=backend, parts=parts):
+        acc.update(chunk, key=key)
+    return acc
+
+
+def table_moments(name, columns, backend='parquet', workers=1, sample_rows=SAMPLE_ROWS):
+    """Stream a table chunk by chunk into one accumulator, splitting Parquet row groups across processes"""
+    count = chunk_count(name, backend)
+    if workers <= 1 or not count or count < 2:
+        return _fold(name, columns, backend, None, sample_rows)
+    shares = [set(range(w, count, workers)) for w in range(min(workers, count))]
+    with ProcessPoolExecutor(max_workers=len(shares)) as pool:
+        results = list(pool.map(_fold, *zip(*[(name, columns, backend, share, sample_rows) for share in shares])))
+    acc = results[0]
+    for other in results[1:]:
+        acc.merge(other)
+    return acc
+
+
+def metric_statistics(backend='parquet', workers=1, sample_rows=SAMPLE_ROWS):
+    """Pearson and Spearman matrices plus summary statistics for every metric set, with display labels"""
+    out = {}
+    for title, (name, labels) in METRIC_SETS.items():
+        acc = table_moments(name, list(labels), backend=backend, workers=workers, sample_rows=sample_rows)
+        out[title] = {
+            'pearson': acc.pearson().rename(index=labels, columns=labels),
+            'spearman': acc.spearman().rename(index=labels, columns=labels),
+            'summary': acc.summary().rename(index=labels),
+            'rows': acc.n,
+            'sampled': len(acc.sample),
+        }
+    return out
+
+
+def strongest_pairs(matrix, top=5):
+    """The `top` metric pairs with the largest absolute correlation (each pair once)"""
+    upper = np.triu(np.ones(matrix.shape, dtype=bool), k=1)
+    pairs = matrix.where(upper).stack().rename('correlation').reset_index()
+    pairs.columns = ['metric_1', 'metric_2', 'correlation']
+    order = pairs['correlation'].abs().sort_values(ascending=False, kind='stable').index
+    return pairs.loc[order[:top]].reset_index(drop=True)
@@ -0,0 +1,264 @@
+"""
+NovaMart Data Store
+=============================================
+Columnar storage layer for the dashboard datasets.
+
+Each CSV is converted once into a Parquet file under .cache/parquet/,
+typed by the schema in schema.py (categoricals become dictionary-encoded
+columns). A file older than its CSV, or typed under another schema
+(its fingerprint is kept in the Parquet metadata), is converted again.
+Pages then load only the tables and columns they need.
+
+When pyarrow is not installed, or a Parquet file cannot be built, the
+loader falls back to reading the CSV directly.
+"""
+
+import hashlib
+import os
+import pandas as pd
+
+from rollup import DIMENSIONS, MEASURES, build_campaign_rollup
+from schema import apply_schema, csv_dtypes, schema_fingerprint
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# =============================================================================
+# DATASET REGISTRY
+# =============================================================================
+# NOVAMART_DATA_DIR points the dashboard at another set of CSVs (e.g. from synthetic.py)
+DATA_DIR = os.environ.get('NOVAMART_DATA_DIR') or os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(DATA_DIR, '.cache')
+PARQUET_DIR = os.path.join(CACHE_DIR, 'parquet')
+
+DATASETS = {
+    'campaigns': {'file': 'campaign_performance.csv', 'parse_dates': ['date']},
+    'customers': {'file': 'customer_data.csv'},
+    'products': {'file': 'product_sales.csv'},
+    'leads': {'file': 'lead_scoring_results.csv'},
+    'feature_importance': {'file': 'feature_importance.csv'},
+    'learning_curve': {'file': 'learning_curve.csv'},
+    'geographic': {'file': 'geographic_data.csv'},
+    'funnel': {'file': 'funnel_data.csv'},
+    'journey': {'file': 'customer_journey.csv'},
+    'customer_locations': {'file': 'customer_locations.csv'},
+}
+
+# Tables derived from a source table at load time: (source, columns, builder)
+DERIVED = {
+    'campaign_rollup': ('campaigns', DIMENSIONS + MEASURES, build_campaign_rollup),
+}
+
+# Tables (and columns) each page reads. None means every column.
+PAGE_TABLES = {
+    'executive_overview': {
+        'campaign_rollup': None,
+        'customers': ['customer_id', 'customer_segment', 'lifetime_value'],
+    },
+    'campaign_analytics': {
+        'campaign_rollup': None,
+    },
+    'customer_insights': {
+        'customers': None,
+    },
+    'product_performance': {
+        'products': None,
+    },
+    'geographic_analysis': {
+        'geographic': None,
+        'customer_locations': None,
+        'customers': ['customer_id', 'lifetime_value', 'satisfaction_score'],
+    },
+    'attribution_funnel': {
+        'funnel': None,
+        'journey': None,
+    },
+    # streamed chunk by chunk into correlation moments, never loaded whole
+    'metric_correlations': {
+        'campaigns': None,
+        'customers': None,
+    },
+    # feature columns feed the lead model, which re-scores the leads (see page_data.py)
+    'ml_model_evaluation': {
+        'leads': None,
+        'feature_importance': None,
+        'learning_curve': None,
+    },
+}
+
+BACKENDS = ('parquet', 'csv')
+
+# Parquet metadata key holding the schema a file was converted under
+SCHEMA_KEY = b'novamart.schema'
+
+# Rows per piece when a table is streamed instead of loaded
+CHUNK_ROWS = 250_000
+
+# =============================================================================
+# CONVERSION
+# =============================================================================
+def csv_path(name):
+    """Path of the source CSV for a dataset"""
+    return os.path.join(DATA_DIR, DATASETS[name]['file'])
+
+
+def parquet_path(name):
+    """Path of the converted Parquet file for a dataset"""
+    return os.path.join(PARQUET_DIR, f"{name}.parquet")
+
+
+def read_csv(name, columns=None):
+    """Read a dataset from its CSV, optionally restricted to some columns"""
+    spec = DATASETS[name]
+    kwargs = {}
+    if 'parse_dates' in spec:
+        kwargs['parse_dates'] = [c for c in spec['parse_dates'] if columns is None or c in columns]
+    if columns is not None:
+        wanted = set(columns)
+        kwargs['usecols'] = lambda c: c in wanted
+    kwargs['dtype'] = csv_dtypes(name, columns)
+    return apply_schema(name, pd.read_csv(csv_path(name), **kwargs))
+
+
+def conversion_key(name):
+    """Fingerprint of how a dataset is converted: its dtype map and load options"""
+    spec = {k: v for k, v in DATASETS[name].items() if k != 'file'}
+    return f"{schema_fingerprint(name)}:{sorted(spec.items())!r}"
+
+
+def is_stale(name):
+    """True when the Parquet file is missing, older than its CSV or written under another schema"""
+    target = parquet_path(name)
+    if not os.path.exists(target):
+        return True
+    if os.path.getmtime(target) < os.path.getmtime(csv_path(name)):
+        return True
+    try:
+        metadata = pq.read_schema(target).metadata or {}
+    except (OSError, pa.ArrowException):
+        return True
+    return metadata.get(SCHEMA_KEY, b'').decode() != conversion_key(name)
+
+
+def convert(name, force=False):
+    """Convert one dataset CSV into a dictionary-encoded Parquet file"""
+    if not HAS_PYARROW:
+        raise ImportError("pyarrow is required to write Parquet files")
+    if not force and not is_stale(name):
+        return parquet_path(name)
+
+    os.makedirs(PARQUET_DIR, exist_ok=True)
+    df = read_csv(name)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # record the schema the file was typed with, so a schema.py change reconverts it
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), SCHEMA_KEY: conversion_key(name)})
+    # write to a temp file first so concurrent readers never see a partial file
+    tmp = parquet_path(name) + '.tmp'
+    pq.write_table(table, tmp, use_dictionary=True, compression='snappy')
+    os.replace(tmp, parquet_path(name))
+    return parquet_path(name)
+
+
+def convert_all(force=False):
+    """Convert every registered dataset, returning the written paths"""
+    return [convert(name, force=force) for name in DATASETS]
+
+# =============================================================================
+# LOADING
+# =============================================================================
+def read_parquet(name, columns=None):
+    """Read a dataset from Parquet, converting it first if needed"""
+    path = convert(name)
+    if columns is not None:
+        available = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in available]
+    return apply_schema(name, pq.read_table(path, columns=columns).to_pandas())
+
+
+def load_table(name, columns=None, backend='parquet'):
+    """Load one dataset, falling back to CSV when Parquet is unavailable"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    if name in DERIVED:
+        source, source_columns, builder = DERIVED[name]
+        return builder(load_table(source, source_columns, backend=backend))
+    if backend == 'parquet' and HAS_PYARROW:
+        try:
+            return read_parquet(name, columns)
+        except (OSError, pa.ArrowException):
+            pass
+    return read_csv(name, columns)
+
+
+def source_names(name):
+    """Registered datasets a (possibly derived) table is built from"""
+    if name in DERIVED:
+        return source_names(DERIVED[name][0])
+    return [name]
+
+
+def dataset_version(names):
+    """Short hash of the source files behind some tables (path, size, mtime)"""
+    digest = hashlib.sha1()
+    for name in sorted({src for n in names for src in source_names(n)}):
+        stat = os.stat(csv_path(name))
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:12]
+
+
+def iter_chunks(name, columns=None, backend='parquet', chunk_rows=CHUNK_ROWS, parts=None):
+    """Yield (key, frame) pieces of at most chunk_rows rows without loading the dataset whole.
+
+    Parquet is read row group by row group in record batches (key: row group,
+    batch); a CSV in blocks (key: block,). `parts` keeps only the listed row
+    groups, or blocks, so separate processes can share out one file.
+    """
+    if backend == 'parquet' and HAS_PYARROW:
+        try:
+            source = pq.ParquetFile(convert(name))
+        except (OSError, pa.ArrowException):
+            source = None
+        if source is not None:
+            if columns is not None:
+                columns = [c for c in columns if c in source.schema_arrow.names]
+            for i in range(source.num_row_groups):
+                if parts is not None and i not in parts:
+                    continue
+                batches = source.iter_batches(batch_size=chunk_rows, row_groups=[i], columns=columns)
+                for b, batch in enumerate(batches):
+                    yield (i, b), apply_schema(name, batch.to_pandas())
+            return
+    usecols = None if columns is None else (lambda c: c in set(columns))
+    reader = pd.read_csv(csv_path(name), usecols=usecols, dtype=csv_dtypes(name, columns), chunksize=chunk_rows)
+    with reader:
+        for i, chunk in enumerate(reader):
+            if parts is None or i in parts:
+                yield (i,), apply_schema(name, chunk)
+
+
+def chunk_count(name, backend='parquet'):
+    """Number of Parquet row groups iter_chunks can share out (None when it reads the CSV)"""
+    if backend != 'parquet' or not HAS_PYARROW:
+        return None
+    try:
+        return pq.ParquetFile(convert(name)).num_row_groups
+    except (OSError, pa.ArrowException):
+        return None
+
+
+def load_page_data(page, backend='parquet', skip=()):
+    """Load only the tables and columns a page needs"""
+    return {
+        name: load_table(name, columns, backend=backend)
+        for name, columns in PAGE_TABLES[page].items()
+        if name not in skip
+    }
+
+
+if __name__ == "__main__":
+    for path in convert_all(force=True):
+        print(path)
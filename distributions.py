@@ -0,0 +1,261 @@
+"""
+NovaMart Distributions
+=============================================
+Server-side histogram and box-plot statistics. The charts are drawn from
+a few dozen numbers instead of shipping every raw value for Plotly to
+bin in the browser.
+
+- Histograms: counts on "nice" bin edges (as Plotly picks for nbins),
+  counted chunk by chunk with NumPy. Counts on the same edges add up, so
+  partitions merge exactly.
+- Box plots: exact quartiles, Tukey whiskers (the furthest values within
+  1.5 IQR of the box) and a capped random sample of outliers.
+- Mergeable sketches: QuantileDigest is a t-digest (k1 scale function,
+  compressed with vectorized group-by instead of one centroid at a
+  time). BoxSketch pairs a digest with the k smallest and largest values
+  seen, so whiskers and outliers stay exact unless more than k values
+  fall outside a fence. Both can be filled partition by partition and
+  merged.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 1_000_000
+
+
+def _finite(values):
+    values = np.asarray(values, dtype='float64')
+    return values[np.isfinite(values)]
+
+# =============================================================================
+# HISTOGRAMS
+# =============================================================================
+def nice_step(span, bins):
+    """Smallest 1/2/2.5/5 x 10^k bin width that covers span in at most `bins` bins"""
+    if span <= 0:
+        return 1.0
+    raw = span / bins
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 2.5, 5, 10):
+        if factor * magnitude >= raw:
+            return factor * magnitude
+    return 10 * magnitude
+
+
+def nice_edges(lo, hi, bins=30, integer=False):
+    """Bin edges on a round step; integer data gets whole-number steps and half-integer edges"""
+    step = nice_step(hi - lo, bins)
+    if integer:
+        step = max(1.0, math.ceil(step))
+        start = math.floor(lo / step) * step - 0.5
+    else:
+        start = math.floor(lo / step) * step
+    count = max(1, math.ceil((hi - start) / step + 1e-9))
+    if start + count * step <= hi:
+        count += 1
+    return start + step * np.arange(count + 1)
+
+
+def histogram(values, bins=30, edges=None, chunk_rows=CHUNK_ROWS):
+    """Counts per bin (left, right, count), on nice edges unless edges are given"""
+    values = np.asarray(values)
+    finite = _finite(values) if edges is None else None
+    if edges is None:
+        if len(finite) == 0:
+            return pd.DataFrame({'left': [], 'right': [], 'count': []})
+        integer = np.issubdtype(values.dtype, np.integer) or bool(np.all(finite == np.round(finite)))
+        edges = nice_edges(finite.min(), finite.max(), bins, integer=integer)
+    edges = np.asarray(edges, dtype='float64')
+    counts = np.zeros(len(edges) - 1, dtype='int64')
+    for start in range(0, len(values), chunk_rows):
+        counts += np.histogram(values[start:start + chunk_rows], bins=edges)[0]
+    return pd.DataFrame({'left': edges[:-1], 'right': edges[1:], 'count': counts})
+
+
+def merge_histograms(*parts):
+    """Sum histograms computed on the same edges"""
+    first = parts[0]
+    for part in parts[1:]:
+        if not np.array_equal(part['left'], first['left']):
+            raise ValueError("histograms must share bin edges to be merged")
+    return first.assign(count=sum(part['count'].to_numpy() for part in parts))
+
+# =============================================================================
+# BOX STATISTICS
+# =============================================================================
+def _box(q1, median, q3, mean, n, below, above, max_outliers, seed):
+    """Box statistics from quartiles and the sorted values below / above the fences"""
+    iqr = q3 - q1
+    low_fence, high_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    inside_low = below[below >= low_fence]
+    inside_high = above[above <= high_fence]
+    outliers = np.concatenate([below[below < low_fence], above[above > high_fence]])
+    sample = outliers
+    if len(outliers) > max_outliers:
+        sample = np.random.default_rng(seed).choice(outliers, max_outliers, replace=False)
+    return {
+        'n': int(n),
+        'mean': float(mean),
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        # Tukey whiskers: the furthest values still within the fences
+        'lowerfence': float(inside_low.min()) if len(inside_low) else float(q1),
+        'upperfence': float(inside_high.max()) if len(inside_high) else float(q3),
+        'outlier_count': int(len(outliers)),
+        'outliers': np.sort(sample),
+    }
+
+
+def box_stats(values, max_outliers=200, seed=0):
+    """Exact quartiles, whiskers and an outlier sample of a column"""
+    values = _finite(values)
+    if len(values) == 0:
+        return None
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    below = values[values < q1 - 1.5 * iqr]
+    above = values[values > q3 + 1.5 * iqr]
+    # add the extremes inside the fences so the whiskers can be found
+    inner = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    below = np.append(below, inner.min())
+    above = np.append(above, inner.max())
+    return _box(q1, median, q3, values.mean(), len(values), below, above, max_outliers, seed)
+
+# =============================================================================
+# MERGEABLE SKETCHES
+# =============================================================================
+class QuantileDigest:
+    """t-digest: weighted centroids, finest at the tails, that merge by concatenation"""
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+        # whole-number data: quantiles are rounded instead of falling between two values
+        self.integral = True
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values, chunk_rows=CHUNK_ROWS):
+        """Add raw values (chunk by chunk)"""
+        values = _finite(values)
+        for start in range(0, len(values), chunk_rows):
+            chunk = np.sort(values[start:start + chunk_rows])
+            if len(chunk):
+                self.min = min(self.min, chunk[0])
+                self.max = max(self.max, chunk[-1])
+                self.integral = self.integral and bool(np.all(chunk == np.round(chunk)))
+                self._absorb(chunk, np.ones(len(chunk)))
+        return self
+
+    def merge(self, other):
+        """Fold another digest into this one"""
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.integral = self.integral and other.integral
+        self._absorb(other.means, other.weights)
+        return self
+
+    def _absorb(self, means, weights):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        # k1 scale: a centroid may cover at most one unit of k(q) = delta / (2 pi) * asin(2q - 1)
+        total = weights.sum()
+        mid = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * mid - 1)
+        cluster = np.floor(k - k[0]).astype('int64')
+        starts = np.flatnonzero(np.r_[True, cluster[1:] != cluster[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q):
+        """Approximate quantile(s), interpolating between centroid centres"""
+        if len(self.means) == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        total = self.weights.sum()
+        centres = np.cumsum(self.weights) - self.weights / 2
+        ranks = np.r_[0.0, centres, total]
+        values = np.r_[self.min, self.means, self.max]
+        estimate = np.interp(np.asarray(q) * total, ranks, values)
+        return np.round(estimate) if self.integral else estimate
+
+    def cdf(self, x):
+        """Approximate share of values at or below x"""
+        if len(self.means) == 0:
+            return np.nan
+        total = self.weights.sum()
+        centres = np.cumsum(self.weights) - self.weights / 2
+        return np.interp(x, np.r_[self.min, self.means, self.max], np.r_[0.0, centres, total]) / total
+
+
+class BoxSketch:
+    """Mergeable box-plot statistics: a t-digest plus the k smallest and largest values"""
+
+    def __init__(self, compression=200, keep=500):
+        self.digest = QuantileDigest(compression)
+        self.keep = keep
+        self.total = 0.0
+        self.n = 0
+        self.smallest = np.empty(0)
+        self.largest = np.empty(0)
+
+    def update(self, values, chunk_rows=CHUNK_ROWS):
+        """Add raw values (chunk by chunk)"""
+        values = _finite(values)
+        self.digest.update(values, chunk_rows)
+        self.total += values.sum()
+        self.n += len(values)
+        self._extremes(values)
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        self.digest.merge(other.digest)
+        self.total += other.total
+        self.n += other.n
+        self._extremes(np.concatenate([other.smallest, other.largest]))
+        return self
+
+    def _extremes(self, values):
+        smallest = np.concatenate([self.smallest, values])
+        largest = np.concatenate([self.largest, values])
+        k = min(self.keep, len(smallest))
+        self.smallest = np.sort(np.partition(smallest, k - 1)[:k]) if k else smallest
+        k = min(self.keep, len(largest))
+        self.largest = np.sort(np.partition(largest, len(largest) - k)[len(largest) - k:]) if k else largest
+
+    def stats(self, max_outliers=200, seed=0):
+        """Box statistics in box_stats layout (whiskers exact while fewer than `keep` values pass a fence)"""
+        if self.n == 0:
+            return None
+        q1, median, q3 = self.digest.quantile([0.25, 0.5, 0.75])
+        # with at most `keep` values seen, either buffer holds all of them
+        if self.n <= self.keep:
+            below = above = self.smallest
+        else:
+            below, above = self.smallest, self.largest
+        stats = _box(q1, median, q3, self.total / self.n, self.n, below, above, max_outliers, seed)
+
+        # more than `keep` values beyond a fence: the whisker sits at the fence, the count comes from the digest
+        iqr = q3 - q1
+        low_fence, high_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        low_full = len(below) >= self.keep and below.max() < low_fence
+        high_full = len(above) >= self.keep and above.min() > high_fence
+        if low_full:
+            stats['lowerfence'] = float(max(low_fence, self.digest.min))
+        if high_full:
+            stats['upperfence'] = float(min(high_fence, self.digest.max))
+        if low_full or high_full:
+            beyond = self.digest.cdf(low_fence) + 1 - self.digest.cdf(high_fence)
+            stats['outlier_count'] = int(round(self.n * beyond))
+        return stats
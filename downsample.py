@@ -0,0 +1,121 @@
+"""
+NovaMart Downsampling
+=============================================
+Point reduction applied before figures are created, so the browser only
+receives what it can usefully draw.
+
+- Time series: Largest-Triangle-Three-Buckets (LTTB) keeps the visual
+  shape of a line with a fixed number of points.
+- Scatters: density-aware sampling caps the points kept per grid cell,
+  so dense regions are thinned while sparse regions and outliers stay.
+  Alternatively the points can be aggregated into a 2D density grid.
+"""
+
+import numpy as np
+import pandas as pd
+
+SCATTER_MODES = ['Sampled', 'Binned density', 'Full resolution']
+
+
+def _as_float(values):
+    """Numeric view of a column (datetimes become int64 nanoseconds)"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        values = values.astype('datetime64[ns]').astype('int64')
+    return values.astype('float64')
+
+# =============================================================================
+# TIME SERIES
+# =============================================================================
+def lttb_indices(x, y, n_out):
+    """Row positions picked by LTTB to draw y(x) with n_out points (x sorted)"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = _as_float(x)
+    y = _as_float(y)
+    # n_out - 2 buckets over the interior points; first and last are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    picked = np.empty(n_out, dtype=np.intp)
+    picked[0], picked[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nlo, nhi = edges[i + 1], edges[i + 2]
+        else:
+            nlo, nhi = n - 1, n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        # triangle area between the last pick, each candidate and the next bucket's mean
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def lttb_frame(df, x, ys, n_out):
+    """Downsample a frame sorted by x, keeping the LTTB picks of every y column"""
+    if len(df) <= n_out:
+        return df
+    picks = [lttb_indices(df[x].to_numpy(), df[y].to_numpy(), n_out) for y in ys]
+    rows = np.unique(np.concatenate(picks))
+    return df.iloc[rows]
+
+# =============================================================================
+# SCATTER
+# =============================================================================
+def _grid_index(values, bins):
+    """Bin number (0..bins-1) of each value on an equal-width grid"""
+    values = _as_float(values)
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    if not np.isfinite(lo) or hi == lo:
+        return np.zeros(len(values), dtype=np.intp)
+    idx = ((values - lo) / (hi - lo) * bins).astype(np.intp)
+    return np.clip(idx, 0, bins - 1)
+
+
+def _cell_cap(counts, budget):
+    """Largest per-cell cap c with sum(min(counts, c)) <= budget (at least 1)"""
+    lo, hi = 1, int(counts.max())
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if np.minimum(counts, mid).sum() <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def density_sample(x, y, budget, bins=64, groups=None, seed=0):
+    """Row positions of a density-aware sample of at most ~budget points"""
+    n = len(x)
+    if n <= budget:
+        return np.arange(n)
+
+    cell = _grid_index(x, bins) * bins + _grid_index(y, bins)
+    if groups is not None:
+        # sample each colour group separately so small groups keep their shape
+        codes, _ = pd.factorize(np.asarray(groups))
+        cell = cell + codes.astype(np.intp) * bins * bins
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(n)
+    order = order[np.argsort(cell[order], kind='stable')]
+    sorted_cells = cell[order]
+    starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    counts = np.diff(np.r_[starts, n])
+    rank = np.arange(n) - np.repeat(starts, counts)
+
+    cap = _cell_cap(counts, budget)
+    return np.sort(order[rank < cap])
+
+
+def bin_2d(x, y, bins=60):
+    """2D counts on an equal-width grid: (x centers, y centers, counts[x, y])"""
+    counts, x_edges, y_edges = np.histogram2d(_as_float(x), _as_float(y), bins=bins)
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+    return x_centers, y_centers, counts
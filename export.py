@@ -0,0 +1,181 @@
+"""
+NovaMart Report Export
+=============================================
+Headless batch export of every dashboard page's figures.
+
+Each page function from app.py runs in Streamlit's bare mode (no server,
+no browser session): widgets return their defaults and every figure the
+page draws is collected through app.FIGURE_SINK. Pages are spread
+across a process pool. The parent prebuilds each page's data snapshot
+first (snapshot.py), so the workers memory-map the same Arrow files and
+share one copy of the data through the OS page cache instead of each
+loading the tables.
+
+The bundle written to --out:
+
+- index.html: every page's figures in one self-contained file (plotly.js
+  inlined once), ready to mail or print to PDF;
+- <page_id>.json: the page's figures as Plotly JSON;
+- manifest.json: data versions, figure counts, per-page and total times.
+
+Run: python export.py [--out report] [--pages executive_overview ...] [--workers 4]
+"""
+
+import argparse
+import html
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import data_store
+from data_store import PAGE_TABLES
+
+FIGURE_HEIGHT = 480  # px, for figures that do not set their own height
+
+
+def _init_worker(chart_workers):
+    """Quiet bare-mode Streamlit and size the page's chart pool before app.py is imported"""
+    from streamlit import config
+    from streamlit.logger import set_log_level
+    # every widget and element call warns about the missing script run context otherwise;
+    # parse the config first, or parsing it later resets the level to its default
+    config.get_option('logger.level')
+    set_log_level('error')
+    os.environ['NOVAMART_PROFILE'] = '0'
+    if chart_workers is not None:
+        os.environ['NOVAMART_CHART_WORKERS'] = str(chart_workers)
+
+
+def export_page(page_id, backend, query_engine):
+    """Run one page headlessly; returns its figures as HTML fragments and Plotly JSON"""
+    import plotly.io as pio
+
+    import app
+
+    labels = {pid: label for label, pid in app.PAGES.items()}
+    result = {'page_id': page_id, 'title': labels[page_id], 'figures': [], 'error': None}
+    start = time.perf_counter()
+    figures = []
+    app.FIGURE_SINK = figures
+    try:
+        data = app.page_data(page_id, backend, False, query_engine)
+        result['version'] = data['version']
+        app.render_page(labels[page_id], data)
+    except Exception as exc:  # one broken page must not sink the whole report
+        result['error'] = f"{type(exc).__name__}: {exc}"
+        result['traceback'] = traceback.format_exc()
+    finally:
+        app.FIGURE_SINK = None
+    for i, fig in enumerate(figures):
+        result['figures'].append({
+            'title': fig.layout.title.text or f"Figure {i + 1}",
+            'json': pio.to_json(fig, validate=False),
+            'html': pio.to_html(fig, full_html=False, include_plotlyjs=False, default_height=FIGURE_HEIGHT,
+                                div_id=f"{page_id}-{i}", validate=False),
+        })
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def write_bundle(out, pages, generated):
+    """index.html and one JSON file per page"""
+    from plotly.offline import get_plotlyjs
+
+    os.makedirs(out, exist_ok=True)
+    for page in pages:
+        with open(os.path.join(out, f"{page['page_id']}.json"), 'w') as f:
+            f.write('{"page": %s, "figures": [%s]}' % (
+                json.dumps(page['title']), ', '.join(fig['json'] for fig in page['figures'])))
+
+    contents = ''.join(f'<li><a href="#{p["page_id"]}">{html.escape(p["title"])}</a></li>' for p in pages)
+    sections = []
+    for page in pages:
+        body = ''.join(f'<div class="figure">{fig["html"]}</div>' for fig in page['figures'])
+        if page['error']:
+            body += f'<p class="error">Export failed: {html.escape(page["error"])}</p>'
+        sections.append(f'<section id="{page["page_id"]}"><h2>{html.escape(page["title"])}</h2>{body}</section>')
+    with open(os.path.join(out, 'index.html'), 'w') as f:
+        f.write(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>NovaMart Marketing Analytics - {generated}</title>
+<script type="text/javascript">{get_plotlyjs()}</script>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+h1, h2 {{ color: #1f77b4; }}
+h2 {{ border-bottom: 2px solid #1f77b4; padding-bottom: 10px; }}
+section {{ page-break-before: always; }}
+.figure {{ page-break-inside: avoid; margin-bottom: 1.5em; }}
+.error {{ color: #d62728; }}
+</style></head>
+<body><h1>📊 NovaMart Marketing Analytics</h1><p>Generated {generated}</p><ul>{contents}</ul>
+{''.join(sections)}
+</body></html>
+""")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export every page's figures to a static HTML/JSON bundle")
+    parser.add_argument('--out', default='report')
+    parser.add_argument('--pages', nargs='+', default=list(PAGE_TABLES), choices=list(PAGE_TABLES))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="page processes")
+    parser.add_argument('--backend', default=os.environ.get('NOVAMART_DATA_BACKEND', 'parquet'),
+                        choices=data_store.BACKENDS)
+    parser.add_argument('--query-engine', default=os.environ.get('NOVAMART_QUERY_ENGINE', 'pandas'))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    # Build (or find) every page's snapshot once; the workers then map these files
+    if args.backend == 'parquet':
+        data_store.convert_all()
+    if os.environ.get('NOVAMART_SNAPSHOTS', '1') == '1':
+        from snapshot import load_or_build
+        for page_id in args.pages:
+            load_or_build(page_id, args.backend, False, args.query_engine)
+    prepared = time.perf_counter() - start
+
+    workers = max(1, min(args.workers, len(args.pages)))
+    # with several page processes the chart builds inside each page run inline
+    chart_workers = 1 if workers > 1 else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(chart_workers,)) as pool:
+        futures = [pool.submit(export_page, page_id, args.backend, args.query_engine) for page_id in args.pages]
+        done = {}
+        for future in as_completed(futures):
+            page = future.result()
+            done[page['page_id']] = page
+    pages = [done[page_id] for page_id in args.pages]
+    rendered = time.perf_counter() - start
+
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M')
+    write_bundle(args.out, pages, generated)
+    wall = time.perf_counter() - start
+
+    manifest = {
+        'generated': generated,
+        'pages': [{'page_id': p['page_id'], 'title': p['title'], 'version': p.get('version'),
+                   'figures': len(p['figures']), 'seconds': round(p['seconds'], 3), 'error': p['error'],
+                   'traceback': p.get('traceback')}
+                  for p in pages],
+        'workers': workers,
+        'cores': os.cpu_count(),
+        'prepare_seconds': round(prepared, 3),
+        'render_seconds': round(rendered - prepared, 3),
+        'wall_seconds': round(wall, 3),
+    }
+    with open(os.path.join(args.out, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"{'page':<24}{'figures':>8}{'seconds':>10}")
+    for page in pages:
+        print(f"{page['page_id']:<24}{len(page['figures']):>8}{page['seconds']:>10.2f}"
+              + (f"  FAILED: {page['error']}" if page['error'] else ''))
+    busy = sum(p['seconds'] for p in pages)
+    print(f"\n{len(pages)} pages, {sum(len(p['figures']) for p in pages)} figures in {wall:.2f} s wall "
+          f"({prepared:.2f} s data, {rendered - prepared:.2f} s pages, {busy:.2f} s summed page time) "
+          f"with {workers} workers on {os.cpu_count()} cores -> {os.path.abspath(args.out)}")
+    raise SystemExit(1 if any(p['error'] for p in pages) else 0)
+
+
+if __name__ == "__main__":
+    main()
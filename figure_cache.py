@@ -0,0 +1,119 @@
+"""
+NovaMart Figure Cache
+=============================================
+LRU cache for Plotly figures keyed by page, chart id, dataset version
+and the normalized filter values that produced them.
+
+Entries are evicted least-recently-used first once the estimated size
+of the cached figures passes the memory cap. Hit and miss counters are
+kept so the sidebar can show how effective the cache is.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+
+def normalize(value):
+    """Turn a filter value into a hashable, order-insensitive form"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, normalize(v)) for k, v in value.items()))
+    if isinstance(value, tuple):
+        return tuple(normalize(v) for v in value)
+    if isinstance(value, (list, set, frozenset, np.ndarray, pd.Index, pd.Series)):
+        # multiselect order does not change the filtered data
+        return tuple(sorted((normalize(v) for v in value), key=repr))
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def figure_size(fig):
+    """Approximate memory held by a figure: the size of its JSON payload"""
+    to_json = getattr(fig, 'to_json', None)
+    if to_json is None:
+        return 0
+    return len(to_json())
+
+
+class FigureCache:
+    """Thread-safe LRU cache of figures with a memory cap"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entries=512):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(page, chart_id, version, filters=None):
+        """Cache key for one chart under one filter state"""
+        return (page, chart_id, version, normalize(filters or {}))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Return a cached figure (marking it recently used) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, fig):
+        """Store a figure, evicting old entries to stay under the caps"""
+        size = figure_size(fig)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                # a single figure larger than the cap is never cached
+                return fig
+            self._entries[key] = (fig, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return fig
+
+    def get_or_build(self, key, build):
+        """Serve a cached figure, calling build() on a miss"""
+        fig = self.get(key)
+        if fig is None:
+            fig = self.put(key, build())
+        return fig
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Counters for display"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
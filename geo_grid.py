@@ -0,0 +1,161 @@
+"""
+NovaMart Geo Grid
+=============================================
+Spatial rollups of geocoded customers for the Geographic Analysis map.
+
+Points are binned into Web Mercator tiles (the slippy-map grid: 2^z x 2^z
+cells at level z), once, at the finest level. Every coarser level is
+built from the one below by halving the tile coordinates and summing, so
+the whole pyramid costs one pass over the points plus passes over cells.
+
+Each cell keeps additive sums only (customers, summed measures, the sum
+and count behind each mean, and the coordinate sums behind its centroid),
+so levels, chunks and partitions merge exactly.
+
+A map view is served from the level whose cells are a few dozen across
+the view, dropping a level while the view holds more cells than the
+point budget.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+MIN_LEVEL = 3
+MAX_LEVEL = 15
+CHUNK_ROWS = 1_000_000
+
+# Named detail levels: cells of roughly 600 km, 75 km, 10 km and 1 km in India
+DETAIL_LEVELS = {'State': 6, 'City': 9, 'District': 12, 'Street': 15}
+
+# Cells across the width of the view when the level is picked automatically
+CELLS_ACROSS = 40
+
+MAX_LATITUDE = 85.0511  # the square Web Mercator world ends here
+
+
+def tile_xy(latitude, longitude, level):
+    """Web Mercator tile column and row of each point at a level"""
+    n = 1 << level
+    lat = np.radians(np.clip(np.asarray(latitude, dtype='float64'), -MAX_LATITUDE, MAX_LATITUDE))
+    lon = np.asarray(longitude, dtype='float64')
+    x = np.floor((lon + 180) / 360 * n)
+    y = np.floor((1 - np.arcsinh(np.tan(lat)) / np.pi) / 2 * n)
+    return np.clip(x, 0, n - 1).astype('int64'), np.clip(y, 0, n - 1).astype('int64')
+
+
+def cell_km(level, latitude=0.0):
+    """Approximate width of a cell in kilometres at a latitude"""
+    return 40075.0 * math.cos(math.radians(latitude)) / (1 << level)
+
+
+def level_for_span(lon_span, cells_across=CELLS_ACROSS, min_level=MIN_LEVEL, max_level=MAX_LEVEL):
+    """Level at which a view `lon_span` degrees wide is about `cells_across` cells wide"""
+    if lon_span <= 0:
+        return max_level
+    return int(np.clip(math.floor(math.log2(360 * cells_across / lon_span)), min_level, max_level))
+
+
+def map_zoom(lon_span, width_px=700):
+    """Map zoom that fits `lon_span` degrees of longitude into a view `width_px` pixels wide"""
+    # the map draws the world 512 px wide at zoom 0
+    return float(np.clip(math.log2(360 * width_px / 512 / max(lon_span, 1e-6)), 0, 20))
+
+
+def bounds_by(points, by, lower=0.01, upper=0.99):
+    """Bounding box per group (lat_min, lat_max, lon_min, lon_max), ignoring the outer 1% of points"""
+    grouped = points.groupby(by, observed=True)
+    lat, lon = grouped['latitude'], grouped['longitude']
+    return pd.DataFrame({
+        'lat_min': lat.quantile(lower), 'lat_max': lat.quantile(upper),
+        'lon_min': lon.quantile(lower), 'lon_max': lon.quantile(upper),
+    }).astype('float64')
+
+
+class GeoGrid:
+    """Customer counts, sums and means per Web Mercator cell at every level from MIN_LEVEL to MAX_LEVEL"""
+
+    def __init__(self, points, sums=(), means=(), min_level=MIN_LEVEL, max_level=MAX_LEVEL, chunk_rows=CHUNK_ROWS):
+        self.sums = list(sums)
+        self.means = list(means)
+        self.min_level = min_level
+        self.max_level = max_level
+        self.rows = len(points)
+        self.levels = {max_level: self._bin(points, chunk_rows)}
+        for level in range(max_level - 1, min_level - 1, -1):
+            self.levels[level] = self._coarsen(self.levels[level + 1])
+
+    def _bin(self, points, chunk_rows):
+        """Finest-level cell sums, grouped chunk by chunk"""
+        parts = []
+        for start in range(0, len(points), chunk_rows):
+            chunk = points.iloc[start:start + chunk_rows]
+            x, y = tile_xy(chunk['latitude'].to_numpy(), chunk['longitude'].to_numpy(), self.max_level)
+            columns = {'x': x, 'y': y, 'customers': np.ones(len(chunk), dtype='int64'),
+                       'lat_sum': chunk['latitude'].to_numpy('float64'),
+                       'lon_sum': chunk['longitude'].to_numpy('float64')}
+            for col in self.sums:
+                columns[col] = chunk[col].to_numpy('float64', na_value=0.0)
+            for col in self.means:
+                values = chunk[col].to_numpy('float64', na_value=np.nan)
+                seen = ~np.isnan(values)
+                columns[f"{col}_sum"] = np.where(seen, values, 0.0)
+                columns[f"{col}_n"] = seen.astype('int64')
+            parts.append(pd.DataFrame(columns).groupby(['x', 'y'], sort=False).sum())
+        if not parts:
+            empty = ['x', 'y', 'customers', 'lat_sum', 'lon_sum'] + self.sums
+            empty += [f"{c}_{part}" for c in self.means for part in ('sum', 'n')]
+            return pd.DataFrame({c: np.empty(0, dtype='float64' if 'sum' in c else 'int64') for c in empty})
+        cells = pd.concat(parts)
+        if len(parts) > 1:
+            cells = cells.groupby(level=['x', 'y'], sort=False).sum()
+        return cells.reset_index()
+
+    def _coarsen(self, cells):
+        """Cells of the level above: four children summed into their parent"""
+        parents = cells.assign(x=cells['x'].to_numpy() >> 1, y=cells['y'].to_numpy() >> 1)
+        return parents.groupby(['x', 'y'], sort=False).sum().reset_index()
+
+    def cells(self, level, bounds=None):
+        """Cells of a level with centroid, customers, sums and means (within bounds when given)"""
+        raw = self.levels[level]
+        out = pd.DataFrame({
+            'x': raw['x'].to_numpy(), 'y': raw['y'].to_numpy(),
+            'latitude': raw['lat_sum'].to_numpy() / raw['customers'].to_numpy(),
+            'longitude': raw['lon_sum'].to_numpy() / raw['customers'].to_numpy(),
+            'customers': raw['customers'].to_numpy(),
+        })
+        for col in self.sums:
+            out[col] = raw[col].to_numpy()
+        for col in self.means:
+            n = raw[f"{col}_n"].to_numpy()
+            out[col] = np.divide(raw[f"{col}_sum"].to_numpy(), n, out=np.full(len(n), np.nan), where=n > 0)
+        if bounds is not None:
+            lat_min, lat_max, lon_min, lon_max = bounds
+            inside = out['latitude'].between(lat_min, lat_max) & out['longitude'].between(lon_min, lon_max)
+            out = out[inside]
+        return out.reset_index(drop=True)
+
+    def view(self, bounds, level=None, max_cells=5000, cells_across=CELLS_ACROSS):
+        """(level, cells) for a view: the requested level, or one picked from the view's width"""
+        if level is None:
+            level = level_for_span(bounds[3] - bounds[2], cells_across, self.min_level, self.max_level)
+        level = int(np.clip(level, self.min_level, self.max_level))
+        cells = self.cells(level, bounds)
+        # too many cells for the point budget: coarsen until they fit
+        while len(cells) > max_cells and level > self.min_level:
+            level -= 1
+            cells = self.cells(level, bounds)
+        return level, cells
+
+    def totals(self):
+        """Customers, sums and means over every point"""
+        raw = self.levels[self.min_level]
+        totals = {'customers': int(raw['customers'].sum())}
+        for col in self.sums:
+            totals[col] = float(raw[col].sum())
+        for col in self.means:
+            n = raw[f"{col}_n"].sum()
+            totals[col] = float(raw[f"{col}_sum"].sum() / n) if n else math.nan
+        return totals
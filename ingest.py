@@ -0,0 +1,180 @@
+"""
+NovaMart Incremental Ingestion
+=============================================
+Keeps campaign_performance in memory and folds in new rows without a
+full reload.
+
+Two sources of new rows are watched:
+
+- the CSV itself: the byte offset of the last complete line read is
+  remembered, and rows appended after it are parsed on the next poll;
+- a drop directory (incoming/campaigns/ by default): every *.csv delta
+  file with the same header is ingested once, in file-name order. A file
+  is only read once it has not been modified for SETTLE_SECONDS, so one
+  still being written is left for a later poll; producers should write
+  to another name (e.g. delta.csv.tmp) and rename it to *.csv when done.
+
+New rows are appended to the raw frame and merged into the rollup cube.
+Only the cube rows on or after the earliest new date are re-aggregated.
+If the CSV shrinks or its header changes, the state is rebuilt from
+scratch.
+"""
+
+import glob
+import hashlib
+import io
+import os
+import threading
+import time
+
+import pandas as pd
+
+from data_store import DATA_DIR, csv_path
+from schema import apply_schema, csv_dtypes
+from rollup import DIMENSIONS, MEASURES, build_campaign_rollup
+
+DROP_DIR = os.path.join(DATA_DIR, 'incoming', 'campaigns')
+COLUMNS = DIMENSIONS + MEASURES
+CATEGORICAL = ['channel', 'campaign_type', 'region']
+# Seconds a delta file must go unmodified before it is read (it may still be being written)
+SETTLE_SECONDS = float(os.environ.get('NOVAMART_INGEST_SETTLE_SECONDS', '2'))
+
+
+def _parse(raw, header):
+    """Parse CSV bytes (without header line) into the tracked columns"""
+    if not raw.strip():
+        return pd.DataFrame({c: pd.Series(dtype='float64') for c in COLUMNS})
+    df = pd.read_csv(io.BytesIO(raw), header=None, names=header, usecols=COLUMNS, parse_dates=['date'],
+                     dtype=csv_dtypes('campaigns', COLUMNS))
+    return apply_schema('campaigns', df[COLUMNS])
+
+
+def _categorize(df):
+    """Store the rollup dimensions as categoricals"""
+    for col in CATEGORICAL:
+        df[col] = df[col].astype('category')
+    return df
+
+
+def _concat(frames):
+    """Concatenate frames, extending categories instead of falling back to object"""
+    non_empty = [f for f in frames if len(f)]
+    if len(non_empty) <= 1:
+        return (non_empty or frames)[0].reset_index(drop=True)
+    frames = [f.copy() for f in non_empty]
+    for col in CATEGORICAL:
+        categories = frames[0][col].cat.categories
+        for f in frames[1:]:
+            categories = categories.append(f[col].cat.categories.difference(categories))
+        for f in frames:
+            # appending categories keeps the existing codes of the first frame valid
+            f[col] = f[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def merge_rollup(cube, delta):
+    """Add a delta cube into a date-sorted cube, touching only dates >= the delta's first day"""
+    if delta.empty:
+        return cube
+    if cube.empty:
+        return delta
+    split = cube['date'].searchsorted(delta['date'].min(), side='left')
+    head, tail = cube.iloc[:split], cube.iloc[split:]
+    tail = _concat([tail, delta])
+    tail = tail.groupby(DIMENSIONS, observed=True, sort=True)[MEASURES].sum().reset_index()
+    return _concat([head, tail])
+
+
+class CampaignIngestor:
+    """In-memory campaign frame and rollup kept current by incremental polls"""
+
+    def __init__(self, path=None, drop_dir=DROP_DIR, settle=SETTLE_SECONDS):
+        self.path = path or csv_path('campaigns')
+        self.drop_dir = drop_dir
+        self.settle = settle
+        self._lock = threading.RLock()
+        self.reload()
+
+    # -------------------------------------------------------------------------
+    def _read_from(self, offset):
+        """Complete lines from byte offset to the end of the file"""
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            raw = f.read()
+        end = raw.rfind(b'\n') + 1
+        return raw[:end], offset + end
+
+    def reload(self):
+        """Full reload of the CSV (also forgets processed delta files)"""
+        with open(self.path, 'rb') as f:
+            self.header_line = f.readline()
+        self.header = self.header_line.decode().strip().split(',')
+        raw, self.offset = self._read_from(len(self.header_line))
+        self.mtime = os.path.getmtime(self.path)
+        self.processed = set()
+        self.campaigns = _categorize(_parse(raw, self.header))
+        self.rollup = _categorize(build_campaign_rollup(self.campaigns))
+        self.generation = 0
+        self.poll()
+
+    def _changed_underneath(self):
+        """True when the CSV was truncated or rewritten rather than appended to"""
+        if os.path.getsize(self.path) < self.offset:
+            return True
+        with open(self.path, 'rb') as f:
+            return f.readline() != self.header_line
+
+    def _delta_files(self):
+        """Unprocessed delta files in the drop directory that have settled, in name order"""
+        if not self.drop_dir or not os.path.isdir(self.drop_dir):
+            return []
+        files = sorted(glob.glob(os.path.join(self.drop_dir, '*.csv')))
+        settled = time.time() - self.settle
+        ready = []
+        for f in files:
+            if os.path.basename(f) in self.processed:
+                continue
+            if os.path.getmtime(f) > settled:
+                # may still be being written: it (and, to keep name order, every later file) waits for a later poll
+                break
+            ready.append(f)
+        return ready
+
+    def _append(self, new_rows):
+        """Fold new raw rows into the frame and the rollup"""
+        if new_rows.empty:
+            return
+        new_rows = _categorize(new_rows)
+        self.campaigns = _concat([self.campaigns, new_rows])
+        self.rollup = merge_rollup(self.rollup, build_campaign_rollup(new_rows))
+        self.generation += 1
+
+    def poll(self):
+        """Ingest anything new; returns the number of rows added"""
+        with self._lock:
+            if self._changed_underneath():
+                self.reload()
+                return len(self.campaigns)
+
+            added = 0
+            if os.path.getsize(self.path) > self.offset:
+                raw, self.offset = self._read_from(self.offset)
+                self.mtime = os.path.getmtime(self.path)
+                new_rows = _parse(raw, self.header)
+                self._append(new_rows)
+                added += len(new_rows)
+
+            for path in self._delta_files():
+                new_rows = pd.read_csv(path, usecols=COLUMNS, parse_dates=['date'],
+                                       dtype=csv_dtypes('campaigns', COLUMNS))
+                new_rows = apply_schema('campaigns', new_rows[COLUMNS])
+                self._append(new_rows)
+                self.processed.add(os.path.basename(path))
+                added += len(new_rows)
+            return added
+
+    @property
+    def version(self):
+        """Changes whenever new rows are ingested"""
+        state = f"{self.path}:{self.offset}:{self.mtime}:{sorted(self.processed)}:{self.generation}"
+        return hashlib.sha1(state.encode()).hexdigest()[:12]
@@ -0,0 +1,310 @@
+"""
+NovaMart Lead Model
+=============================================
+Lead scores recomputed from the lead features instead of read from the file.
+
+- Encoding: LeadEncoder turns a lead table into one CSR matrix in a
+  vectorized pass: the numeric engagement columns standardized, then
+  company_size, industry and lead_source one-hot. Category codes become
+  column indices directly, and every row stores the same number of
+  entries (an unseen category is an explicit zero), so the matrix is
+  built from flat arrays with no per-row work.
+- Model: logistic regression on actual_converted, fitted on a stratified
+  sample of at most TRAIN_ROWS labelled leads. A stratified HOLDOUT share
+  of the labelled leads is never trained on; the model keeps their row
+  positions so the page evaluates it on them only. Feature importance is
+  permutation importance on a held-out split (the drop in ROC AUC when a
+  feature is shuffled) and the learning curve is cross-validated ROC AUC
+  at increasing training sizes, both over at most CURVE_ROWS leads.
+- Persistence: the fitted model, importance and curve are saved with
+  joblib under .cache/models, keyed by a hash of the training columns and
+  the parameters, so an unchanged lead file is never retrained.
+- Scoring: probabilities are sigmoid(X @ w + b), one sparse mat-vec per
+  chunk of CHUNK_ROWS leads. score_table splits a table's Parquet row
+  groups across processes that each load the persisted model once.
+
+Run: python lead_model.py [--workers 4] [--out scores] [--retrain]
+"""
+
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from scipy import sparse
+from scipy.special import expit
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.inspection import permutation_importance
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold, learning_curve, train_test_split
+from sklearn.pipeline import Pipeline
+
+import data_store
+from data_store import CACHE_DIR, chunk_count, iter_chunks, load_table
+from segmentation import input_hash
+
+NUMERIC_FEATURES = [
+    'website_visits', 'pages_viewed', 'time_on_site_seconds', 'email_opens', 'email_clicks',
+    'form_submissions', 'content_downloads', 'webinar_attendance', 'days_since_first_touch',
+]
+CATEGORICAL_FEATURES = ['company_size', 'industry', 'lead_source']
+FEATURES = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+TARGET = 'actual_converted'
+
+MODEL_DIR = os.path.join(CACHE_DIR, 'models')
+FORMAT = 2
+
+CHUNK_ROWS = 250_000
+# Labelled leads the model is fitted on (a stratified sample above this)
+TRAIN_ROWS = 500_000
+# Leads behind the learning curve and the permutation importance
+CURVE_ROWS = 20_000
+CURVE_SIZES = np.linspace(0.1, 1.0, 10)
+HOLDOUT = 0.2
+# predicted_class in the lead file corresponds to a 0.5 cut-off
+THRESHOLD = 0.5
+
+
+def _chunks(n, chunk_rows):
+    for start in range(0, n, chunk_rows):
+        yield slice(start, min(start + chunk_rows, n))
+
+
+class LeadEncoder(BaseEstimator, TransformerMixin):
+    """Standardized numeric features and one-hot categories as one CSR matrix"""
+
+    def __init__(self, numeric=NUMERIC_FEATURES, categorical=CATEGORICAL_FEATURES):
+        self.numeric = numeric
+        self.categorical = categorical
+
+    def fit(self, X, y=None):
+        values = np.column_stack([X[c].to_numpy('float64', na_value=np.nan) for c in self.numeric])
+        self.mean_ = np.nan_to_num(np.nanmean(values, axis=0))
+        scale = np.nan_to_num(np.nanstd(values, axis=0))
+        self.scale_ = np.where(scale > 0, scale, 1.0)
+        self.categories_ = [sorted(str(v) for v in X[c].dropna().unique()) for c in self.categorical]
+        return self
+
+    def get_feature_names_out(self, input_features=None):
+        return np.array(list(self.numeric) + [f"{c}={v}" for c, values in zip(self.categorical, self.categories_)
+                                              for v in values], dtype=object)
+
+    def transform(self, X):
+        n, p = len(X), len(self.numeric)
+        k = p + len(self.categorical)
+        index_dtype = np.int64 if n * k >= 2 ** 31 else np.int32
+        data = np.empty((n, k))
+        indices = np.empty((n, k), dtype=index_dtype)
+        values = np.column_stack([X[c].to_numpy('float64', na_value=np.nan) for c in self.numeric])
+        # a missing value sits at the mean, i.e. zero once standardized
+        data[:, :p] = np.nan_to_num((values - self.mean_) / self.scale_)
+        indices[:, :p] = np.arange(p)
+        offset = p
+        for j, (column, categories) in enumerate(zip(self.categorical, self.categories_)):
+            values = X[column]
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype('category')
+            # recoding the categories is a lookup per category, not per row; unseen ones become -1
+            codes = values.cat.rename_categories(str).cat.set_categories(categories).cat.codes.to_numpy()
+            known = codes >= 0
+            data[:, p + j] = known
+            indices[:, p + j] = offset + np.where(known, codes, 0)
+            offset += len(categories)
+        indptr = np.arange(0, n * k + 1, k, dtype=index_dtype)
+        return sparse.csr_matrix((data.ravel(), indices.ravel(), indptr), shape=(n, offset))
+
+
+def make_pipeline(seed=0):
+    """Encoder plus logistic regression (lbfgs handles the sparse matrix directly)"""
+    return Pipeline([
+        ('encode', LeadEncoder()),
+        ('model', LogisticRegression(max_iter=1000, random_state=seed)),
+    ])
+
+
+def _stratified(rows, y, size, seed):
+    """At most `size` of the given row positions, keeping the class balance"""
+    if len(rows) <= size:
+        return rows
+    return train_test_split(rows, train_size=size, stratify=y[rows], random_state=seed)[0]
+
+
+class LeadModel:
+    """Fitted lead-scoring pipeline with its feature importance and learning curve"""
+
+    def __init__(self, pipeline, feature_importance, learning_curve, summary, holdout):
+        self.pipeline = pipeline
+        # positions (in the lead table it was fitted on) of the labelled leads kept out of training
+        self.holdout = holdout
+        self.feature_importance = feature_importance
+        self.learning_curve = learning_curve
+        self.summary = summary
+
+    @classmethod
+    def fit(cls, leads, seed=0, train_rows=TRAIN_ROWS, curve_rows=CURVE_ROWS):
+        """Train on the labelled leads; importance and curve come from held-out and cross-validated scores"""
+        start = time.perf_counter()
+        positions = np.flatnonzero(leads[TARGET].notna().to_numpy())
+        labelled = leads.iloc[positions][FEATURES + [TARGET]].reset_index(drop=True)
+        y = labelled[TARGET].to_numpy('int8')
+        if len(np.unique(y)) < 2:
+            raise ValueError("Lead scoring needs both converted and unconverted leads")
+        train, holdout = train_test_split(np.arange(len(labelled)), test_size=HOLDOUT, stratify=y, random_state=seed)
+        holdout = np.sort(holdout)
+        train = _stratified(train, y, train_rows, seed)
+
+        pipeline = make_pipeline(seed).fit(labelled.loc[train, FEATURES], y[train])
+        holdout_auc = roc_auc_score(y[holdout], pipeline.predict_proba(labelled.loc[holdout, FEATURES])[:, 1])
+
+        shuffled_rows = _stratified(holdout, y, curve_rows, seed)
+        shuffled = permutation_importance(pipeline, labelled.loc[shuffled_rows, FEATURES], y[shuffled_rows],
+                                          scoring='roc_auc', n_repeats=5, random_state=seed)
+        importance = pd.DataFrame({
+            'feature': FEATURES,
+            'importance': shuffled.importances_mean,
+            'importance_std': shuffled.importances_std,
+        }).sort_values('importance', ascending=False, kind='stable').reset_index(drop=True)
+
+        sample = _stratified(np.arange(len(labelled)), y, curve_rows, seed)
+        folds = StratifiedKFold(n_splits=5, shuffle=True, random_state=seed)
+        sizes, train_scores, validation_scores = learning_curve(
+            make_pipeline(seed), labelled.loc[sample, FEATURES], y[sample], train_sizes=CURVE_SIZES, cv=folds,
+            scoring='roc_auc', shuffle=True, random_state=seed)
+        curve = pd.DataFrame({
+            'training_size': sizes,
+            'train_score': train_scores.mean(axis=1),
+            'validation_score': validation_scores.mean(axis=1),
+            'train_score_std': train_scores.std(axis=1),
+            'validation_score_std': validation_scores.std(axis=1),
+        })
+
+        summary = {
+            'labelled_rows': len(labelled),
+            'train_rows': len(train),
+            'holdout_rows': len(holdout),
+            'holdout_auc': float(holdout_auc),
+            'fit_seconds': time.perf_counter() - start,
+        }
+        return cls(pipeline, importance, curve, summary, positions[holdout])
+
+    def predict_proba(self, leads, chunk_rows=CHUNK_ROWS):
+        """Conversion probability of every lead, encoded and scored chunk by chunk"""
+        encoder, model = self.pipeline.named_steps['encode'], self.pipeline.named_steps['model']
+        weights, bias = model.coef_.ravel(), model.intercept_[0]
+        out = np.empty(len(leads))
+        for rows in _chunks(len(leads), chunk_rows):
+            out[rows] = expit(encoder.transform(leads.iloc[rows]) @ weights + bias)
+        return out
+
+    def score(self, leads, chunk_rows=CHUNK_ROWS, threshold=THRESHOLD):
+        """The lead table with predicted_probability and predicted_class replaced by fresh scores"""
+        probability = self.predict_proba(leads, chunk_rows)
+        return leads.assign(predicted_probability=probability,
+                            predicted_class=(probability >= threshold).astype('int8'))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        joblib.dump(self, tmp)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+
+def model_path(leads, seed=0, train_rows=TRAIN_ROWS, curve_rows=CURVE_ROWS):
+    """Where the model trained on these leads with these parameters is persisted"""
+    key = input_hash(leads, FEATURES + [TARGET])[:16]
+    params = f"f{FORMAT}-s{seed}-t{train_rows}-c{curve_rows}-sk{sklearn.__version__}"
+    return os.path.join(MODEL_DIR, f"lead_model-{key}-{params}.joblib")
+
+
+def load_or_train(leads, seed=0, retrain=False):
+    """The persisted model for these leads, trained (and saved) when there is none"""
+    path = model_path(leads, seed)
+    if not retrain and os.path.exists(path):
+        try:
+            return LeadModel.load(path)
+        except Exception:  # unreadable or from an incompatible version: retrain
+            pass
+    model = LeadModel.fit(leads, seed=seed)
+    model.save(path)
+    return model
+
+
+def _score_share(path, name, backend, parts, chunk_rows):
+    """Score the listed row groups of a table (one worker's share; None reads every chunk)"""
+    model = LeadModel.load(path)
+    return [(key, chunk['lead_id'].to_numpy(), model.predict_proba(chunk, chunk_rows))
+            for key, chunk in iter_chunks(name, ['lead_id'] + FEATURES, backend=backend, chunk_rows=chunk_rows,
+                                          parts=parts)]
+
+
+def score_table(path, name='leads', backend='parquet', workers=1, chunk_rows=CHUNK_ROWS, threshold=THRESHOLD):
+    """Stream a lead table through a persisted model, splitting Parquet row groups across processes"""
+    count = chunk_count(name, backend)
+    if workers <= 1 or not count or count < 2:
+        pieces = _score_share(path, name, backend, None, chunk_rows)
+    else:
+        shares = [set(range(w, count, workers)) for w in range(min(workers, count))]
+        with ProcessPoolExecutor(max_workers=len(shares)) as pool:
+            pieces = [piece for share in pool.map(_score_share, *zip(*[
+                (path, name, backend, share, chunk_rows) for share in shares])) for piece in share]
+    pieces.sort(key=lambda piece: piece[0])
+    probability = np.concatenate([p for _, _, p in pieces]) if pieces else np.empty(0)
+    return pd.DataFrame({
+        'lead_id': np.concatenate([ids for _, ids, _ in pieces]) if pieces else np.empty(0, dtype=object),
+        'predicted_probability': probability,
+        'predicted_class': (probability >= threshold).astype('int8'),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrain the lead model if needed and re-score every lead")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="scoring processes")
+    parser.add_argument('--backend', default=os.environ.get('NOVAMART_DATA_BACKEND', 'parquet'),
+                        choices=data_store.BACKENDS)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--out', help="directory for lead_scores.parquet, feature_importance.csv and learning_curve.csv")
+    parser.add_argument('--retrain', action='store_true', help="train even when a persisted model exists")
+    args = parser.parse_args()
+
+    if args.backend == 'parquet':
+        data_store.convert('leads')
+    start = time.perf_counter()
+    leads = load_table('leads', FEATURES + [TARGET], backend=args.backend)
+    model = load_or_train(leads, retrain=args.retrain)
+    path = model_path(leads)
+    del leads
+    trained = time.perf_counter()
+    scores = score_table(path, backend=args.backend, workers=args.workers, chunk_rows=args.chunk_rows)
+    scored = time.perf_counter()
+
+    summary = model.summary
+    print(f"model: {path}")
+    print(f"trained on {summary['train_rows']:,} of {summary['labelled_rows']:,} labelled leads "
+          f"(held-out ROC AUC {summary['holdout_auc']:.3f}) in {summary['fit_seconds']:.2f} s; "
+          f"loaded or trained in {trained - start:.2f} s")
+    print(f"scored {len(scores):,} leads in {scored - trained:.2f} s with {args.workers} workers: "
+          f"{len(scores) / max(scored - trained, 1e-9):,.0f} leads/s, "
+          f"{scores['predicted_class'].mean():.1%} predicted to convert")
+    print("\nfeature importance (drop in held-out ROC AUC when shuffled):")
+    print(model.feature_importance.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        scores.to_parquet(os.path.join(args.out, 'lead_scores.parquet'), index=False)
+        model.feature_importance.to_csv(os.path.join(args.out, 'feature_importance.csv'), index=False)
+        model.learning_curve.to_csv(os.path.join(args.out, 'learning_curve.csv'), index=False)
+        print(f"\nwrote scores, feature importance and learning curve to {os.path.abspath(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
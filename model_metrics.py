@@ -0,0 +1,115 @@
+"""
+NovaMart Model Metrics
+=============================================
+Threshold sweep for the lead scoring model.
+
+Predicted probabilities are sorted once. Cumulative sums then give the
+confusion counts at every distinct threshold in one pass, and precision,
+recall, F1, accuracy, ROC and PR curves follow by vector arithmetic.
+Looking up the metrics for any threshold is a binary search on the
+precomputed table.
+
+Conventions follow scikit-learn: a lead is predicted positive when
+``probability >= threshold``.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _safe_div(num, den):
+    """num / den with 0 where the denominator is zero (sklearn's zero_division=0)"""
+    num = np.asarray(num, dtype='float64')
+    den = np.asarray(den, dtype='float64')
+    out = np.zeros(np.broadcast(num, den).shape)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+def threshold_table(y_true, y_score):
+    """Confusion counts and metrics at every distinct score, highest threshold first"""
+    y_true = np.asarray(y_true).astype(bool)
+    y_score = np.asarray(y_score, dtype='float64')
+
+    order = np.argsort(y_score, kind='mergesort')[::-1]
+    y_score = y_score[order]
+    y_true = y_true[order]
+
+    # last position of each run of equal scores
+    distinct = np.flatnonzero(np.diff(y_score)) if len(y_score) else np.array([], dtype=np.intp)
+    ends = np.r_[distinct, len(y_score) - 1] if len(y_score) else distinct
+
+    tp = np.cumsum(y_true)[ends]
+    fp = (ends + 1) - tp
+    positives = int(y_true.sum())
+    negatives = len(y_true) - positives
+    fn = positives - tp
+    tn = negatives - fp
+
+    precision = _safe_div(tp, tp + fp)
+    recall = _safe_div(tp, positives)
+    table = pd.DataFrame({
+        'threshold': y_score[ends],
+        'tp': tp, 'fp': fp, 'fn': fn, 'tn': tn,
+        'precision': precision,
+        'recall': recall,
+        'f1': _safe_div(2 * precision * recall, precision + recall),
+        'accuracy': _safe_div(tp + tn, len(y_true)),
+        'fpr': _safe_div(fp, negatives),
+        'tpr': recall,
+    })
+    table.attrs['positives'] = positives
+    table.attrs['negatives'] = negatives
+    return table
+
+
+def metrics_at(table, threshold):
+    """Metrics for predicting positive when probability >= threshold (O(log n))"""
+    # thresholds are descending; count the rows whose threshold is >= the query
+    n_at_or_above = len(table) - np.searchsorted(table['threshold'].to_numpy()[::-1], threshold, side='left')
+    positives = table.attrs['positives']
+    negatives = table.attrs['negatives']
+    if n_at_or_above == 0:
+        # nothing is predicted positive
+        tp = fp = 0
+    else:
+        tp = int(table['tp'].iat[n_at_or_above - 1])
+        fp = int(table['fp'].iat[n_at_or_above - 1])
+    fn, tn = positives - tp, negatives - fp
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / positives if positives else 0.0
+    return {
+        'threshold': threshold,
+        'tp': tp, 'fp': fp, 'fn': fn, 'tn': tn,
+        'accuracy': (tp + tn) / (positives + negatives) if positives + negatives else 0.0,
+        'precision': precision,
+        'recall': recall,
+        'f1': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+    }
+
+
+def confusion(metrics):
+    """2x2 confusion matrix [[tn, fp], [fn, tp]] as in sklearn"""
+    return np.array([[metrics['tn'], metrics['fp']], [metrics['fn'], metrics['tp']]])
+
+
+def roc_points(table):
+    """False and true positive rates with the (0, 0) origin prepended"""
+    return np.r_[0.0, table['fpr'].to_numpy()], np.r_[0.0, table['tpr'].to_numpy()]
+
+
+def roc_auc(table):
+    """Area under the ROC curve (trapezoidal rule)"""
+    fpr, tpr = roc_points(table)
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+
+def pr_points(table):
+    """Precision and recall from the highest threshold down, ending at recall 1"""
+    return table['precision'].to_numpy(), table['recall'].to_numpy()
+
+
+def average_precision(table):
+    """Average precision: sum of precision weighted by recall increments"""
+    precision, recall = pr_points(table)
+    return float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
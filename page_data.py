@@ -0,0 +1,147 @@
+"""
+NovaMart Page Data
+=============================================
+Everything a page needs before it draws: the tables it reads (from the
+columnar store, or aggregated on disk by an out-of-core query engine)
+plus the aggregates and indexes precomputed once per source version.
+
+This module has no Streamlit dependency. The same builder runs inside
+the app, in the warm-up thread and in the snapshot prebuild CLI
+(snapshot.py).
+"""
+
+import os
+
+from analytics import encode_journeys, journey_attribution, threshold_sweep
+from correlation import metric_statistics
+from data_store import PAGE_TABLES, dataset_version, load_page_data
+from filter_engine import FilterIndex
+from geo_grid import GeoGrid, bounds_by
+from lead_model import load_or_train
+from product_rollup import ProductRollup
+from query_engine import get_engine
+from segmentation import CHURN_CUTOFFS, Segmenter
+from windows import WindowIndex
+
+# churn_probability cut-offs between the Low/Medium/High churn-risk bands, and the number
+# of mini-batch k-means clusters over RFM features (0 skips clustering)
+CHURN_BANDS = tuple(float(c) for c in os.environ.get('NOVAMART_CHURN_CUTOFFS', ','.join(map(str, CHURN_CUTOFFS))).split(','))
+SEGMENT_CLUSTERS = int(os.environ.get('NOVAMART_SEGMENT_CLUSTERS', '0'))
+
+# Processes that stream the correlation page's tables (Parquet row groups are split between them)
+STATS_WORKERS = int(os.environ.get('NOVAMART_STATS_WORKERS', '1'))
+
+# Re-score leads with the persisted lead model (0 shows the scores, importance and curve from the files)
+RESCORE_LEADS = os.environ.get('NOVAMART_RESCORE_LEADS', '1') == '1'
+
+# Process-wide segmentation engine (its results are cached by input hash)
+SEGMENTER = Segmenter(churn_cutoffs=CHURN_BANDS, clusters=SEGMENT_CLUSTERS)
+
+# Tables an out-of-core query engine aggregates on disk instead of loading
+ENGINE_TABLES = {
+    'executive_overview': ('campaign_rollup', 'customers'),
+    'campaign_analytics': ('campaign_rollup',),
+}
+
+# Tables a page streams in chunks instead of loading
+STREAMED_TABLES = {
+    'metric_correlations': ('campaigns', 'customers'),
+}
+
+# Tables the lead model recomputes instead of reading
+RESCORED_TABLES = {
+    'ml_model_evaluation': ('feature_importance', 'learning_curve'),
+}
+
+
+def campaign_windows(rollup):
+    """Window indexes over the campaign rollup: overall and per channel"""
+    return {'all': WindowIndex(rollup), 'channel': WindowIndex(rollup, by='channel')}
+
+
+def build_params(backend='parquet', incremental=False, query_engine='pandas'):
+    """Every setting that changes what build_page_data returns (snapshots are keyed on it)"""
+    return {
+        'backend': backend,
+        'incremental': incremental,
+        'query_engine': query_engine,
+        'churn_bands': CHURN_BANDS,
+        'segment_clusters': SEGMENT_CLUSTERS,
+        'rescore_leads': RESCORE_LEADS,
+    }
+
+
+def build_page_data(page_id, backend='parquet', incremental=False, query_engine='pandas'):
+    """Load the tables a page needs from the columnar store (CSV fallback) and precompute its aggregates"""
+    # in incremental mode the campaign rollup comes from the live ingestor instead
+    skip = ('campaign_rollup',) if incremental else ()
+    skip += STREAMED_TABLES.get(page_id, ())
+    if RESCORE_LEADS:
+        skip += RESCORED_TABLES.get(page_id, ())
+    out_of_core = query_engine != 'pandas'
+    if out_of_core:
+        skip += ENGINE_TABLES.get(page_id, ())
+    data = load_page_data(page_id, backend=backend, skip=skip)
+    engine = get_engine(query_engine) if out_of_core else get_engine('pandas', backend=backend, frames=data)
+    if out_of_core and not incremental and 'campaign_rollup' in ENGINE_TABLES.get(page_id, ()):
+        data['campaign_rollup'] = engine.campaign_rollup()
+
+    # Customer aggregates come from the query engine, never from rows in the page
+    if page_id == 'executive_overview':
+        data['customer_count'] = engine.customer_count()
+        data['segment_counts'] = engine.segment_distribution()
+        data['segment_ltv'] = engine.segment_ltv()
+        data.pop('customers', None)
+    if page_id == 'customer_insights':
+        data['nps_counts'] = engine.nps_distribution()
+        # RFM scores, churn-risk bands and clusters, recomputed only when the customer columns change
+        data['customers'] = SEGMENTER.apply(data['customers'])
+
+    # Prefix sums over the daily rollup: any window and its prior window in O(1)
+    if page_id == 'executive_overview' and 'campaign_rollup' in data:
+        data['campaign_windows'] = campaign_windows(data['campaign_rollup'])
+
+    # Index the campaign rollup once so widget changes never rescan it
+    if page_id == 'campaign_analytics' and 'campaign_rollup' in data:
+        data['campaign_index'] = FilterIndex(data['campaign_rollup'], dimensions=('channel', 'campaign_type'))
+
+    # Aggregate product sales once into the product x region x quarter cube; the rows are not kept
+    if page_id == 'product_performance':
+        data['product_rollup'] = ProductRollup(data.pop('products'))
+
+    # Re-score leads from their features (model, importance and curve persisted per lead file),
+    # then sort the scores once; every threshold is then a lookup
+    if page_id == 'ml_model_evaluation':
+        leads = data['leads']
+        if RESCORE_LEADS:
+            model = load_or_train(leads)
+            # evaluate on the leads the model never trained on, against the file's scores for the same leads
+            leads = leads.iloc[model.holdout]
+            data['file_threshold_table'] = threshold_sweep(leads)
+            leads = model.score(leads)[['actual_converted', 'predicted_probability', 'predicted_class']]
+            data['feature_importance'] = model.feature_importance
+            data['learning_curve'] = model.learning_curve
+            data['lead_model'] = model.summary
+        data['leads'] = leads
+        data['threshold_table'] = threshold_sweep(leads)
+
+    # Encode journey paths once; attribution is computed from them, not read from a file
+    if page_id == 'attribution_funnel':
+        data['journey_paths'] = encode_journeys(data['journey'])
+        data['attribution'] = journey_attribution(data['journey_paths'])
+
+    # Bin geocoded customers into map cells at every zoom level once; raw points never reach the page
+    if page_id == 'geographic_analysis':
+        points = data.pop('customer_locations').merge(data.pop('customers'), on='customer_id', how='left')
+        data['geo_grid'] = GeoGrid(points, sums=('lifetime_value',), means=('satisfaction_score',))
+        data['state_bounds'] = bounds_by(points, 'state')
+        data['city_bounds'] = bounds_by(points, ['state', 'city'])
+
+    # Correlations and summary statistics in one streaming pass over the raw tables
+    if page_id == 'metric_correlations':
+        data['metric_statistics'] = metric_statistics(backend=backend, workers=STATS_WORKERS)
+
+    # Page id and source version key the figure cache
+    data['page_id'] = page_id
+    data['version'] = dataset_version(PAGE_TABLES[page_id])
+    return data
@@ -0,0 +1,78 @@
+"""
+NovaMart Page Tasks
+=============================================
+Concurrent preparation of a page's charts.
+
+A page submits all of its independent chart builds before it renders
+anything. Figures already in the figure cache are served at once. Misses
+are built on a shared thread pool while the page lays out its widgets,
+and the page then takes each figure in render order, waiting only for
+charts that are not finished yet.
+
+Threads rather than processes: a build closure captures the page's
+frames, and it returns a Plotly figure. With processes, both would have
+to be pickled for every chart. pandas and NumPy release the GIL inside
+their kernels (groupby, sort, take, bincount...), so aggregations
+overlap. Building the Plotly figure is pure Python and does not.
+"""
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from figure_cache import FigureCache
+
+
+def make_pool(workers):
+    """Thread pool shared by every page, or None to build inline"""
+    if workers <= 1:
+        return None
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='novamart-chart')
+
+
+class ChartTasks:
+    """Chart builds of one page run, submitted up front and collected in render order"""
+
+    def __init__(self, page, version, cache, pool=None, profiler=None):
+        self.page = page
+        self.version = version
+        self.cache = cache
+        self.pool = pool
+        self.profiler = profiler
+        self._futures = {}
+
+    def submit(self, chart_id, build, **filters):
+        """Start building a chart unless the figure cache already has it"""
+        key = FigureCache.make_key(self.page, chart_id, self.version, filters)
+        fig = self.cache.get(key)
+        if fig is not None:
+            future = Future()
+            future.set_result((fig, 0.0, 'hit'))
+        elif self.pool is None:
+            future = Future()
+            try:
+                future.set_result(self._build(key, build))
+            except Exception as e:
+                # raised when the page asks for the figure, as with the pool
+                future.set_exception(e)
+        else:
+            future = self.pool.submit(self._build, key, build)
+        self._futures[chart_id] = future
+        return future
+
+    def _build(self, key, build):
+        start = time.perf_counter()
+        fig = build()
+        ms = (time.perf_counter() - start) * 1000
+        return self.cache.put(key, fig), ms, 'miss'
+
+    def __getitem__(self, chart_id):
+        """The chart's figure, waiting for its build if it is still running"""
+        fig, ms, cache = self._futures[chart_id].result()
+        if self.profiler is not None:
+            # built on a worker thread, so recorded after the fact (timing only)
+            self.profiler.add('build', chart_id, ms, cache=cache)
+            self.profiler.name_figure(fig, chart_id)
+        return fig
+
+    def __contains__(self, chart_id):
+        return chart_id in self._futures
@@ -0,0 +1,179 @@
+"""
+NovaMart Product Rollup
+=============================================
+product_sales aggregated once into a dense cube: one cell per product x
+region x quarter, holding the additive measures (sales, units, profit).
+
+A product is a leaf of the category -> subcategory -> product hierarchy
+(product names repeat across subcategories, e.g. "Footwear", so the
+leaf is the full path). Region and quarter filters select slices of the
+cube; the leaf totals of a filter are computed once and kept in a small
+LRU, and every level, top-N list and treemap is derived from those
+totals. Top-N uses argpartition, so it costs O(leaves), not a sort of
+every row.
+
+Profit margin is recomputed from summed profit and sales, never averaged
+across rows.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+LEVELS = ['category', 'subcategory', 'product_name']
+MEASURES = ['sales', 'units_sold', 'profit']
+
+
+def quarter_order(labels):
+    """Quarter labels ("Q1 2023") in calendar order"""
+    return sorted(labels, key=lambda q: (q.split()[-1], q.split()[0]))
+
+
+def _path(frame, levels):
+    """Node id: the names from the root down to the node, joined by '/'"""
+    path = frame[levels[0]].astype(str)
+    for level in levels[1:]:
+        path = path + '/' + frame[level].astype(str)
+    return path
+
+
+def _margin(profit, sales):
+    out = np.full(np.shape(profit), np.nan)
+    np.divide(profit, sales, out=out, where=np.asarray(sales) != 0)
+    return out * 100
+
+
+class ProductRollup:
+    """Sales, units and profit per product x region x quarter, with filtered totals and top-N by level"""
+
+    def __init__(self, products, max_entries=32):
+        leaves = products.groupby(LEVELS, observed=True, sort=True).ngroup().to_numpy()
+        region = pd.Categorical(products['region']).remove_unused_categories()
+        region = region.reorder_categories(sorted(region.categories))
+        quarter = pd.Categorical(products['quarter']).remove_unused_categories()
+        quarter = quarter.reorder_categories(quarter_order(quarter.categories))
+        self.regions = [str(r) for r in region.categories]
+        self.quarters = [str(q) for q in quarter.categories]
+
+        # the hierarchy: one row per leaf (its first row), with the codes of its parents
+        first = np.unique(leaves, return_index=True)[1]
+        self.leaves = products[LEVELS].iloc[first].astype(str).reset_index(drop=True)
+        for depth, level in enumerate(LEVELS[:-1], start=1):
+            self.leaves[f"{level}_code"] = pd.factorize(_path(self.leaves, LEVELS[:depth]), sort=True)[0]
+
+        shape = (len(self.leaves), len(self.regions), len(self.quarters))
+        flat = np.ravel_multi_index((leaves, region.codes, quarter.codes), shape)
+        self.cube = np.stack([
+            np.bincount(flat, weights=products[m].to_numpy('float64'), minlength=np.prod(shape)).reshape(shape)
+            for m in MEASURES
+        ])
+        self.rows = len(products)
+        self.max_entries = max_entries
+        self._totals = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # pickled (e.g. into a page snapshot) without the lock and the filter LRU
+        state = self.__dict__.copy()
+        del state['_lock'], state['_totals']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._totals = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _indices(self, selected, values):
+        if selected is None or set(selected) >= set(values):
+            return None
+        return [values.index(v) for v in selected if v in values]
+
+    def totals(self, regions=None, quarters=None):
+        """Leaf totals (measures x leaves) over the selected regions and quarters"""
+        r = self._indices(regions, self.regions)
+        q = self._indices(quarters, self.quarters)
+        key = (None if r is None else tuple(sorted(r)), None if q is None else tuple(sorted(q)))
+        with self._lock:
+            if key in self._totals:
+                self._totals.move_to_end(key)
+                return self._totals[key]
+        cube = self.cube
+        if r is not None:
+            cube = cube[:, :, r, :]
+        if q is not None:
+            cube = cube[:, :, :, q]
+        result = cube.sum(axis=(2, 3))
+        with self._lock:
+            self._totals[key] = result
+            while len(self._totals) > self.max_entries:
+                self._totals.popitem(last=False)
+        return result
+
+    def _frame(self, names, sums):
+        frame = pd.DataFrame(names)
+        for i, measure in enumerate(MEASURES):
+            frame[measure] = sums[i]
+        frame['units_sold'] = frame['units_sold'].round().astype('int64')
+        frame['profit_margin'] = _margin(frame['profit'].to_numpy(), frame['sales'].to_numpy())
+        return frame
+
+    def by(self, level, regions=None, quarters=None):
+        """Measures per node of one hierarchy level (with its parents as columns)"""
+        sums = self.totals(regions, quarters)
+        if level == 'product_name':
+            return self._frame(self.leaves[LEVELS], sums)
+        depth = LEVELS.index(level) + 1
+        codes = self.leaves[f"{level}_code"].to_numpy()
+        groups = self.leaves.drop_duplicates(f"{level}_code").sort_values(f"{level}_code")
+        grouped = np.stack([np.bincount(codes, weights=s, minlength=len(groups)) for s in sums])
+        return self._frame(groups[LEVELS[:depth]].reset_index(drop=True), grouped)
+
+    def top(self, level, n=10, measure='sales', regions=None, quarters=None):
+        """The n nodes of a level with the largest measure, largest first"""
+        nodes = self.by(level, regions, quarters)
+        values = nodes[measure].to_numpy()
+        if n < len(values):
+            keep = np.argpartition(-values, n - 1)[:n]
+            nodes = nodes.iloc[keep]
+        return nodes.sort_values(measure, ascending=False, kind='stable').reset_index(drop=True)
+
+    def by_quarter(self, regions=None):
+        """Measures per quarter in calendar order"""
+        r = self._indices(regions, self.regions)
+        cube = self.cube if r is None else self.cube[:, :, r, :]
+        sums = cube.sum(axis=(1, 2))
+        return self._frame({'quarter': self.quarters}, sums)
+
+    def hierarchy(self, top=10, regions=None, quarters=None):
+        """Treemap nodes (id, parent, label, measures): every category and subcategory, the
+        top products of each subcategory and one "Other" node for the rest"""
+        sums = self.totals(regions, quarters)
+        leaves = self._frame(self.leaves[LEVELS + ['subcategory_code']], sums)
+        leaves['rank'] = leaves.groupby('subcategory_code')['sales'].rank(method='first', ascending=False)
+        shown = leaves[leaves['rank'] <= top]
+        rest = leaves[leaves['rank'] > top]
+        other = rest.groupby(['category', 'subcategory'], sort=True)[MEASURES].sum().reset_index()
+        other['count'] = rest.groupby(['category', 'subcategory'], sort=True).size().to_numpy()
+        other['product_name'] = 'Other (' + other['count'].astype(str) + ' products)'
+
+        nodes = []
+        for level in ('category', 'subcategory'):
+            frame = self.by(level, regions, quarters)
+            depth = LEVELS.index(level) + 1
+            nodes.append(frame.assign(
+                id=_path(frame, LEVELS[:depth]),
+                parent=_path(frame, LEVELS[:depth - 1]) if depth > 1 else '',
+                label=frame[level],
+            ))
+        for frame in (shown, other):
+            if len(frame):
+                frame = frame.assign(profit_margin=_margin(frame['profit'].to_numpy(), frame['sales'].to_numpy()))
+                nodes.append(frame.assign(
+                    id=_path(frame, LEVELS),
+                    parent=_path(frame, LEVELS[:2]),
+                    label=frame['product_name'],
+                ))
+        columns = ['id', 'parent', 'label'] + MEASURES + ['profit_margin']
+        return pd.concat([node[columns] for node in nodes], ignore_index=True)
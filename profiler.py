@@ -0,0 +1,157 @@
+"""
+NovaMart Profiler
+=============================================
+Opt-in breakdown of where one script run spends its time: data load,
+filtering and aggregation, each chart's figure build (figure cache hit
+or miss), and each st.plotly_chart call, which serializes the figure
+and ships it to the browser, with the payload size.
+
+Spans nest, and every span records wall time. With allocation tracking
+on, each span also records the memory it allocated (net) and its peak,
+as tracemalloc reports them.
+tracemalloc is process-wide and slows Python code down while tracing,
+so read allocation figures with a single active session, and turn them
+off (allocations=False) when only timings matter.
+
+A disabled profiler hands out one shared no-op context manager, so
+instrumented code costs a method call per span.
+
+Run: python profiler.py trace.jsonl   (summarise a trace file)
+"""
+
+import csv
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import pandas as pd
+
+from figure_cache import figure_size
+
+# Columns of a trace record, in file order
+FIELDS = ['run', 'timestamp', 'page', 'depth', 'phase', 'name', 'ms', 'alloc_bytes', 'peak_bytes',
+          'payload_bytes', 'cache']
+
+_NOOP = nullcontext()
+_trace_lock = threading.Lock()
+
+
+class Profiler:
+    """Timed spans of one script run"""
+
+    def __init__(self, enabled=False, allocations=True, trace_path=None):
+        self.enabled = enabled
+        self.allocations = enabled and allocations
+        self.trace_path = trace_path
+        self.page = None
+        self.run = uuid.uuid4().hex[:12]
+        self.records = []
+        self._names = {}
+        # running peak of traced memory for each open span (children reset the tracemalloc peak)
+        self._peaks = []
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def span(self, phase, name=None, **fields):
+        """Context manager timing a block; yields its record (None when disabled) for extra fields"""
+        if not self.enabled:
+            return _NOOP
+        return self._span(phase, name or phase, fields)
+
+    @contextmanager
+    def _span(self, phase, name, fields):
+        record = dict(depth=len(self._peaks), phase=phase, name=name, **fields)
+        self.records.append(record)
+        if self.allocations:
+            start_bytes, peak = tracemalloc.get_traced_memory()
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            tracemalloc.reset_peak()
+        self._peaks.append(start_bytes if self.allocations else 0)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['ms'] = (time.perf_counter() - start) * 1000
+            running = self._peaks.pop()
+            if self.allocations:
+                end_bytes, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, running)
+                record['alloc_bytes'] = end_bytes - start_bytes
+                record['peak_bytes'] = peak - start_bytes
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+
+    def add(self, phase, name, ms, **fields):
+        """Record a span timed elsewhere, e.g. on a worker thread"""
+        if self.enabled:
+            self.records.append(dict(depth=len(self._peaks), phase=phase, name=name, ms=ms, **fields))
+
+    def name_figure(self, fig, name):
+        """Label a figure so its render span carries the chart id"""
+        if self.enabled:
+            self._names[id(fig)] = name
+
+    def chart(self, fig):
+        """Span around sending one figure to the browser, with its payload size"""
+        if not self.enabled:
+            return _NOOP
+        title = fig.layout.title.text if getattr(fig, 'layout', None) is not None else None
+        name = self._names.get(id(fig), title or 'figure')
+        return self._span('render', name, {'payload_bytes': figure_size(fig)})
+
+    # -------------------------------------------------------------------------
+    def frame(self):
+        """Records of this run as a table, in the order the spans started"""
+        table = pd.DataFrame(self.records, columns=FIELDS[3:])
+        indent = table['depth'].fillna(0).astype(int).map(lambda d: '  ' * d)
+        table['name'] = indent + table['name'].astype(str)
+        return table
+
+    def summary(self):
+        """Total wall time per phase"""
+        table = pd.DataFrame(self.records, columns=FIELDS[3:])
+        return table.groupby('phase', sort=False)['ms'].sum()
+
+    def finish(self):
+        """Append this run's records to the trace file, if one is configured"""
+        if self.enabled and self.trace_path and self.records:
+            stamp = datetime.now().isoformat(timespec='milliseconds')
+            rows = [dict(run=self.run, timestamp=stamp, page=self.page, **r) for r in self.records]
+            write_trace(self.trace_path, rows)
+
+
+def write_trace(path, rows):
+    """Append records to a .csv trace (header on first write) or a JSON Lines trace"""
+    with _trace_lock:
+        if path.endswith('.csv'):
+            new = not os.path.exists(path) or os.path.getsize(path) == 0
+            with open(path, 'a', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                if new:
+                    writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, 'a') as f:
+                for row in rows:
+                    f.write(json.dumps(row, default=str) + '\n')
+
+
+def read_trace(path):
+    """Load a .csv or JSON Lines trace into a frame"""
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+    return pd.read_json(path, lines=True)
+
+
+if __name__ == "__main__":
+    trace = read_trace(sys.argv[1])
+    stats = trace.groupby(['page', 'phase', 'name'])['ms'].describe(percentiles=[0.5, 0.95])
+    print(f"{trace['run'].nunique():,} runs\n")
+    print(stats[['count', 'mean', '50%', '95%', 'max']].round(1).to_string())
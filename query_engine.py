@@ -0,0 +1,296 @@
+"""
+NovaMart Query Engine
+=============================================
+Pluggable backends for the campaign and customer aggregations.
+
+- pandas (default): loads the needed columns into memory and runs the
+  functions in analytics/. This is the reference implementation.
+- duckdb: runs the same aggregations as SQL directly over the Parquet
+  file (or the CSV when no fresh Parquet exists), streaming from disk.
+- polars: runs them as lazy scan/group_by plans with the streaming
+  engine.
+
+duckdb and polars are optional dependencies. Every engine returns frames
+identical to the pandas path (same rows, order, column names and
+dtypes), so pages do not care which one answered. Pick one with
+NOVAMART_QUERY_ENGINE.
+"""
+
+import pandas as pd
+
+import analytics
+from data_store import csv_path, is_stale, load_table, parquet_path
+from rollup import DIMENSIONS, MEASURES
+from schema import apply_schema
+from segmentation import CHURN_COLUMN, CHURN_CUTOFFS, RISK_LABELS, churn_bands
+
+try:
+    import duckdb
+    HAS_DUCKDB = True
+except ImportError:
+    HAS_DUCKDB = False
+
+try:
+    import polars as pl
+    HAS_POLARS = True
+except ImportError:
+    HAS_POLARS = False
+
+ENGINES = ('pandas', 'duckdb', 'polars')
+
+# Queries every engine answers (method names shared with analytics/)
+QUERIES = ['campaign_rollup', 'customer_count', 'segment_distribution', 'segment_ltv', 'nps_distribution',
+           'churn_risk_summary']
+
+
+def source_file(name):
+    """Fresh Parquet file for a dataset if there is one, else its CSV"""
+    return csv_path(name) if is_stale(name) else parquet_path(name)
+
+
+def _as_category(df, columns):
+    """Categoricals with lexically sorted categories, as read_csv/Parquet produce"""
+    return df.astype({col: 'category' for col in columns})
+
+
+def _normalize_rollup(df):
+    """Give an engine's rollup the dtypes of build_campaign_rollup on the schema-typed frame"""
+    df = apply_schema('campaigns', df[DIMENSIONS + MEASURES])
+    df['date'] = df['date'].astype('datetime64[us]')
+    return _as_category(df, DIMENSIONS[1:]).reset_index(drop=True)
+
+
+def _counts(df, label, name='Count'):
+    """Category counts in value_counts layout"""
+    df.columns = [label, name]
+    df[name] = df[name].astype('int64')
+    return _as_category(df, [label]).reset_index(drop=True)
+
+
+def _risk_counts(df):
+    """Customers per churn band in churn_risk_summary layout (ordered bands, empty ones dropped)"""
+    df.columns = ['churn_risk', 'Count']
+    df['churn_risk'] = pd.Categorical(df['churn_risk'], categories=RISK_LABELS, ordered=True)
+    df['Count'] = df['Count'].astype('int64')
+    return df.sort_values('churn_risk').reset_index(drop=True)
+
+
+def _band_sql(cutoffs):
+    """SQL CASE mapping churn_probability to its band"""
+    whens = ' '.join(
+        f"WHEN {CHURN_COLUMN} >= {float(cut)!r} THEN '{label}'"
+        for cut, label in reversed(list(zip(sorted(cutoffs), RISK_LABELS[1:])))
+    )
+    return f"CASE WHEN {CHURN_COLUMN} IS NULL THEN NULL {whens} ELSE '{RISK_LABELS[0]}' END"
+
+
+def _risk_stats(total, high_risk, satisfaction, tickets):
+    return {
+        'high_risk': int(high_risk),
+        'high_risk_share': high_risk / total if total else 0.0,
+        'avg_satisfaction': satisfaction,
+        'avg_support_tickets': tickets,
+    }
+
+# =============================================================================
+# PANDAS (REFERENCE)
+# =============================================================================
+class PandasEngine:
+    """In-memory reference engine: load columns (or reuse loaded frames), then call analytics/"""
+
+    name = 'pandas'
+
+    def __init__(self, backend='parquet', frames=None):
+        self.backend = backend
+        self.frames = frames or {}
+
+    def _customers(self, columns):
+        if 'customers' in self.frames:
+            return self.frames['customers']
+        return load_table('customers', columns, backend=self.backend)
+
+    def campaign_rollup(self):
+        if 'campaign_rollup' in self.frames:
+            return self.frames['campaign_rollup']
+        return load_table('campaign_rollup', backend=self.backend)
+
+    def customer_count(self):
+        return len(self._customers(['customer_id']))
+
+    def segment_distribution(self):
+        return analytics.segment_distribution(self._customers(['customer_segment']))
+
+    def segment_ltv(self):
+        return analytics.segment_ltv(self._customers(['customer_segment', 'lifetime_value']))
+
+    def nps_distribution(self):
+        return analytics.nps_distribution(self._customers(['nps_category']))
+
+    def churn_risk_summary(self, cutoffs=CHURN_CUTOFFS):
+        customers = self._customers([CHURN_COLUMN, 'satisfaction_score', 'support_tickets'])
+        if 'churn_risk' not in customers:
+            customers = customers.assign(churn_risk=churn_bands(customers[CHURN_COLUMN].to_numpy(), cutoffs))
+        return analytics.churn_risk_summary(customers)
+
+# =============================================================================
+# DUCKDB
+# =============================================================================
+class DuckDBEngine:
+    """SQL over the on-disk files with an embedded DuckDB connection"""
+
+    name = 'duckdb'
+
+    def __init__(self, memory_limit=None, threads=None):
+        if not HAS_DUCKDB:
+            raise ImportError("duckdb is required for the duckdb query engine")
+        self.con = duckdb.connect()
+        if memory_limit:
+            self.con.execute(f"SET memory_limit = '{memory_limit}'")
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+
+    def _from(self, name):
+        path = source_file(name).replace("'", "''")
+        return f"read_parquet('{path}')" if path.endswith('.parquet') else f"read_csv_auto('{path}')"
+
+    def _df(self, sql):
+        return self.con.execute(sql).df()
+
+    def campaign_rollup(self):
+        # integer SUM is HUGEINT in DuckDB; cast back so it arrives as an integer column
+        sums = ', '.join(
+            f"CAST(SUM({m}) AS {'DOUBLE' if m in ('spend', 'revenue') else 'BIGINT'}) AS {m}" for m in MEASURES
+        )
+        dims = ', '.join(DIMENSIONS)
+        return _normalize_rollup(self._df(
+            f"SELECT CAST(date AS TIMESTAMP) AS date, {', '.join(DIMENSIONS[1:])}, {sums} "
+            f"FROM {self._from('campaigns')} GROUP BY {dims} ORDER BY {dims}"
+        ))
+
+    def customer_count(self):
+        return int(self.con.execute(f"SELECT COUNT(*) FROM {self._from('customers')}").fetchone()[0])
+
+    def _value_counts(self, col, label):
+        return _counts(self._df(
+            f"SELECT {col}, COUNT(*) AS n FROM {self._from('customers')} "
+            f"WHERE {col} IS NOT NULL GROUP BY {col} ORDER BY n DESC, {col}"
+        ), label)
+
+    def segment_distribution(self):
+        return self._value_counts('customer_segment', 'Segment')
+
+    def segment_ltv(self):
+        df = self._df(
+            f"SELECT customer_segment, AVG(lifetime_value) AS lifetime_value FROM {self._from('customers')} "
+            f"WHERE customer_segment IS NOT NULL GROUP BY customer_segment ORDER BY lifetime_value, customer_segment"
+        )
+        return _as_category(df, ['customer_segment'])
+
+    def nps_distribution(self):
+        return self._value_counts('nps_category', 'NPS Category')
+
+    def churn_risk_summary(self, cutoffs=CHURN_CUTOFFS):
+        banded = f"(SELECT {_band_sql(cutoffs)} AS churn_risk, * FROM {self._from('customers')})"
+        counts = self._df(
+            f"SELECT churn_risk, COUNT(*) AS Count FROM {banded} WHERE churn_risk IS NOT NULL GROUP BY churn_risk"
+        )
+        total, high_risk, satisfaction, tickets = self.con.execute(
+            f"SELECT COUNT(*), COUNT(*) FILTER (WHERE churn_risk = $high), "
+            f"AVG(satisfaction_score) FILTER (WHERE churn_risk = $high), "
+            f"AVG(support_tickets) FILTER (WHERE churn_risk = $high) FROM {banded}",
+            {'high': RISK_LABELS[-1]},
+        ).fetchone()
+        satisfaction = float('nan') if satisfaction is None else satisfaction
+        tickets = float('nan') if tickets is None else tickets
+        return _risk_counts(counts), _risk_stats(total, high_risk, satisfaction, tickets)
+
+# =============================================================================
+# POLARS
+# =============================================================================
+class PolarsEngine:
+    """Lazy Polars plans over the on-disk files, collected with the streaming engine"""
+
+    name = 'polars'
+
+    def __init__(self):
+        if not HAS_POLARS:
+            raise ImportError("polars is required for the polars query engine")
+
+    def _scan(self, name):
+        path = source_file(name)
+        return pl.scan_parquet(path) if path.endswith('.parquet') else pl.scan_csv(path, try_parse_dates=True)
+
+    def _collect(self, plan):
+        return plan.collect(engine='streaming').to_pandas()
+
+    def campaign_rollup(self):
+        plan = (
+            self._scan('campaigns')
+            .with_columns(pl.col('date').cast(pl.Datetime('us')), *(pl.col(d).cast(pl.String) for d in DIMENSIONS[1:]))
+            .group_by(DIMENSIONS)
+            .agg(pl.col(m).sum() for m in MEASURES)
+            .sort(DIMENSIONS)
+        )
+        return _normalize_rollup(self._collect(plan))
+
+    def customer_count(self):
+        return int(self._scan('customers').select(pl.len()).collect(engine='streaming').item())
+
+    def _value_counts(self, col, label):
+        plan = (
+            self._scan('customers')
+            .select(pl.col(col).cast(pl.String))
+            .drop_nulls()
+            .group_by(col)
+            .agg(pl.len().alias('n'))
+            .sort(['n', col], descending=[True, False])
+        )
+        return _counts(self._collect(plan), label)
+
+    def segment_distribution(self):
+        return self._value_counts('customer_segment', 'Segment')
+
+    def segment_ltv(self):
+        plan = (
+            self._scan('customers')
+            .select(pl.col('customer_segment').cast(pl.String), 'lifetime_value')
+            .drop_nulls('customer_segment')
+            .group_by('customer_segment')
+            .agg(pl.col('lifetime_value').mean())
+            .sort(['lifetime_value', 'customer_segment'])
+        )
+        return _as_category(self._collect(plan), ['customer_segment'])
+
+    def nps_distribution(self):
+        return self._value_counts('nps_category', 'NPS Category')
+
+    def churn_risk_summary(self, cutoffs=CHURN_CUTOFFS):
+        probability = pl.col(CHURN_COLUMN)
+        band = pl.when(probability.is_null()).then(None)
+        for cut, label in reversed(list(zip(sorted(cutoffs), RISK_LABELS[1:]))):
+            band = band.when(probability >= cut).then(pl.lit(label))
+        scan = self._scan('customers').with_columns(band.otherwise(pl.lit(RISK_LABELS[0])).alias('churn_risk'))
+        counts = self._collect(
+            scan.drop_nulls('churn_risk').group_by('churn_risk').agg(pl.len().alias('Count'))
+        )
+        is_high = pl.col('churn_risk') == RISK_LABELS[-1]
+        stats = self._collect(scan.select(
+            pl.len().alias('total'),
+            is_high.sum().alias('high_risk'),
+            pl.col('satisfaction_score').filter(is_high).mean().alias('satisfaction'),
+            pl.col('support_tickets').filter(is_high).mean().alias('tickets'),
+        )).iloc[0]
+        satisfaction = float('nan') if pd.isna(stats['satisfaction']) else float(stats['satisfaction'])
+        tickets = float('nan') if pd.isna(stats['tickets']) else float(stats['tickets'])
+        return _risk_counts(counts), _risk_stats(int(stats['total']), int(stats['high_risk']), satisfaction, tickets)
+
+
+def get_engine(name='pandas', **options):
+    """Instantiate a query engine by name"""
+    if name == 'pandas':
+        return PandasEngine(**options)
+    if name == 'duckdb':
+        return DuckDBEngine(**options)
+    if name == 'polars':
+        return PolarsEngine(**options)
+    raise ValueError(f"Unknown query engine: {name} (expected one of {', '.join(ENGINES)})")
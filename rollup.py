@@ -0,0 +1,67 @@
+"""
+NovaMart Campaign Rollup
+=============================================
+Pre-aggregated cube over campaign_performance at day x channel x
+campaign_type x region grain.
+
+Only additive measures are stored. Ratios (CTR, CVR, ROAS) are always
+recomputed from the summed parts, so every chart reports the weighted
+value instead of a mean of per-row ratios.
+"""
+
+import numpy as np
+
+DIMENSIONS = ['date', 'channel', 'campaign_type', 'region']
+MEASURES = ['impressions', 'clicks', 'conversions', 'spend', 'revenue']
+
+
+def build_campaign_rollup(campaigns):
+    """Sum the additive campaign measures at day x channel x type x region grain"""
+    cube = (
+        campaigns
+        .groupby(DIMENSIONS, observed=True, sort=True)[MEASURES]
+        .sum()
+        .reset_index()
+    )
+    return cube
+
+
+def ratio(num, den):
+    """Element-wise num / den with NaN where the denominator is zero"""
+    num = np.asarray(num, dtype='float64')
+    den = np.asarray(den, dtype='float64')
+    out = np.full(np.shape(num), np.nan)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+def add_ratios(df):
+    """Add CTR, CVR (in %) and ROAS computed from summed measures"""
+    df = df.copy()
+    df['CTR'] = ratio(df['clicks'], df['impressions']) * 100
+    df['CVR'] = ratio(df['conversions'], df['clicks']) * 100
+    df['ROAS'] = ratio(df['revenue'], df['spend'])
+    return df
+
+
+def totals(cube):
+    """Grand totals of every measure plus the derived ratios"""
+    sums = cube[MEASURES].sum()
+    result = sums.to_dict()
+    result['CTR'] = float(ratio(sums['clicks'], sums['impressions'])) * 100
+    result['CVR'] = float(ratio(sums['conversions'], sums['clicks'])) * 100
+    result['ROAS'] = float(ratio(sums['revenue'], sums['spend']))
+    return result
+
+
+def rollup_by(cube, by):
+    """Re-aggregate the cube by one or more dimensions, with ratios"""
+    out = cube.groupby(by, observed=True, sort=True)[MEASURES].sum().reset_index()
+    return add_ratios(out)
+
+
+def rollup_by_month(cube):
+    """Re-aggregate the cube to calendar months (labelled by month start)"""
+    months = cube['date'].dt.to_period('M').dt.to_timestamp()
+    out = cube.groupby(months, sort=True)[MEASURES].sum().reset_index()
+    return add_ratios(out)
@@ -0,0 +1,182 @@
+"""
+NovaMart Schema
+=============================================
+Explicit compact dtypes for every dataset, and a memory report.
+
+- Repeated strings are categoricals (ordered where the order means
+  something, e.g. day of week).
+- Counters are downcast to the smallest integer type that fits. A
+  column whose values do not fit keeps its wider type.
+- Ratios and scores are float32. Money columns stay float64 because
+  they are summed into large totals. Probabilities also stay float64
+  because they are compared against user-chosen thresholds.
+- Campaign dates are parsed once into a single datetime column.
+
+Run ``python schema.py`` for a before/after memory report of all tables.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+CATEGORY = 'category'
+DAYS = pd.CategoricalDtype(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+                           ordered=True)
+MONTHS = pd.CategoricalDtype(['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August',
+                              'September', 'October', 'November', 'December'], ordered=True)
+QUARTERS = pd.CategoricalDtype(['Q1', 'Q2', 'Q3', 'Q4'], ordered=True)
+
+SCHEMAS = {
+    'campaigns': {
+        'date': 'datetime64[ns]',
+        'campaign_id': CATEGORY, 'campaign_name': CATEGORY, 'campaign_type': CATEGORY,
+        'channel': CATEGORY, 'region': CATEGORY,
+        'impressions': 'int32', 'clicks': 'int32', 'conversions': 'int32',
+        'spend': 'float64', 'revenue': 'float64',
+        'day_of_week': DAYS, 'month': MONTHS, 'quarter': QUARTERS, 'year': 'int16',
+        'ctr': 'float32', 'conversion_rate': 'float32', 'cpc': 'float32', 'cpa': 'float32', 'roas': 'float32',
+    },
+    'customers': {
+        'gender': CATEGORY, 'age': 'int8', 'age_group': CATEGORY, 'income': 'int32',
+        'income_bracket': CATEGORY, 'region': CATEGORY, 'city_tier': CATEGORY,
+        'customer_segment': CATEGORY, 'acquisition_channel': CATEGORY,
+        'tenure_months': 'int16', 'lifetime_value': 'int32', 'total_purchases': 'int16',
+        'avg_order_value': 'float32', 'last_purchase_days': 'int16', 'email_open_rate': 'float32',
+        'website_visits_monthly': 'int16', 'app_sessions_monthly': 'int16', 'support_tickets': 'int16',
+        'satisfaction_score': 'float32', 'nps_category': CATEGORY, 'is_churned': 'int8',
+        'churn_probability': 'float64',
+    },
+    'products': {
+        'product_name': CATEGORY, 'category': CATEGORY, 'subcategory': CATEGORY,
+        'region': CATEGORY, 'quarter': CATEGORY, 'year': 'int16',
+        'sales': 'float64', 'units_sold': 'int32', 'profit': 'float64',
+        'profit_margin': 'float32', 'return_rate': 'float32', 'avg_rating': 'float32', 'review_count': 'int32',
+    },
+    'leads': {
+        'company_size': CATEGORY, 'industry': CATEGORY,
+        'website_visits': 'int16', 'pages_viewed': 'int16', 'time_on_site_seconds': 'int32',
+        'email_opens': 'int16', 'email_clicks': 'int16', 'form_submissions': 'int16',
+        'content_downloads': 'int16', 'webinar_attendance': 'int16', 'days_since_first_touch': 'int16',
+        'lead_source': CATEGORY, 'actual_converted': 'int8',
+        'predicted_probability': 'float64', 'predicted_class': 'int8',
+    },
+    'feature_importance': {'importance': 'float32', 'importance_std': 'float32'},
+    'learning_curve': {
+        'training_size': 'int32', 'train_score': 'float32', 'validation_score': 'float32',
+        'train_score_std': 'float32', 'validation_score_std': 'float32',
+    },
+    'geographic': {
+        'region': CATEGORY, 'latitude': 'float32', 'longitude': 'float32',
+        'total_customers': 'int32', 'total_revenue': 'int64', 'revenue_per_customer': 'float32',
+        'store_count': 'int16', 'market_penetration': 'float32', 'yoy_growth': 'float32',
+        'customer_satisfaction': 'float32', 'avg_delivery_days': 'float32',
+    },
+    'funnel': {'visitors': 'int32', 'conversion_rate': 'float32'},
+    'journey': {
+        'touchpoint_1': CATEGORY, 'touchpoint_2': CATEGORY, 'touchpoint_3': CATEGORY,
+        'touchpoint_4': CATEGORY, 'customer_count': 'int32',
+    },
+    'customer_locations': {
+        'state': CATEGORY, 'city': CATEGORY, 'latitude': 'float32', 'longitude': 'float32',
+    },
+}
+
+
+def schema_fingerprint(name):
+    """Short hash of a dataset's dtype map (files converted under another schema are stale)"""
+    return hashlib.sha1(repr(SCHEMAS.get(name, {})).encode()).hexdigest()[:12]
+
+
+def csv_dtypes(name, columns=None):
+    """Categorical dtypes to hand to read_csv so strings are never materialized"""
+    return {
+        col: dtype for col, dtype in SCHEMAS.get(name, {}).items()
+        if (dtype == CATEGORY or isinstance(dtype, pd.CategoricalDtype))
+        and (columns is None or col in columns)
+    }
+
+
+def _fits(values, dtype):
+    """True when every value can be stored in the integer dtype"""
+    if len(values) == 0:
+        return True
+    info = np.iinfo(dtype)
+    return info.min <= values.min() and values.max() <= info.max
+
+
+def apply_schema(name, df):
+    """Cast the columns of a dataset to their compact dtypes"""
+    schema = SCHEMAS.get(name, {})
+    casts = {}
+    for col, dtype in schema.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        if isinstance(dtype, str) and dtype.startswith('int'):
+            # safe downcast only: keep the wider type if values do not fit
+            if not pd.api.types.is_integer_dtype(df[col].dtype) or not _fits(df[col], dtype):
+                continue
+        if isinstance(dtype, str) and dtype.startswith('datetime'):
+            df = df.assign(**{col: pd.to_datetime(df[col])})
+            continue
+        casts[col] = dtype
+    return df.astype(casts) if casts else df
+
+# =============================================================================
+# MEMORY REPORT
+# =============================================================================
+def memory_by_column(df):
+    """Deep memory usage in bytes per column (including the index)"""
+    return df.memory_usage(deep=True, index=True)
+
+
+def memory_report(before, after):
+    """Per-column before/after bytes for two dicts of frames keyed by table"""
+    rows = []
+    for name, df_after in after.items():
+        df_before = before.get(name)
+        usage_after = memory_by_column(df_after)
+        usage_before = memory_by_column(df_before) if df_before is not None else usage_after
+        for col in usage_after.index:
+            rows.append({
+                'table': name,
+                'column': col,
+                'dtype_before': str(df_before[col].dtype) if df_before is not None and col in df_before else '',
+                'dtype_after': str(df_after[col].dtype) if col in df_after else '',
+                'bytes_before': int(usage_before.get(col, 0)),
+                'bytes_after': int(usage_after[col]),
+            })
+    return pd.DataFrame(rows)
+
+
+def table_summary(report):
+    """Per-table totals of a memory report, with the saving ratio"""
+    summary = report.groupby('table', sort=False)[['bytes_before', 'bytes_after']].sum()
+    summary['ratio'] = summary['bytes_before'] / summary['bytes_after']
+    return summary.reset_index()
+
+
+if __name__ == "__main__":
+    import argparse
+    from data_store import DATASETS, csv_path, load_table
+
+    parser = argparse.ArgumentParser(description="Memory per table and column, default dtypes vs schema")
+    parser.add_argument('--columns', action='store_true', help="also print the per-column breakdown")
+    args = parser.parse_args()
+
+    before = {
+        name: pd.read_csv(csv_path(name), parse_dates=spec.get('parse_dates', False), index_col=spec.get('index_col'))
+        for name, spec in DATASETS.items()
+    }
+    after = {name: load_table(name) for name in DATASETS}
+    report = memory_report(before, after)
+
+    pd.set_option('display.width', 160)
+    pd.set_option('display.max_rows', 500)
+    if args.columns:
+        print(report.to_string(index=False))
+        print()
+    summary = table_summary(report)
+    print(summary.to_string(index=False, formatters={'ratio': '{:.1f}x'.format}))
+    total_before, total_after = summary['bytes_before'].sum(), summary['bytes_after'].sum()
+    print(f"\ntotal: {total_before / 1e6:.2f} MB -> {total_after / 1e6:.2f} MB ({total_before / total_after:.1f}x)")
@@ -0,0 +1,209 @@
+"""
+NovaMart Segmentation
+=============================================
+Customer segments recomputed from behaviour instead of read from the file.
+
+- RFM: recency (last_purchase_days, fewer is better), frequency
+  (total_purchases) and monetary value (lifetime_value), each scored 1-5
+  against the column's quintile cut-offs. The R score and the rounded
+  mean of F and M pick a named segment from SEGMENT_GRID.
+- Churn risk: Low / Medium / High bands of churn_probability at
+  configurable cut-offs.
+- Clusters (optional): mini-batch k-means on standardized log-RFM
+  features.
+
+Quantiles use np.quantile (linear time). Scoring, banding and cluster
+assignment are searchsorted/argmin passes over fixed-size row chunks,
+so temporaries stay bounded at tens of millions of customers. Results
+are cached by a hash of the input columns plus the parameters, so an
+unchanged customer base is never rescored.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+RFM_COLUMNS = ['last_purchase_days', 'total_purchases', 'lifetime_value']
+CHURN_COLUMN = 'churn_probability'
+
+# churn_probability below 0.2 is Low, below 0.4 Medium, otherwise High
+CHURN_CUTOFFS = (0.2, 0.4)
+RISK_LABELS = ['Low', 'Medium', 'High']
+
+# Named segment by recency score (rows, 1..5) and frequency/monetary score (columns, 1..5)
+SEGMENT_GRID = [
+    ['Lost', 'Lost', 'At Risk', 'At Risk', "Can't Lose"],
+    ['Hibernating', 'Hibernating', 'At Risk', 'At Risk', 'At Risk'],
+    ['About to Sleep', 'About to Sleep', 'Need Attention', 'Loyal', 'Loyal'],
+    ['Promising', 'Potential Loyalist', 'Potential Loyalist', 'Loyal', 'Loyal'],
+    ['New', 'Potential Loyalist', 'Potential Loyalist', 'Champions', 'Champions'],
+]
+SEGMENTS = list(dict.fromkeys(name for row in SEGMENT_GRID[::-1] for name in row[::-1]))
+
+CHUNK_ROWS = 1_000_000
+
+
+def _chunks(n, chunk_rows):
+    for start in range(0, n, chunk_rows):
+        yield slice(start, min(start + chunk_rows, n))
+
+
+def input_hash(frame, columns):
+    """Digest of the values in the given columns (row order matters, index does not)"""
+    digest = hashlib.sha1()
+    digest.update(repr(list(columns)).encode())
+    for rows in _chunks(len(frame), CHUNK_ROWS):
+        hashed = pd.util.hash_pandas_object(frame[list(columns)].iloc[rows], index=False)
+        digest.update(hashed.to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+# =============================================================================
+# RFM SCORES
+# =============================================================================
+def quintile_cutoffs(values):
+    """20/40/60/80% cut-offs of a column (missing values ignored)"""
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return np.zeros(4)
+    return np.quantile(values, [0.2, 0.4, 0.6, 0.8])
+
+
+def score(values, cutoffs, reverse=False):
+    """1-5 score of each value against quintile cut-offs (5 = best; reverse when lower is better)"""
+    bins = np.searchsorted(cutoffs, values, side='left').astype('int8')
+    scores = (5 - bins) if reverse else (bins + 1)
+    scores[np.isnan(values)] = 1  # missing scores worst
+    return scores
+
+
+def rfm_scores(recency, frequency, monetary, chunk_rows=CHUNK_ROWS):
+    """R, F and M scores (int8 arrays), scored chunk by chunk against global cut-offs"""
+    columns = [np.asarray(c, dtype='float64') for c in (recency, frequency, monetary)]
+    cutoffs = [quintile_cutoffs(c) for c in columns]
+    out = np.empty((3, len(columns[0])), dtype='int8')
+    for rows in _chunks(len(columns[0]), chunk_rows):
+        for i, (values, cuts) in enumerate(zip(columns, cutoffs)):
+            out[i, rows] = score(values[rows], cuts, reverse=i == 0)
+    return out[0], out[1], out[2]
+
+
+def rfm_segments(r, f, m):
+    """Named RFM segment per customer, as a categorical in SEGMENTS order"""
+    fm = np.floor((f.astype('int16') + m + 1) / 2).astype('int8')  # half up
+    lookup = np.array([[SEGMENTS.index(name) for name in row] for row in SEGMENT_GRID], dtype='int8')
+    codes = lookup[r - 1, fm - 1]
+    return pd.Categorical.from_codes(codes, categories=SEGMENTS)
+
+# =============================================================================
+# CHURN BANDS
+# =============================================================================
+def churn_bands(probability, cutoffs=CHURN_CUTOFFS, labels=RISK_LABELS):
+    """Ordered Low/Medium/High band per customer (a value equal to a cut-off goes up a band)"""
+    if len(labels) != len(cutoffs) + 1:
+        raise ValueError(f"{len(cutoffs)} cut-offs need {len(cutoffs) + 1} labels, got {len(labels)}")
+    probability = np.asarray(probability, dtype='float64')
+    codes = np.searchsorted(np.sort(cutoffs), probability, side='right').astype('int8')
+    codes[np.isnan(probability)] = -1
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+# =============================================================================
+# MINI-BATCH K-MEANS
+# =============================================================================
+def rfm_features(recency, frequency, monetary):
+    """log1p RFM values standardized to zero mean and unit variance (float32)"""
+    features = np.log1p(np.column_stack([recency, frequency, monetary]).astype('float64').clip(min=0))
+    std = features.std(axis=0)
+    return ((features - features.mean(axis=0)) / np.where(std > 0, std, 1)).astype('float32')
+
+
+def nearest(features, centers, chunk_rows=CHUNK_ROWS):
+    """Index of the closest center for every row"""
+    labels = np.empty(len(features), dtype='int16')
+    norms = (centers ** 2).sum(axis=1)
+    for rows in _chunks(len(features), chunk_rows):
+        # |x - c|^2 without the |x|^2 term, which is the same for every center
+        labels[rows] = np.argmin(norms - 2 * features[rows] @ centers.T, axis=1)
+    return labels
+
+
+def minibatch_kmeans(features, k=5, batch_size=4096, steps=300, seed=0):
+    """Centers from mini-batch k-means (Sculley 2010), seeded with k-means++ on a sample"""
+    rng = np.random.default_rng(seed)
+    n = len(features)
+    sample = features[rng.choice(n, size=min(n, 10_000), replace=False)]
+    centers = [sample[rng.integers(len(sample))]]
+    for _ in range(1, k):
+        dist = ((sample[:, None, :] - np.array(centers)[None]) ** 2).sum(axis=2).min(axis=1)
+        centers.append(sample[rng.choice(len(sample), p=dist / dist.sum())] if dist.sum() > 0 else sample[0])
+    centers = np.array(centers, dtype='float64')
+    counts = np.zeros(k)
+    for _ in range(steps):
+        batch = features[rng.integers(0, n, batch_size)]
+        labels = nearest(batch, centers)
+        batch_counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=batch[:, j], minlength=k) for j in range(batch.shape[1])], axis=1)
+        counts += batch_counts
+        seen = batch_counts > 0
+        # per-center learning rate 1/count: centers move toward the batch mean of their points
+        rate = batch_counts[seen] / counts[seen]
+        centers[seen] += rate[:, None] * (sums[seen] / batch_counts[seen, None] - centers[seen])
+    return centers.astype('float32')
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+class Segmenter:
+    """RFM scores, churn bands and optional clusters for a customer table, cached by input hash"""
+
+    def __init__(self, churn_cutoffs=CHURN_CUTOFFS, clusters=0, chunk_rows=CHUNK_ROWS, seed=0, max_entries=4):
+        self.churn_cutoffs = tuple(churn_cutoffs)
+        self.clusters = clusters
+        self.chunk_rows = chunk_rows
+        self.seed = seed
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def columns(self):
+        return RFM_COLUMNS + [CHURN_COLUMN]
+
+    def compute(self, customers):
+        """Segment columns for every customer (same row order as the input)"""
+        recency, frequency, monetary = (customers[c].to_numpy() for c in RFM_COLUMNS)
+        r, f, m = rfm_scores(recency, frequency, monetary, chunk_rows=self.chunk_rows)
+        result = pd.DataFrame({
+            'recency_score': r,
+            'frequency_score': f,
+            'monetary_score': m,
+            'rfm_score': r.astype('int16') * 100 + f * 10 + m,
+            'rfm_segment': rfm_segments(r, f, m),
+            'churn_risk': churn_bands(customers[CHURN_COLUMN].to_numpy(), self.churn_cutoffs),
+        })
+        if self.clusters and len(customers) >= self.clusters:
+            features = rfm_features(recency, frequency, monetary)
+            centers = minibatch_kmeans(features, k=self.clusters, seed=self.seed)
+            result['cluster'] = nearest(features, centers, self.chunk_rows).astype('int8')
+        return result
+
+    def segment(self, customers):
+        """Segment columns, computed once per distinct input and parameter set"""
+        key = (input_hash(customers, self.columns()), self.churn_cutoffs, self.clusters, self.seed)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+        result = self.compute(customers)
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return result
+
+    def apply(self, customers):
+        """The customer table with the segment columns added (or replaced)"""
+        segments = self.segment(customers).set_axis(customers.index)
+        return customers.drop(columns=segments.columns, errors='ignore').join(segments)
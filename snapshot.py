@@ -0,0 +1,286 @@
+"""
+NovaMart Snapshots
+=============================================
+Materialized page data on disk, so a restarted process maps what the
+last one computed instead of reloading and re-aggregating every table.
+
+A snapshot holds everything build_page_data returns for one page: each
+DataFrame as an uncompressed Arrow IPC file (memory-mapped on load, so
+numeric columns are read straight from the page cache) and the other
+objects (filter indexes, encoded journeys, scalars) in one pickle.
+
+Snapshots live under .cache/snapshots/<page>/<key>/. The key hashes the
+content of the page's source CSVs, the code that shapes page data and
+the build settings, so an edited CSV, a deploy or another setting never
+reads a stale snapshot. Source hashes are remembered by (size, mtime),
+so an unchanged file is not re-read on every start. Snapshots are
+written to a temporary directory and renamed into place, so a reader
+never sees a partial one.
+
+Prebuild every page (e.g. in the deploy pipeline, before the app starts):
+
+    python snapshot.py [--pages customer_insights ...] [--force] [--verify]
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+
+import pandas as pd
+
+import data_store
+from data_store import CACHE_DIR, PAGE_TABLES, csv_path, dataset_version, source_names
+from page_data import build_page_data, build_params
+
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, 'snapshots')
+HASH_FILE = os.path.join(SNAPSHOT_DIR, 'sources.json')
+
+# Bumped when the snapshot layout changes
+FORMAT = 1
+
+# Snapshots kept per page (one per build setting in use)
+KEEP = 4
+
+# Modules whose code decides what page data contains
+CODE_MODULES = [
+    'data_store.py', 'schema.py', 'rollup.py', 'product_rollup.py', 'filter_engine.py', 'query_engine.py',
+    'attribution.py', 'model_metrics.py', 'segmentation.py', 'geo_grid.py', 'windows.py', 'correlation.py',
+    'lead_model.py', 'page_data.py', 'snapshot.py',
+]
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_hash_lock = threading.Lock()
+
+# =============================================================================
+# KEYS
+# =============================================================================
+def file_hash(path, chunk_bytes=1 << 22):
+    """SHA-1 of a file's content"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_bytes), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_hashes(names):
+    """Content hash of each registered dataset, re-read only when its size or mtime changed"""
+    with _hash_lock:
+        try:
+            with open(HASH_FILE) as f:
+                known = json.load(f)
+        except (OSError, ValueError):
+            known = {}
+        hashes, changed = {}, False
+        for name in sorted(names):
+            path = csv_path(name)
+            stat = os.stat(path)
+            stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+            entry = known.get(path)
+            if entry is None or entry['stamp'] != stamp:
+                entry = known[path] = {'stamp': stamp, 'sha1': file_hash(path)}
+                changed = True
+            hashes[name] = entry['sha1']
+        if changed:
+            _write_json(HASH_FILE, known)
+        return hashes
+
+
+@functools.lru_cache(maxsize=1)
+def code_version():
+    """Hash of the modules that shape page data (analytics package included)"""
+    analytics_dir = os.path.join(ROOT, 'analytics')
+    paths = [os.path.join(ROOT, name) for name in CODE_MODULES]
+    paths += sorted(os.path.join(analytics_dir, name) for name in os.listdir(analytics_dir) if name.endswith('.py'))
+    digest = hashlib.sha1(f"format {FORMAT};".encode())
+    for path in paths:
+        digest.update(os.path.relpath(path, ROOT).encode())
+        digest.update(file_hash(path).encode())
+    return digest.hexdigest()
+
+
+def snapshot_key(page_id, params):
+    """Key of a page's snapshot: source content, code version and build settings"""
+    names = {src for table in PAGE_TABLES[page_id] for src in source_names(table)}
+    state = {
+        'page': page_id,
+        'sources': source_hashes(names),
+        'code': code_version(),
+        'params': params,
+    }
+    return hashlib.sha1(json.dumps(state, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def snapshot_path(page_id, key):
+    return os.path.join(SNAPSHOT_DIR, page_id, key)
+
+# =============================================================================
+# READ / WRITE
+# =============================================================================
+def _write_json(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+def _is_frame(value):
+    # a frame with non-string column labels cannot round-trip through Arrow
+    return isinstance(value, pd.DataFrame) and all(isinstance(c, str) for c in value.columns)
+
+
+def save(data, path):
+    """Write page data to a snapshot directory (atomically); returns its size in bytes"""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    tables, objects = {}, {}
+    for name, value in data.items():
+        if not _is_frame(value):
+            objects[name] = value
+            continue
+        table = pa.Table.from_pandas(value)
+        # uncompressed, so the file can be memory-mapped and read without decoding
+        with pa.OSFile(os.path.join(tmp, f"{name}.arrow"), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        tables[name] = dict(value.attrs)
+    # frame attrs (e.g. threshold_table's class counts) travel in the pickle with the other objects
+    with open(os.path.join(tmp, 'objects.pkl'), 'wb') as f:
+        pickle.dump({'objects': objects, 'attrs': tables}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    _write_json(os.path.join(tmp, 'manifest.json'), {'format': FORMAT, 'tables': list(tables), 'created': time.time()})
+    size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # another process published the same snapshot first
+        shutil.rmtree(tmp, ignore_errors=True)
+    return size
+
+
+def load(path):
+    """Page data from a snapshot directory, with its frames memory-mapped"""
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+    if manifest['format'] != FORMAT:
+        raise ValueError(f"snapshot format {manifest['format']}, expected {FORMAT}")
+    with open(os.path.join(path, 'objects.pkl'), 'rb') as f:
+        stored = pickle.load(f)
+    data = stored['objects']
+    for name in manifest['tables']:
+        source = pa.memory_map(os.path.join(path, f"{name}.arrow"))
+        frame = pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+        frame.attrs.update(stored['attrs'][name])
+        data[name] = frame
+    return data
+
+
+def prune(page_id, keep=KEEP):
+    """Remove all but the `keep` most recent snapshots of a page"""
+    page_dir = os.path.join(SNAPSHOT_DIR, page_id)
+    if not os.path.isdir(page_dir):
+        return
+    # snapshots still being written end in .tmp
+    entries = [os.path.join(page_dir, name) for name in os.listdir(page_dir) if not name.endswith('.tmp')]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for path in entries[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+# =============================================================================
+# PAGE DATA
+# =============================================================================
+def load_or_build(page_id, backend='parquet', incremental=False, query_engine='pandas'):
+    """Page data from its snapshot, building (and saving) the snapshot when it is missing or stale"""
+    if not HAS_PYARROW:
+        return build_page_data(page_id, backend, incremental, query_engine)
+    path = snapshot_path(page_id, snapshot_key(page_id, build_params(backend, incremental, query_engine)))
+    if os.path.isdir(path):
+        try:
+            data = load(path)
+            # the figure cache is keyed by this process's view of the sources
+            data['version'] = dataset_version(PAGE_TABLES[page_id])
+            return data
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError, pa.ArrowException):
+            shutil.rmtree(path, ignore_errors=True)
+    data = build_page_data(page_id, backend, incremental, query_engine)
+    try:
+        save(data, path)
+        prune(page_id)
+    except (OSError, pa.ArrowException):
+        pass  # a read-only or full disk only costs the next restart a rebuild
+    return data
+
+
+def differences(built, loaded):
+    """Keys whose snapshot value differs from the freshly built one"""
+    different = []
+    for name, value in built.items():
+        other = loaded.get(name)
+        try:
+            if isinstance(value, pd.DataFrame):
+                pd.testing.assert_frame_equal(value, other)
+                if value.attrs != other.attrs:
+                    raise AssertionError(name)
+            elif pickle.dumps(value) != pickle.dumps(other):
+                raise AssertionError(name)
+        except (AssertionError, TypeError):
+            different.append(name)
+    return different + sorted(set(loaded) - set(built))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prebuild the page data snapshots")
+    parser.add_argument('--pages', nargs='+', default=list(PAGE_TABLES), choices=list(PAGE_TABLES))
+    parser.add_argument('--backend', default=os.environ.get('NOVAMART_DATA_BACKEND', 'parquet'),
+                        choices=data_store.BACKENDS)
+    parser.add_argument('--query-engine', default=os.environ.get('NOVAMART_QUERY_ENGINE', 'pandas'))
+    parser.add_argument('--incremental', action='store_true', default=os.environ.get('NOVAMART_INCREMENTAL') == '1')
+    parser.add_argument('--force', action='store_true', help="rebuild snapshots that are already current")
+    parser.add_argument('--verify', action='store_true', help="check each snapshot against a fresh build")
+    args = parser.parse_args()
+    if not HAS_PYARROW:
+        parser.error("pyarrow is required to write snapshots")
+
+    if args.backend == 'parquet':
+        data_store.convert_all()
+    params = build_params(args.backend, args.incremental, args.query_engine)
+    failures = 0
+    print(f"{'page':<24}{'key':<18}{'build (ms)':>12}{'load (ms)':>11}{'size (MB)':>11}")
+    for page_id in args.pages:
+        path = snapshot_path(page_id, snapshot_key(page_id, params))
+        build = 'current'
+        if args.force or not os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+            start = time.perf_counter()
+            data = build_page_data(page_id, args.backend, args.incremental, args.query_engine)
+            build = f"{(time.perf_counter() - start) * 1000:.1f}"
+            save(data, path)
+            prune(page_id)
+        start = time.perf_counter()
+        loaded = load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        print(f"{page_id:<24}{os.path.basename(path):<18}{build:>12}{load_ms:>11.1f}{size / 1e6:>11.2f}")
+        if args.verify:
+            different = differences(build_page_data(page_id, args.backend, args.incremental, args.query_engine),
+                                    loaded)
+            failures += bool(different)
+            print(f"  verify: {'ok' if not different else 'MISMATCH in ' + ', '.join(different)}")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
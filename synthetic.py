@@ -0,0 +1,587 @@
+"""
+NovaMart Synthetic Data
+=============================================
+Schema-faithful generator for all ten datasets at any scale.
+
+Every table keeps the column set, categorical values and date range of
+the sample CSVs, together with the relationships the dashboard relies on:
+
+- campaigns: clicks follow impressions, conversions follow clicks, spend
+  is clicks x CPC (zero for Direct and Organic Search) and revenue is
+  conversions x order value, so revenue rises with spend;
+- customers: the segment drives income, purchases, order value and LTV;
+  churn probability rises with days since the last purchase and falls
+  with satisfaction, and the NPS category follows the satisfaction score;
+- customer locations: each customer lives in a state of its region,
+  around the city of its city tier;
+- leads: conversion is drawn from a logistic model of the engagement
+  features, and the predicted probability is a noisy view of the same
+  model.
+
+Large tables are written in chunks of ``chunk_rows`` rows, so memory use
+does not depend on the size of the file. Rows are generated in blocks of
+BLOCK_ROWS, each from its own random stream derived from (seed, CRC-32 of
+the table name, block number), so a seed gives the same files whatever
+the chunk size, and adding or removing a table leaves the others as they
+were.
+
+Run ``python synthetic.py --scale 100 --out /path/to/dir`` and point the
+dashboard at the result with NOVAMART_DATA_DIR=/path/to/dir.
+
+The bundled customer_locations.csv geocodes the bundled customers:
+``python synthetic.py --geocode customer_data.csv --out .``
+"""
+
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from data_store import DATASETS, HAS_PYARROW
+
+if HAS_PYARROW:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+START, END = pd.Timestamp('2023-01-01'), pd.Timestamp('2024-12-31')
+DEFAULT_CHUNK_ROWS = 1_000_000
+# Rows drawn from one random stream (a multiple of the 40 rows per product)
+BLOCK_ROWS = 100_000
+
+# Rows of each chunked table at scale 1 (the sample CSVs)
+BASE_ROWS = {'campaigns': 5858, 'customers': 5000, 'products': 1440, 'leads': 2000, 'customer_locations': 5000}
+TABLES = list(DATASETS)
+
+REGIONS = ['North', 'South', 'East', 'West', 'Central']
+CAMPAIGN_TYPES = ['Brand Awareness', 'Lead Generation', 'Retargeting', 'Seasonal Sale', 'Product Launch']
+
+# channel: (mean daily impressions, CTR %, CVR %, CPC)
+CHANNELS = {
+    'Google Ads': (420_000, 3.1, 4.6, 1.9),
+    'Facebook': (380_000, 2.9, 4.2, 1.4),
+    'Instagram': (300_000, 3.3, 4.0, 1.3),
+    'LinkedIn': (120_000, 2.4, 4.4, 3.2),
+    'Email': (480_000, 4.5, 6.5, 1.3),
+    'Organic Search': (38_000, 4.0, 5.0, 0.0),
+    'Direct': (38_000, 5.5, 7.0, 0.0),
+    'Referral': (200_000, 4.8, 6.0, 1.4),
+}
+CAMPAIGN_DAYS = (32, 180)
+
+# segment: (share, mean income, mean purchases, mean order value, churn shift)
+SEGMENTS = {
+    'Regular': (0.40, 92_000, 53, 420, -0.4),
+    'Budget': (0.25, 48_000, 26, 225, 0.2),
+    'New': (0.21, 76_000, 1.5, 330, 0.2),
+    'Premium': (0.09, 178_000, 127, 855, -3.0),
+    'Churned': (0.05, 70_000, 5, 350, 0.0),
+}
+GENDERS = (['Female', 'Male', 'Other'], [0.40, 0.40, 0.20])
+CITY_TIERS = (['Tier 1', 'Tier 2', 'Tier 3'], [0.32, 0.37, 0.31])
+ACQUISITION = (['Social Media', 'Paid Search', 'Organic', 'Referral', 'Partner', 'Offline Event'],
+               [0.26, 0.22, 0.17, 0.17, 0.09, 0.09])
+
+CATALOGUE = {
+    'Electronics': {
+        'Smartphones': ['iPhone Pro', 'Samsung Galaxy', 'OnePlus Nord', 'Pixel Pro'],
+        'Laptops': ['MacBook Air', 'Dell XPS', 'ThinkPad', 'HP Spectre'],
+        'Accessories': ['AirPods', 'Smart Watch', 'Tablet', 'Power Bank'],
+    },
+    'Fashion': {
+        'Men': ['Formal Shirts', 'Casual Wear', 'Footwear', 'Accessories'],
+        'Women': ['Ethnic Wear', 'Western Wear', 'Footwear', 'Bags'],
+        'Kids': ['Boys Wear', 'Girls Wear', 'School Uniforms', 'Toys'],
+    },
+    'Home & Living': {
+        'Furniture': ['Sofas', 'Beds', 'Tables', 'Storage'],
+        'Decor': ['Lighting', 'Wall Art', 'Plants', 'Rugs'],
+        'Kitchen': ['Appliances', 'Cookware', 'Storage', 'Dining'],
+    },
+}
+PRODUCTS = [(name, category, subcategory)
+            for category, subs in CATALOGUE.items() for subcategory, names in subs.items() for name in names]
+QUARTER_LABELS = [f"Q{q} {y}" for y in (2023, 2024) for q in range(1, 5)]
+
+COMPANY_SIZES = ['Small', 'Medium', 'Large', 'Enterprise']
+INDUSTRIES = ['Technology', 'Healthcare', 'Finance', 'Retail', 'Manufacturing', 'Education']
+LEAD_SOURCES = ['Website', 'Referral', 'Social Media', 'Paid Ad', 'Event']
+
+# state: (region, latitude, longitude)
+STATES = {
+    'Maharashtra': ('West', 19.7515, 75.7139), 'Karnataka': ('South', 15.3173, 75.7139),
+    'Tamil Nadu': ('South', 11.1271, 78.6569), 'Uttar Pradesh': ('North', 26.8467, 80.9462),
+    'Gujarat': ('West', 22.2587, 71.1924), 'Rajasthan': ('West', 27.0238, 74.2179),
+    'West Bengal': ('East', 22.9868, 87.855), 'Madhya Pradesh': ('Central', 22.9734, 78.6569),
+    'Kerala': ('South', 10.8505, 76.2711), 'Delhi': ('North', 28.7041, 77.1025),
+    'Punjab': ('North', 31.1471, 75.3412), 'Haryana': ('North', 29.0588, 76.0856),
+    'Telangana': ('South', 18.1124, 79.0193), 'Bihar': ('East', 25.0961, 85.3131),
+    'Odisha': ('East', 20.9517, 85.0985),
+}
+# state: three cities (name, latitude, longitude), largest first; customers of
+# city tier 1/2/3 live around the first/second/third
+CITIES = {
+    'Maharashtra': [('Mumbai', 19.076, 72.8777), ('Pune', 18.5204, 73.8567), ('Nagpur', 21.1458, 79.0882)],
+    'Karnataka': [('Bengaluru', 12.9716, 77.5946), ('Mysuru', 12.2958, 76.6394), ('Hubballi', 15.3647, 75.124)],
+    'Tamil Nadu': [('Chennai', 13.0827, 80.2707), ('Coimbatore', 11.0168, 76.9558), ('Madurai', 9.9252, 78.1198)],
+    'Uttar Pradesh': [('Lucknow', 26.8467, 80.9462), ('Kanpur', 26.4499, 80.3319), ('Agra', 27.1767, 78.0081)],
+    'Gujarat': [('Ahmedabad', 23.0225, 72.5714), ('Surat', 21.1702, 72.8311), ('Vadodara', 22.3072, 73.1812)],
+    'Rajasthan': [('Jaipur', 26.9124, 75.7873), ('Jodhpur', 26.2389, 73.0243), ('Udaipur', 24.5854, 73.7125)],
+    'West Bengal': [('Kolkata', 22.5726, 88.3639), ('Howrah', 22.5958, 88.2636), ('Siliguri', 26.7271, 88.3953)],
+    'Madhya Pradesh': [('Indore', 22.7196, 75.8577), ('Bhopal', 23.2599, 77.4126), ('Gwalior', 26.2183, 78.1828)],
+    'Kerala': [('Kochi', 9.9312, 76.2673), ('Thiruvananthapuram', 8.5241, 76.9366), ('Kozhikode', 11.2588, 75.7804)],
+    'Delhi': [('New Delhi', 28.6139, 77.209), ('Dwarka', 28.5921, 77.046), ('Rohini', 28.7383, 77.0822)],
+    'Punjab': [('Ludhiana', 30.901, 75.8573), ('Amritsar', 31.634, 74.8723), ('Jalandhar', 31.326, 75.5762)],
+    'Haryana': [('Gurugram', 28.4595, 77.0266), ('Faridabad', 28.4089, 77.3178), ('Panipat', 29.3909, 76.9635)],
+    'Telangana': [('Hyderabad', 17.385, 78.4867), ('Warangal', 17.9689, 79.5941), ('Nizamabad', 18.6725, 78.094)],
+    'Bihar': [('Patna', 25.5941, 85.1376), ('Gaya', 24.7914, 85.0002), ('Muzaffarpur', 26.1209, 85.3647)],
+    'Odisha': [('Bhubaneswar', 20.2961, 85.8245), ('Cuttack', 20.4625, 85.8828), ('Rourkela', 22.2604, 84.8536)],
+}
+# spread (degrees) of customers around a tier 1/2/3 city
+CITY_SPREAD = [0.06, 0.09, 0.15]
+FUNNEL_STAGES = ['Awareness', 'Interest', 'Consideration', 'Intent', 'Evaluation', 'Purchase']
+JOURNEY_PATHS = [
+    ('Paid Search', 'Website', 'Email', 'Purchase'), ('Social Media', 'Website', 'Retargeting', 'Purchase'),
+    ('Organic Search', 'Website', 'Email', 'Purchase'), ('Paid Search', 'Website', 'Exit', ''),
+    ('Social Media', 'Website', 'Exit', ''), ('Referral', 'Website', 'Email', 'Purchase'),
+    ('Direct', 'Website', 'Purchase', ''), ('Email', 'Website', 'Purchase', ''),
+]
+LEAD_FEATURES = ['webinar_attendance', 'form_submissions', 'content_downloads', 'email_clicks', 'website_visits',
+                 'company_size_encoded', 'industry_encoded', 'time_on_site_seconds', 'pages_viewed',
+                 'days_since_first_touch', 'email_opens']
+
+
+def _rng(seed, table, block=0):
+    """Independent random stream for one block of one table (keyed by the table's name, not its position)"""
+    return np.random.default_rng([seed, zlib.crc32(table.encode()), block])
+
+
+def _sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def _pick(rng, values, n, p=None):
+    """n draws from values as a categorical with the values as categories"""
+    return pd.Categorical.from_codes(rng.choice(len(values), n, p=p), values)
+
+
+def _ratio(num, den, scale=1):
+    """Rounded num / den * scale with 0 where the denominator is zero"""
+    out = np.zeros(len(num))
+    np.divide(num, den, out=out, where=den != 0)
+    return (out * scale).round(2)
+
+# =============================================================================
+# CHUNKED TABLES
+# =============================================================================
+def campaign_chunk(rng, first_campaign, rows):
+    """About `rows` daily rows for consecutive campaigns starting at first_campaign"""
+    n = max(1, int(rows / np.mean(CAMPAIGN_DAYS)))
+    n_days = (END - START).days + 1
+    duration = rng.integers(CAMPAIGN_DAYS[0], CAMPAIGN_DAYS[1] + 1, n)
+    start = rng.integers(0, n_days - duration + 1)
+    ctype = rng.integers(0, len(CAMPAIGN_TYPES), n)
+    channel = rng.integers(0, len(CHANNELS), n)
+    region = rng.integers(0, len(REGIONS), n)
+    profile = np.array(list(CHANNELS.values()))[channel]
+    reach = profile[:, 0] * rng.lognormal(-0.1, 0.45, n)
+
+    # one row per campaign day
+    owner = np.repeat(np.arange(n), duration)
+    day = start[owner] + np.arange(len(owner)) - np.repeat(np.cumsum(duration) - duration, duration)
+    m = len(owner)
+    dates = START + pd.to_timedelta(day, unit='D')
+
+    impressions = np.maximum(5000, reach[owner] * rng.lognormal(0, 0.3, m)).astype('int64')
+    clicks = np.maximum(1, impressions * profile[owner, 1] / 100 * rng.uniform(0.8, 1.2, m)).round().astype('int64')
+    conversions = np.maximum(1, clicks * profile[owner, 2] / 100 * rng.uniform(0.75, 1.25, m)).round().astype('int64')
+    spend = (clicks * profile[owner, 3] * rng.uniform(0.6, 1.4, m)).round(2)
+    revenue = (conversions * np.clip(rng.normal(2500, 800, m), 500, 5500)).round(2)
+
+    ids = np.array([f"CMP_{1000 + first_campaign + i}" for i in range(n)])
+    types = np.array(CAMPAIGN_TYPES)[ctype]
+    channels = np.array(list(CHANNELS))[channel]
+    regions = np.array(REGIONS)[region]
+    names = np.array([f"{t} - {c} - {r} - Q{(first_campaign + i) % 4 + 1}"
+                      for i, (t, c, r) in enumerate(zip(types, channels, regions))])
+    return pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d'),
+        'campaign_id': ids[owner],
+        'campaign_name': names[owner],
+        'campaign_type': types[owner],
+        'channel': channels[owner],
+        'region': regions[owner],
+        'impressions': impressions,
+        'clicks': clicks,
+        'conversions': conversions,
+        'spend': spend,
+        'revenue': revenue,
+        'day_of_week': dates.day_name(),
+        'month': dates.month_name(),
+        'quarter': 'Q' + dates.quarter.astype(str),
+        'year': dates.year,
+        'ctr': _ratio(clicks, impressions, 100),
+        'conversion_rate': _ratio(conversions, clicks, 100),
+        'cpc': _ratio(spend, clicks),
+        'cpa': _ratio(spend, conversions),
+        'roas': _ratio(revenue, spend),
+    })
+
+
+def customer_chunk(rng, first_row, rows):
+    """`rows` customers with ids starting at CUST_<10000 + first_row>"""
+    params = np.array([v[1:] for v in SEGMENTS.values()])
+    segment = rng.choice(len(SEGMENTS), rows, p=[v[0] for v in SEGMENTS.values()])
+    income_mean, purchases_mean, aov_mean, churn_shift = params[segment].T
+    churned = segment == list(SEGMENTS).index('Churned')
+    new = segment == list(SEGMENTS).index('New')
+
+    age = np.clip(18 + rng.gamma(2.2, 7, rows), 18, 70).astype('int64')
+    income = np.clip(income_mean * rng.lognormal(-0.08, 0.4, rows), 20000, 259999).astype('int64')
+    tenure = np.where(new, rng.integers(1, 7, rows), rng.integers(1, 61, rows))
+    purchases = rng.poisson(purchases_mean)
+    aov = np.clip(aov_mean * rng.lognormal(-0.1, 0.45, rows), 24.8, 3100).round(2)
+    ltv = np.maximum(26, purchases * aov).round().astype('int64')
+
+    satisfaction = np.clip(rng.normal(3.4, 0.55, rows) - 0.15 * churn_shift, 1, 4.99).round(2)
+    recency = rng.exponential(1, rows) - 0.8 * (satisfaction - 3.4)
+    last_purchase = np.clip(np.exp(3.2 + 0.9 * recency), 1, 365).astype('int64')
+    churn_probability = _sigmoid(0.02 * (last_purchase - 60) - 1.8 * (satisfaction - 3.4) + churn_shift - 1.2)
+    churn_probability = np.where(churned, 1.0, churn_probability).round(3)
+    is_churned = np.where(churned, 1, rng.random(rows) < churn_probability * 0.8).astype('int64')
+
+    return pd.DataFrame({
+        'customer_id': [f"CUST_{10000 + first_row + i}" for i in range(rows)],
+        'gender': _pick(rng, GENDERS[0], rows, p=GENDERS[1]),
+        'age': age,
+        'age_group': pd.cut(age, [17, 25, 35, 45, 55, 70], labels=['18-25', '26-35', '36-45', '46-55', '55+']),
+        'income': income,
+        'income_bracket': pd.cut(income, [0, 49999, 99999, 199999, np.inf],
+                                 labels=['Low', 'Medium', 'High', 'Premium']),
+        'region': _pick(rng, REGIONS, rows),
+        'city_tier': _pick(rng, CITY_TIERS[0], rows, p=CITY_TIERS[1]),
+        'customer_segment': pd.Categorical.from_codes(segment, list(SEGMENTS)),
+        'acquisition_channel': _pick(rng, ACQUISITION[0], rows, p=ACQUISITION[1]),
+        'tenure_months': tenure,
+        'lifetime_value': ltv,
+        'total_purchases': purchases,
+        'avg_order_value': aov,
+        'last_purchase_days': last_purchase,
+        'email_open_rate': np.clip(rng.beta(3, 9, rows) * 0.95, 0, 0.6).round(3),
+        'website_visits_monthly': rng.poisson(4, rows),
+        'app_sessions_monthly': rng.poisson(8.6, rows),
+        'support_tickets': np.minimum(8, rng.poisson(np.clip(1.7 - 0.8 * (satisfaction - 3.4), 0.2, None))),
+        'satisfaction_score': satisfaction,
+        'nps_category': pd.cut(satisfaction, [0, 3.4999, 4.4999, 5], labels=['Detractor', 'Passive', 'Promoter']),
+        'is_churned': is_churned,
+        'churn_probability': churn_probability,
+    })
+
+
+def geocode(rng, customer_ids, regions, tiers):
+    """A state, city and coordinates per customer: a state of the customer's region, the city of its tier"""
+    states = list(STATES)
+    cities = [name for state in states for name, _, _ in CITIES[state]]
+    city_lat = np.array([lat for state in states for _, lat, _ in CITIES[state]])
+    city_lon = np.array([lon for state in states for _, _, lon in CITIES[state]])
+    regions = np.asarray(regions, dtype=object)
+    state = np.empty(len(regions), dtype='int64')
+    for region in pd.unique(regions):
+        rows = np.flatnonzero(regions == region)
+        choices = [i for i, s in enumerate(states) if STATES[s][0] == region]
+        state[rows] = rng.choice(choices, len(rows))
+    tier = np.asarray(pd.Series(tiers).map({'Tier 1': 0, 'Tier 2': 1, 'Tier 3': 2}).fillna(2), dtype='int64')
+    city = state * 3 + tier
+    spread = np.asarray(CITY_SPREAD)[tier]
+    return pd.DataFrame({
+        'customer_id': np.asarray(customer_ids),
+        'state': pd.Categorical.from_codes(state, states),
+        'city': pd.Categorical.from_codes(city, cities),
+        'latitude': (city_lat[city] + rng.normal(0, spread)).round(4),
+        'longitude': (city_lon[city] + rng.normal(0, spread)).round(4),
+    })
+
+
+def location_chunk(rng, first_row, rows):
+    """Coordinates of the same customers as customer_chunk (drawn from the customers stream)"""
+    customers = customer_chunk(rng, first_row, rows)
+    return geocode(rng, customers['customer_id'], customers['region'], customers['city_tier'])
+
+
+def product_chunk(rng, first_row, rows):
+    """`rows` product x region x quarter rows (40 per product), ids from PRD_<first_row + 1>"""
+    per_product = len(REGIONS) * len(QUARTER_LABELS)
+    first_product = first_row // per_product
+    n = -(-rows // per_product)
+    number = first_product + np.arange(n)
+    base = number % len(PRODUCTS)
+    variant = number // len(PRODUCTS)
+    names = [PRODUCTS[b][0] if v == 0 else f"{PRODUCTS[b][0]} {v + 1}" for b, v in zip(base, variant)]
+
+    owner = np.repeat(np.arange(n), per_product)
+    cell = np.tile(np.arange(per_product), n)
+    m = len(owner)
+    price = rng.uniform(800, 5000, n)
+    rating = rng.uniform(3.5, 4.8, n).round(1)
+    sales = np.clip(47000 * rng.lognormal(-0.12, 0.5, m), 10000, 150000).round(2)
+    margin = rng.uniform(8, 45, m).round(2)
+    quarter = cell % len(QUARTER_LABELS)
+
+    frame = pd.DataFrame({
+        'product_id': [f"PRD_{first_product * per_product + i + 1}" for i in range(m)],
+        'product_name': np.array(names)[owner],
+        'category': np.array([p[1] for p in PRODUCTS])[base[owner]],
+        'subcategory': np.array([p[2] for p in PRODUCTS])[base[owner]],
+        'region': np.array(REGIONS)[cell // len(QUARTER_LABELS)],
+        'quarter': np.array(QUARTER_LABELS)[quarter],
+        'year': 2023 + quarter // 4,
+        'sales': sales,
+        'units_sold': np.maximum(2, sales / price[owner]).round().astype('int64'),
+        'profit': (sales * margin / 100).round(2),
+        'profit_margin': margin,
+        'return_rate': rng.uniform(1, 8, m).round(2),
+        'avg_rating': rating[owner],
+        'review_count': rng.integers(50, 2000, m),
+    })
+    return frame.iloc[first_row - first_product * per_product:][:rows]
+
+
+def lead_chunk(rng, first_row, rows):
+    """`rows` scored leads with ids starting at LEAD_<5000 + first_row>"""
+    visits = rng.integers(1, 51, rows)
+    opens = rng.integers(0, 16, rows)
+    forms = rng.integers(0, 6, rows)
+    downloads = rng.integers(0, 9, rows)
+    webinars = rng.integers(0, 4, rows)
+    days = rng.integers(1, 181, rows)
+    size = rng.integers(0, len(COMPANY_SIZES), rows)
+    clicks = np.minimum(10, rng.binomial(opens, 0.5))
+
+    score = (0.35 * (forms - 2.5) + 0.22 * (downloads - 4) + 0.45 * (webinars - 1.5)
+             - 0.008 * (days - 90) + 0.02 * (visits - 25) + 0.06 * (clicks - 3.7) + 0.1 * (size - 1.5))
+    converted = (rng.random(rows) < _sigmoid(score + rng.normal(0, 0.8, rows) + 0.8)).astype('int64')
+    probability = np.clip(_sigmoid(0.6 * score + 0.3 * (converted - 0.5) + rng.normal(0.65, 0.45, rows)),
+                          0.01, 0.99).round(4)
+
+    return pd.DataFrame({
+        'lead_id': [f"LEAD_{5000 + first_row + i}" for i in range(rows)],
+        'company_size': pd.Categorical.from_codes(size, COMPANY_SIZES),
+        'industry': _pick(rng, INDUSTRIES, rows),
+        'website_visits': visits,
+        'pages_viewed': rng.integers(1, 31, rows),
+        'time_on_site_seconds': rng.integers(30, 1800, rows),
+        'email_opens': opens,
+        'email_clicks': clicks,
+        'form_submissions': forms,
+        'content_downloads': downloads,
+        'webinar_attendance': webinars,
+        'days_since_first_touch': days,
+        'lead_source': _pick(rng, LEAD_SOURCES, rows),
+        'actual_converted': converted,
+        'predicted_probability': probability,
+        'predicted_class': (probability >= 0.5).astype('int64'),
+    })
+
+
+CHUNKED = {
+    'campaigns': campaign_chunk,
+    'customers': customer_chunk,
+    'products': product_chunk,
+    'leads': lead_chunk,
+    'customer_locations': location_chunk,
+}
+
+# =============================================================================
+# SMALL TABLES
+# =============================================================================
+def feature_importance_table(rng, scale):
+    """Importances summing to 1, in descending order"""
+    importance = np.sort(rng.dirichlet(np.linspace(6, 1, len(LEAD_FEATURES)) * 3))[::-1].round(2)
+    return pd.DataFrame({
+        'feature': LEAD_FEATURES,
+        'importance': importance,
+        'importance_std': np.maximum(0.01, importance * rng.uniform(0.08, 0.2, len(LEAD_FEATURES))).round(2),
+    })
+
+
+def learning_curve_table(rng, scale):
+    """Train/validation scores converging as the training set grows up to the lead count"""
+    total = int(BASE_ROWS['leads'] * scale)
+    sizes = np.unique(np.linspace(max(1, total // 20), total, 11).astype('int64'))
+    progress = np.log(sizes / sizes[0] + 1) / np.log(sizes[-1] / sizes[0] + 1)
+    return pd.DataFrame({
+        'training_size': sizes,
+        'train_score': (0.95 - 0.16 * progress + rng.normal(0, 0.005, len(sizes))).round(2),
+        'validation_score': (0.55 + 0.23 * progress + rng.normal(0, 0.005, len(sizes))).round(2),
+        'train_score_std': np.linspace(0.03, 0.01, len(sizes)).round(2),
+        'validation_score_std': np.linspace(0.08, 0.02, len(sizes)).round(2),
+    })
+
+
+def geographic_table(rng, scale):
+    """One row per state with customers scaled by the scale factor"""
+    n = len(STATES)
+    customers = (rng.integers(8000, 56000, n) * scale).astype('int64')
+    per_customer = rng.integers(2200, 5000, n).astype('float64')
+    region, lat, lon = zip(*STATES.values())
+    return pd.DataFrame({
+        'state': list(STATES),
+        'region': region,
+        'latitude': lat,
+        'longitude': lon,
+        'total_customers': customers,
+        'total_revenue': (customers * per_customer).astype('int64'),
+        'revenue_per_customer': per_customer,
+        'store_count': (rng.integers(8, 50, n) * max(1.0, scale ** 0.5)).astype('int64'),
+        'market_penetration': rng.uniform(6, 31, n).round(1),
+        'yoy_growth': rng.uniform(-4, 25, n).round(1),
+        'customer_satisfaction': rng.uniform(3.5, 4.5, n).round(2),
+        'avg_delivery_days': rng.uniform(2, 7, n).round(1),
+    })
+
+
+def funnel_table(rng, scale):
+    """Visitors per stage with step conversion rates around 45-55%"""
+    rates = np.r_[1.0, rng.uniform(0.44, 0.56, len(FUNNEL_STAGES) - 1)]
+    visitors = (100_000 * scale * np.cumprod(rates)).round().astype('int64')
+    step = np.r_[100.0, visitors[1:] / visitors[:-1] * 100]
+    return pd.DataFrame({'stage': FUNNEL_STAGES, 'visitors': visitors, 'conversion_rate': step.round(1)})
+
+
+def journey_table(rng, scale):
+    """Common touchpoint paths with customer counts scaled by the scale factor"""
+    counts = (rng.integers(400, 3000, len(JOURNEY_PATHS)) * scale).astype('int64')
+    table = pd.DataFrame(JOURNEY_PATHS, columns=['touchpoint_1', 'touchpoint_2', 'touchpoint_3', 'touchpoint_4'])
+    table['customer_count'] = counts
+    return table
+
+
+SMALL = {
+    'feature_importance': feature_importance_table,
+    'learning_curve': learning_curve_table,
+    'geographic': geographic_table,
+    'funnel': funnel_table,
+    'journey': journey_table,
+}
+
+# =============================================================================
+# WRITERS
+# =============================================================================
+def blocks(name, rows, seed=0):
+    """Yield the generated blocks (BLOCK_ROWS rows each, one random stream per block) that make `rows` rows"""
+    build = CHUNKED[name]
+    # locations re-draw the customers they geocode, so they share the customers' streams
+    stream = 'customers' if name == 'customer_locations' else name
+    written, number, entity = 0, 0, 0
+    while written < rows:
+        want = min(BLOCK_ROWS, rows - written)
+        frame = build(_rng(seed, stream, number), entity if name == 'campaigns' else written, want)
+        if name == 'campaigns':
+            entity += frame['campaign_id'].nunique()
+            frame = frame.iloc[:rows - written]
+        written += len(frame)
+        number += 1
+        yield frame
+
+
+def chunks(name, rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield frames of at most chunk_rows rows that together make `rows` rows"""
+    pending, held = [], 0
+    for block in blocks(name, rows, seed):
+        pending.append(block)
+        held += len(block)
+        while held >= chunk_rows:
+            frame = pd.concat(pending, ignore_index=True)
+            yield frame.iloc[:chunk_rows]
+            # an empty remainder is dropped: pyarrow's CSV writer garbles a string column after an empty chunk
+            rest = frame.iloc[chunk_rows:]
+            pending, held = ([rest] if len(rest) else []), len(rest)
+    if held:
+        yield pd.concat(pending, ignore_index=True)
+
+
+def make_frame(name, scale=1.0, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """A whole table in memory (for benchmarks; use write_table for big files)"""
+    if name in SMALL:
+        return SMALL[name](_rng(seed, name), scale)
+    rows = int(BASE_ROWS[name] * scale)
+    return pd.concat(list(chunks(name, rows, seed, chunk_rows)), ignore_index=True)
+
+
+def _write_chunk(f, frame, header):
+    """Append a frame to an open binary CSV file (pyarrow's writer is ~5x faster than pandas)"""
+    if not HAS_PYARROW:
+        frame.to_csv(f, header=header, index=False)
+        return
+    if header:
+        f.write((','.join(frame.columns) + '\n').encode())
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    pa_csv.write_csv(table, f, pa_csv.WriteOptions(include_header=False, quoting_style='none'))
+
+
+def write_table(name, out_dir, scale=1.0, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Write one dataset as CSV under out_dir; returns the number of rows written"""
+    path = os.path.join(out_dir, DATASETS[name]['file'])
+    tmp = path + '.tmp'
+    if name in SMALL:
+        frame = SMALL[name](_rng(seed, name), scale)
+        frame.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+        return len(frame)
+
+    rows = int(BASE_ROWS[name] * scale)
+    written = 0
+    with open(tmp, 'wb') as f:
+        for frame in chunks(name, rows, seed, chunk_rows):
+            _write_chunk(f, frame, header=written == 0)
+            written += len(frame)
+    os.replace(tmp, path)
+    return written
+
+
+def geocode_file(customers_csv, out_dir, seed=0):
+    """Write customer_locations.csv for an existing customer file (e.g. the bundled customer_data.csv)"""
+    path = os.path.join(out_dir, DATASETS['customer_locations']['file'])
+    tmp = path + '.tmp'
+    written = 0
+    reader = pd.read_csv(customers_csv, usecols=['customer_id', 'region', 'city_tier'], chunksize=BLOCK_ROWS)
+    with open(tmp, 'wb') as f:
+        for number, customers in enumerate(reader):
+            frame = geocode(_rng(seed, 'customer_locations', number), customers['customer_id'],
+                            customers['region'], customers['city_tier'])
+            _write_chunk(f, frame, header=written == 0)
+            written += len(frame)
+    os.replace(tmp, path)
+    return written
+
+
+def write_all(out_dir, scale=1.0, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS, tables=None):
+    """Write every (or the selected) dataset; returns {name: rows}"""
+    os.makedirs(out_dir, exist_ok=True)
+    return {name: write_table(name, out_dir, scale, seed, chunk_rows) for name in (tables or TABLES)}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Write synthetic NovaMart datasets at a chosen scale")
+    parser.add_argument('--out', required=True, help="output directory")
+    parser.add_argument('--scale', type=float, default=1.0, help="row multiplier relative to the sample CSVs")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--tables', nargs='+', choices=TABLES, help="only these datasets")
+    parser.add_argument('--geocode', metavar='CUSTOMERS_CSV',
+                        help="only write customer_locations.csv, geocoding the customers in this file")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    if args.geocode:
+        start = time.perf_counter()
+        rows = geocode_file(args.geocode, args.out, args.seed)
+        print(f"{'customer_locations':<20}{rows:>14,} rows  {time.perf_counter() - start:8.1f}s")
+        raise SystemExit(0)
+    for name in args.tables or TABLES:
+        start = time.perf_counter()
+        rows = write_table(name, args.out, args.scale, args.seed, args.chunk_rows)
+        print(f"{name:<20}{rows:>14,} rows  {time.perf_counter() - start:8.1f}s")
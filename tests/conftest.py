@@ -0,0 +1,54 @@
+"""
+Shared test setup.
+
+The agreement checks run at small sizes under pytest and time their
+core operation with pytest-benchmark's ``benchmark`` fixture (install
+requirements-dev.txt). Scale timings (1M-10M rows) stay in benchmarks/.
+
+Run: python -m pytest tests [--benchmark-disable]
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    import pytest_benchmark  # noqa: F401
+    HAS_BENCHMARK = True
+except ImportError:
+    HAS_BENCHMARK = False
+
+
+if not HAS_BENCHMARK:
+    class _Once:
+        """Stand-in for pytest-benchmark's fixture: calls the function once, untimed"""
+
+        def __call__(self, fn, *args, **kwargs):
+            return fn(*args, **kwargs)
+
+        def pedantic(self, fn, args=(), kwargs=None, setup=None, rounds=1, **options):
+            result = None
+            for _ in range(rounds):
+                if setup is not None:
+                    setup()
+                result = fn(*args, **(kwargs or {}))
+            return result
+
+    @pytest.fixture
+    def benchmark():
+        return _Once()
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """An empty data directory the data store reads from (and caches Parquet under) for one test"""
+    import data_store
+
+    monkeypatch.setattr(data_store, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(data_store, 'CACHE_DIR', str(tmp_path / '.cache'))
+    monkeypatch.setattr(data_store, 'PARQUET_DIR', str(tmp_path / '.cache' / 'parquet'))
+    return tmp_path
@@ -0,0 +1,94 @@
+"""Headless analytics: every function benchmarked at 10k rows, rollup answers checked against raw rows"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import analytics
+import synthetic
+from filter_engine import FilterIndex
+from product_rollup import ProductRollup
+from rollup import MEASURES, build_campaign_rollup
+from schema import apply_schema
+from segmentation import Segmenter
+
+# synthetic scale factors giving about 10k rows per table (1M-10M: benchmarks/kpi_suite.py)
+SCALES = {'campaigns': 2, 'customers': 2, 'products': 7, 'leads': 5, 'journey': 1, 'funnel': 1}
+
+
+@pytest.fixture(scope='module')
+def tables():
+    frames = {name: apply_schema(name, synthetic.make_frame(name, scale)) for name, scale in SCALES.items()}
+    frames['customers'] = Segmenter().apply(frames['customers'])
+    frames['campaign_rollup'] = build_campaign_rollup(frames['campaigns'])
+    frames['product_rollup'] = ProductRollup(frames['products'])
+    frames['journey_paths'] = analytics.encode_journeys(frames['journey'])
+    frames['threshold_table'] = analytics.threshold_sweep(frames['leads'])
+    return frames
+
+
+CASES = {
+    'overview_kpis': lambda t: analytics.overview_kpis(t['campaign_rollup']),
+    'monthly_revenue': lambda t: analytics.monthly_revenue(t['campaign_rollup']),
+    'revenue_by': lambda t: analytics.revenue_by(t['campaign_rollup'], 'channel'),
+    'filter_campaigns': lambda t: analytics.filter_campaigns(
+        t['campaign_rollup'], ['Email', 'Facebook', 'Google Ads'], ['Retargeting', 'Seasonal Sale'],
+        date(2024, 3, 1), date(2024, 9, 30)),
+    'campaign_kpis': lambda t: analytics.campaign_kpis(t['campaign_rollup']),
+    'campaign_type_performance': lambda t: analytics.campaign_type_performance(t['campaign_rollup']),
+    'daily_performance': lambda t: analytics.daily_performance(t['campaign_rollup']),
+    'channel_matrix': lambda t: analytics.channel_matrix(t['campaign_rollup']),
+    'segment_distribution': lambda t: analytics.segment_distribution(t['customers']),
+    'segment_ltv': lambda t: analytics.segment_ltv(t['customers']),
+    'nps_distribution': lambda t: analytics.nps_distribution(t['customers']),
+    'churn_risk_summary': lambda t: analytics.churn_risk_summary(t['customers']),
+    'rfm_summary': lambda t: analytics.rfm_summary(t['customers']),
+    'category_sales': lambda t: analytics.category_sales(t['product_rollup']),
+    'top_subcategories': lambda t: analytics.top_subcategories(t['product_rollup']),
+    'top_products': lambda t: analytics.top_products(t['product_rollup'], regions=['North', 'West']),
+    'quarterly_sales': lambda t: analytics.quarterly_sales(t['product_rollup']),
+    'product_hierarchy': lambda t: analytics.product_hierarchy(t['product_rollup']),
+    'funnel_rates': lambda t: analytics.funnel_rates(t['funnel']),
+    'encode_journeys': lambda t: analytics.encode_journeys(t['journey']),
+    'journey_attribution': lambda t: analytics.journey_attribution(t['journey_paths']),
+    'journey_counts': lambda t: analytics.journey_counts(t['journey_paths']),
+    'threshold_sweep': lambda t: analytics.threshold_sweep(t['leads']),
+    'lead_metrics': lambda t: analytics.lead_metrics(t['threshold_table'], 0.5),
+}
+
+
+@pytest.mark.parametrize('name', list(CASES))
+def test_function_runs(benchmark, tables, name):
+    result = benchmark(CASES[name], tables)
+    assert result is not None
+    if isinstance(result, pd.DataFrame):
+        assert not result.empty
+
+
+def test_rollup_matches_raw_rows(tables):
+    raw, rollup = tables['campaigns'], tables['campaign_rollup']
+    kpis = analytics.overview_kpis(rollup)
+    assert np.isclose(kpis['revenue'], raw['revenue'].sum())
+    assert kpis['conversions'] == raw['conversions'].sum()
+    assert np.isclose(kpis['roas'], raw['revenue'].sum() / raw['spend'].sum())
+
+    by_channel = analytics.revenue_by(rollup, 'channel').set_index('channel')['revenue']
+    expected = raw.groupby('channel', observed=True)['revenue'].sum()
+    pd.testing.assert_series_equal(by_channel.sort_index(), expected.sort_index(), check_names=False)
+
+    daily = analytics.daily_performance(rollup).set_index('date')
+    expected = raw.groupby('date')[['spend', 'revenue', 'conversions']].sum()
+    assert np.allclose(daily[expected.columns].to_numpy('float64'), expected.to_numpy('float64'))
+
+
+def test_filter_index_matches_scan(benchmark, tables):
+    rollup = tables['campaign_rollup']
+    index = FilterIndex(rollup, dimensions=('channel', 'campaign_type'))
+    filters = dict(channels=['Email', 'LinkedIn'], campaign_types=['Retargeting'],
+                   start=date(2024, 1, 1), end=date(2024, 6, 30))
+    scanned = analytics.filter_campaigns(rollup, **filters)
+    assert len(scanned)
+    indexed = benchmark(analytics.filter_campaigns, rollup, index=index, **filters)
+    pd.testing.assert_frame_equal(indexed[MEASURES].reset_index(drop=True), scanned[MEASURES].reset_index(drop=True))
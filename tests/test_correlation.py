@@ -0,0 +1,87 @@
+"""Streamed correlation matrices and summaries against pandas on the whole table"""
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import data_store
+import synthetic
+from correlation import METRIC_SETS, MomentAccumulator, metric_statistics, table_moments
+from data_store import load_table
+
+SCALE = 2  # ~12k campaign rows and 10k customers (scale runs and peak RSS: benchmarks/correlation_stream.py)
+
+
+def summary_of(frame):
+    return pd.DataFrame({'count': frame.count(), 'mean': frame.mean(), 'std': frame.std(),
+                         'min': frame.min(), 'max': frame.max()})
+
+
+@pytest.fixture
+def tables(data_dir):
+    """Synthetic campaigns and customers, as CSVs and as Parquet files of several row groups"""
+    synthetic.write_all(str(data_dir), scale=SCALE, tables=['campaigns', 'customers'])
+    for name in ('campaigns', 'customers'):
+        path = data_store.convert(name)
+        pq.write_table(pq.read_table(path), path, row_group_size=3_000)
+    return data_dir
+
+
+@pytest.mark.parametrize('backend,workers', [('parquet', 1), ('parquet', 2), ('csv', 1)])
+@pytest.mark.parametrize('title', list(METRIC_SETS))
+def test_stream_matches_full_load(benchmark, tables, title, backend, workers):
+    name, labels = METRIC_SETS[title]
+    columns = list(labels)
+    frame = load_table(name, columns)[columns].astype('float64')
+    acc = benchmark(table_moments, name, columns, backend=backend, workers=workers)
+
+    assert acc.n == len(frame) == len(acc.sample)
+    pd.testing.assert_frame_equal(acc.pearson(), frame.corr(), rtol=1e-9, atol=1e-12)
+    # the rank sample holds every row, so Spearman is exact
+    pd.testing.assert_frame_equal(acc.spearman(), frame.corr(method='spearman'), rtol=1e-9, atol=1e-12)
+    pd.testing.assert_frame_equal(acc.summary()[['count', 'mean', 'std', 'min', 'max']], summary_of(frame),
+                                  check_dtype=False, rtol=1e-9)
+
+
+def test_missing_values_and_merge_order():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(size=(5_000, 4)), columns=list('abcd'))
+    frame['b'] += 2 * frame['a']
+    frame = frame.mask(rng.random(frame.shape) < 0.05)
+    chunks = [frame.iloc[i:i + 700] for i in range(0, len(frame), 700)]
+
+    forward = MomentAccumulator(frame.columns)
+    for i, chunk in enumerate(chunks):
+        forward.update(chunk, key=(i,))
+    backward = MomentAccumulator(frame.columns)
+    for i in reversed(range(len(chunks))):
+        backward.merge(MomentAccumulator(frame.columns).update(chunks[i], key=(i,)))
+
+    complete = frame.dropna()
+    for acc in (forward, backward):
+        summary = acc.summary()
+        pd.testing.assert_frame_equal(summary[['count', 'mean', 'std', 'min', 'max']], summary_of(frame),
+                                      check_dtype=False, rtol=1e-9)
+        assert (summary['missing'] == frame.isna().sum()).all()
+        pd.testing.assert_frame_equal(acc.pearson(), complete.corr(), rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(np.sort(forward.sample_keys), np.sort(backward.sample_keys))
+
+
+def test_sampled_spearman_stays_close():
+    rng = np.random.default_rng(1)
+    x = rng.lognormal(size=50_000)
+    frame = pd.DataFrame({'x': x, 'y': x ** 2 + rng.normal(scale=2, size=len(x)), 'z': rng.random(len(x))})
+    acc = MomentAccumulator(frame.columns, sample_rows=10_000)
+    for i in range(0, len(frame), 8_000):
+        acc.update(frame.iloc[i:i + 8_000], key=(i,))
+    assert len(acc.sample) == 10_000
+    exact = frame.corr(method='spearman')
+    assert np.abs(acc.spearman() - exact).to_numpy().max() < 0.03
+
+
+def test_metric_statistics_labels(tables):
+    stats = metric_statistics()
+    for title, (name, labels) in METRIC_SETS.items():
+        assert list(stats[title]['pearson'].columns) == list(labels.values())
+        assert stats[title]['rows'] == stats[title]['sampled']
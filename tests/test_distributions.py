@@ -0,0 +1,77 @@
+"""Pre-binned histograms and box statistics against numpy on the raw rows"""
+
+import numpy as np
+import pytest
+
+from distributions import BoxSketch, QuantileDigest, box_stats, histogram, merge_histograms
+
+ROWS = 200_000  # 1M rows and figure payloads: benchmarks/distribution_stats.py
+PARTITIONS = 8
+QUANTILES = [0.001, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 0.999]
+KEYS = ['q1', 'median', 'q3', 'lowerfence', 'upperfence', 'outlier_count']
+
+
+def make_values(name, rows=ROWS, seed=0):
+    rng = np.random.default_rng(seed)
+    if name == 'age':
+        return rng.integers(18, 75, rows)
+    if name == 'income':
+        return rng.lognormal(11, 0.6, rows).round()
+    probability = rng.beta(2, 8, rows)
+    probability[rng.random(rows) < 0.02] = 1.0  # point mass, as in churn_probability
+    return probability
+
+
+@pytest.fixture(scope='module', params=['age', 'income', 'probability'])
+def values(request):
+    return make_values(request.param)
+
+
+def exact_box(values):
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {'q1': q1, 'median': median, 'q3': q3, 'lowerfence': inside.min(), 'upperfence': inside.max(),
+            'outlier_count': len(values) - len(inside)}
+
+
+def rank_error(sorted_values, estimates, quantiles):
+    """Largest |rank(estimate) - q| over the quantiles, as a share of rows"""
+    lo = np.searchsorted(sorted_values, estimates, side='left') / len(sorted_values)
+    hi = np.searchsorted(sorted_values, estimates, side='right') / len(sorted_values)
+    q = np.asarray(quantiles)
+    # inside a run of ties any rank in [lo, hi] is correct
+    return float(np.max(np.clip(lo - q, 0, None) + np.clip(q - hi, 0, None)))
+
+
+def test_histogram_matches_numpy(benchmark, values):
+    hist = benchmark(histogram, values, chunk_rows=30_000)
+    edges = np.r_[hist['left'].to_numpy(), hist['right'].to_numpy()[-1]]
+    reference = np.histogram(values, bins=edges)[0]
+    np.testing.assert_array_equal(hist['count'].to_numpy(), reference)
+    assert hist['count'].sum() == len(values)
+
+    merged = merge_histograms(*(histogram(part, edges=edges) for part in np.array_split(values, PARTITIONS)))
+    np.testing.assert_array_equal(merged['count'].to_numpy(), reference)
+
+
+def test_box_stats_match_exact(benchmark, values):
+    stats = benchmark(box_stats, values)
+    exact = exact_box(values.astype('float64'))
+    assert {key: stats[key] for key in KEYS} == exact
+
+
+def test_merged_sketches_stay_within_rank_error(benchmark, values):
+    def sketch():
+        digest, box = QuantileDigest(), BoxSketch()
+        for part in np.array_split(values, PARTITIONS):
+            digest.merge(QuantileDigest().update(part))
+            box.merge(BoxSketch().update(part))
+        return digest, box
+
+    digest, box = benchmark(sketch)
+    sorted_values = np.sort(values)
+    assert digest.count == len(values)
+    assert rank_error(sorted_values, digest.quantile(QUANTILES), QUANTILES) <= 0.005
+    stats = box.stats()
+    assert rank_error(sorted_values, [stats['q1'], stats['median'], stats['q3']], [0.25, 0.5, 0.75]) <= 0.005
@@ -0,0 +1,82 @@
+"""Map cells against a direct group-by of the raw points, and the bundled customer locations"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic
+from data_store import csv_path
+from geo_grid import GeoGrid, bounds_by, tile_xy
+
+ROWS = 20_000  # 1M-10M customers and map payloads: benchmarks/geo_grid.py
+REGIONS = ['North', 'South', 'East', 'West', 'Central']
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(0)
+    regions = np.asarray(REGIONS, dtype=object)[rng.integers(0, len(REGIONS), ROWS)]
+    tiers = np.asarray(['Tier 1', 'Tier 2', 'Tier 3'], dtype=object)[rng.integers(0, 3, ROWS)]
+    frame = synthetic.geocode(rng, np.arange(ROWS), regions, tiers)
+    frame['lifetime_value'] = rng.lognormal(9.5, 1.0, ROWS).round()
+    frame['satisfaction_score'] = np.where(rng.random(ROWS) < 0.01, np.nan, rng.normal(3.4, 0.55, ROWS).round(2))
+    return frame
+
+
+def make_grid(points, chunk_rows=1_000_000):
+    return GeoGrid(points, sums=('lifetime_value',), means=('satisfaction_score',), chunk_rows=chunk_rows)
+
+
+def reference(points, level):
+    """Direct group-by of the raw points at one level"""
+    x, y = tile_xy(points['latitude'], points['longitude'], level)
+    grouped = points.assign(x=x, y=y).groupby(['x', 'y'])
+    return pd.DataFrame({
+        'customers': grouped.size(),
+        'lifetime_value': grouped['lifetime_value'].sum(),
+        'satisfaction_score': grouped['satisfaction_score'].mean(),
+    })
+
+
+def test_every_level_matches_groupby(benchmark, points):
+    grid = benchmark(make_grid, points, chunk_rows=3_000)
+    for level in range(grid.min_level, grid.max_level + 1):
+        cells = grid.cells(level).set_index(['x', 'y']).sort_index()
+        expected = reference(points, level).sort_index()
+        pd.testing.assert_index_equal(cells.index, expected.index)
+        np.testing.assert_array_equal(cells['customers'].to_numpy(), expected['customers'].to_numpy())
+        np.testing.assert_allclose(cells['lifetime_value'], expected['lifetime_value'], rtol=1e-12)
+        np.testing.assert_allclose(cells['satisfaction_score'], expected['satisfaction_score'], rtol=1e-12)
+
+    totals = grid.totals()
+    assert totals['customers'] == ROWS
+    assert np.isclose(totals['lifetime_value'], points['lifetime_value'].sum())
+    assert np.isclose(totals['satisfaction_score'], points['satisfaction_score'].mean())
+
+
+def test_view_keeps_to_the_budget(points):
+    grid = make_grid(points)
+    state = tuple(bounds_by(points, 'state').loc['Maharashtra'])
+    level, cells = grid.view(state, level=grid.max_level, max_cells=200)
+    assert len(cells) <= 200 and level < grid.max_level
+    assert cells['latitude'].between(state[0], state[1]).all()
+    assert cells['longitude'].between(state[2], state[3]).all()
+
+
+def test_empty_points(points):
+    grid = make_grid(points.iloc[:0])
+    assert grid.cells(grid.min_level).empty
+    assert grid.totals()['customers'] == 0
+
+
+def test_bundled_locations_are_reproducible(tmp_path):
+    synthetic.geocode_file(csv_path('customers'), str(tmp_path))
+    with open(csv_path('customer_locations'), 'rb') as f:
+        assert (tmp_path / 'customer_locations.csv').read_bytes() == f.read()
+
+    locations = pd.read_csv(csv_path('customer_locations'))
+    customers = pd.read_csv(csv_path('customers'), usecols=['customer_id', 'region'])
+    merged = locations.merge(customers, on='customer_id', validate='one_to_one')
+    assert len(merged) == len(customers)
+    assert (merged['state'].map({state: spec[0] for state, spec in synthetic.STATES.items()})
+            == merged['region']).all()
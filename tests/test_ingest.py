@@ -0,0 +1,103 @@
+"""Incremental campaign ingestion: appended rows and delta files must match a full reload"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from data_store import csv_path
+from ingest import CATEGORICAL, COLUMNS, CampaignIngestor
+from rollup import DIMENSIONS, build_campaign_rollup
+
+BATCHES = 6  # larger files and poll vs reload timings: benchmarks/incremental_ingest.py
+
+
+def full_reload(path, drop_dir):
+    """Reference: parse the CSV and every delta file from scratch"""
+    frames = [pd.read_csv(path, usecols=COLUMNS, parse_dates=['date'])[COLUMNS]]
+    for name in sorted(os.listdir(drop_dir)):
+        frames.append(pd.read_csv(os.path.join(drop_dir, name), usecols=COLUMNS, parse_dates=['date'])[COLUMNS])
+    campaigns = pd.concat(frames, ignore_index=True)
+    return campaigns, build_campaign_rollup(campaigns)
+
+
+def assert_same(actual, expected, keys):
+    """Equal after sorting by keys, ignoring categorical vs plain dtypes"""
+    def normalized(df):
+        df = df.astype({c: object for c in CATEGORICAL})
+        return df.sort_values(keys, kind='stable').reset_index(drop=True)
+    pd.testing.assert_frame_equal(normalized(actual), normalized(expected), check_dtype=False)
+
+
+@pytest.fixture
+def source(tmp_path):
+    """The sample campaigns split into a starting file and batches still to arrive"""
+    rows = pd.read_csv(csv_path('campaigns')).sort_values('date', kind='stable')
+    split = int(len(rows) * 0.8)
+    path = tmp_path / 'campaign_performance.csv'
+    drop_dir = tmp_path / 'incoming'
+    drop_dir.mkdir()
+    rows.iloc[:split].to_csv(path, index=False)
+    rest = rows.iloc[split:]
+    return str(path), str(drop_dir), [rest.iloc[i::BATCHES] for i in range(BATCHES)]
+
+
+def test_polls_match_full_reload(benchmark, source):
+    path, drop_dir, batches = source
+    ingestor = CampaignIngestor(path, drop_dir=drop_dir, settle=0)
+    pending, added = list(enumerate(batches)), []
+
+    def deliver():
+        # even batches are appended to the CSV, odd ones written aside and renamed into the drop directory
+        i, batch = pending.pop(0)
+        if i % 2 == 0:
+            batch.to_csv(path, mode='a', header=False, index=False)
+        else:
+            target = os.path.join(drop_dir, f"delta_{i:03d}.csv")
+            batch.to_csv(target + '.tmp', index=False)
+            os.replace(target + '.tmp', target)
+
+    def poll():
+        added.append(ingestor.poll())
+
+    benchmark.pedantic(poll, setup=deliver, rounds=len(batches), iterations=1)
+    # with --benchmark-disable the fixture runs a single round
+    while pending:
+        deliver()
+        poll()
+
+    assert added == [len(batch) for batch in batches]
+    campaigns, rollup = full_reload(path, drop_dir)
+    assert_same(ingestor.campaigns, campaigns, COLUMNS)
+    assert_same(ingestor.rollup, rollup, DIMENSIONS)
+
+
+def test_unsettled_delta_file_waits(source):
+    path, drop_dir, batches = source
+    ingestor = CampaignIngestor(path, drop_dir=drop_dir, settle=60)
+    before = len(ingestor.campaigns)
+    # a producer still writing: a partial file (and a temp file) the ingestor must not read yet
+    partial = os.path.join(drop_dir, 'delta_000.csv')
+    with open(partial, 'w') as f:
+        f.write(batches[0].to_csv(index=False)[:500])
+    batches[1].to_csv(os.path.join(drop_dir, 'delta_001.csv.tmp'), index=False)
+    assert ingestor.poll() == 0
+    assert len(ingestor.campaigns) == before
+
+    # finished and left alone for the settle interval: read once, whole
+    batches[0].to_csv(partial, index=False)
+    old = os.path.getmtime(partial) - 120
+    os.utime(partial, (old, old))
+    assert ingestor.poll() == len(batches[0])
+    assert ingestor.poll() == 0
+
+
+def test_rewritten_file_reloads(source):
+    path, drop_dir, batches = source
+    ingestor = CampaignIngestor(path, drop_dir=drop_dir)
+    # a shorter file replacing the original is not an append: the state is rebuilt
+    pd.read_csv(path).iloc[:100].to_csv(path, index=False)
+    ingestor.poll()
+    campaigns, rollup = full_reload(path, drop_dir)
+    assert_same(ingestor.campaigns, campaigns, COLUMNS)
+    assert_same(ingestor.rollup, rollup, DIMENSIONS)
@@ -0,0 +1,61 @@
+"""Lead model: held-out evaluation rows, and chunked or parallel scoring against the fitted pipeline"""
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+from sklearn.metrics import roc_auc_score
+
+import data_store
+import synthetic
+from data_store import load_table
+from lead_model import FEATURES, HOLDOUT, TARGET, LeadModel, score_table
+from schema import apply_schema
+
+SCALE = 5  # 10k leads (1M+ leads and throughput: benchmarks/lead_scoring.py)
+
+
+@pytest.fixture(scope='module')
+def leads():
+    leads = apply_schema('leads', synthetic.make_frame('leads', SCALE))
+    # unlabelled leads are scored but never trained or evaluated on
+    leads.loc[leads.index[::50], TARGET] = np.nan
+    return leads
+
+
+@pytest.fixture(scope='module')
+def model(leads):
+    return LeadModel.fit(leads, curve_rows=2_000)
+
+
+def test_holdout_is_labelled_and_kept_out_of_training(leads, model):
+    labelled = leads[TARGET].notna().to_numpy()
+    assert labelled[model.holdout].all()
+    assert len(model.holdout) == model.summary['holdout_rows'] == round(labelled.sum() * HOLDOUT)
+    assert model.summary['train_rows'] == labelled.sum() - len(model.holdout)
+
+    # the reported AUC is the AUC of the scores the page shows for the held-out leads
+    held_out = model.score(leads.iloc[model.holdout])
+    assert np.isclose(roc_auc_score(held_out[TARGET], held_out['predicted_probability']),
+                      model.summary['holdout_auc'])
+
+
+def test_chunked_scores_match_pipeline(benchmark, leads, model):
+    expected = model.pipeline.predict_proba(leads[FEATURES])[:, 1]
+    scores = benchmark(model.predict_proba, leads, chunk_rows=1_500)
+    np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_score_table_keeps_lead_order(benchmark, data_dir, model, workers):
+    synthetic.write_all(str(data_dir), scale=SCALE, tables=['leads'])
+    path = data_store.convert('leads')
+    # small row groups, so the workers share the file out
+    pq.write_table(pq.read_table(path), path, row_group_size=2_000)
+    model_file = str(data_dir / 'lead_model.joblib')
+    model.save(model_file)
+
+    leads = load_table('leads', ['lead_id'] + FEATURES)
+    scores = benchmark(score_table, model_file, workers=workers, chunk_rows=1_500)
+    np.testing.assert_array_equal(scores['lead_id'].to_numpy(), leads['lead_id'].to_numpy())
+    np.testing.assert_allclose(scores['predicted_probability'].to_numpy(), model.predict_proba(leads),
+                               rtol=0, atol=1e-12)
@@ -0,0 +1,55 @@
+"""Threshold sweep against scikit-learn: confusion matrices, ROC, precision-recall and AUC"""
+
+import numpy as np
+import pytest
+from sklearn.metrics import auc, confusion_matrix, precision_recall_curve, roc_curve
+
+import model_metrics
+
+ROWS = 100_000  # 1M rows and per-rerun timings: benchmarks/threshold_sweep.py
+
+
+@pytest.fixture(scope='module')
+def leads():
+    """Labels and 4-decimal probabilities correlated with them"""
+    rng = np.random.default_rng(0)
+    y = rng.random(ROWS) < 0.35
+    score = np.clip(rng.normal(0.35 + 0.3 * y, 0.2), 0, 1).round(4)
+    return y.astype(int), score
+
+
+@pytest.fixture(scope='module')
+def table(leads):
+    return model_metrics.threshold_table(*leads)
+
+
+def test_threshold_table(benchmark, leads):
+    table = benchmark(model_metrics.threshold_table, *leads)
+    assert table.attrs['positives'] + table.attrs['negatives'] == ROWS
+
+
+@pytest.mark.parametrize('threshold', [0.0, 0.1, 0.37, 0.5, 0.9, 1.0])
+def test_confusion_matches_sklearn(leads, table, threshold):
+    y, score = leads
+    expected = confusion_matrix(y, (score >= threshold).astype(int), labels=[0, 1])
+    assert (model_metrics.confusion(model_metrics.metrics_at(table, threshold)) == expected).all()
+
+
+def test_lookup(benchmark, table):
+    metrics = benchmark(model_metrics.metrics_at, table, 0.5)
+    assert 0 <= metrics['accuracy'] <= 1
+
+
+def test_roc_matches_sklearn(leads, table):
+    y, score = leads
+    fpr, tpr, _ = roc_curve(y, score, drop_intermediate=False)
+    ours_fpr, ours_tpr = model_metrics.roc_points(table)
+    assert np.allclose(ours_fpr, fpr) and np.allclose(ours_tpr, tpr)
+    assert abs(model_metrics.roc_auc(table) - auc(fpr, tpr)) < 1e-9
+
+
+def test_precision_recall_matches_sklearn(leads, table):
+    y, score = leads
+    precision, recall, _ = precision_recall_curve(y, score)
+    ours_p, ours_r = model_metrics.pr_points(table)
+    assert np.allclose(ours_p[::-1], precision[:-1]) and np.allclose(ours_r[::-1], recall[:-1])
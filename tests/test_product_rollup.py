@@ -0,0 +1,83 @@
+"""Product cube levels, top-N and treemap nodes against a pandas group-by of the rows"""
+
+import numpy as np
+import pytest
+
+import synthetic
+from analytics import top_products
+from product_rollup import LEVELS, MEASURES, ProductRollup
+
+SCALE = 7  # ~10k rows and 250 products (1M+ rows and treemap payloads: benchmarks/product_rollup.py)
+FILTERS = [
+    (None, None),
+    (['North', 'West'], None),
+    (None, ['Q1 2023', 'Q4 2024']),
+    (['South'], ['Q2 2024']),
+]
+
+
+@pytest.fixture(scope='module')
+def products():
+    return synthetic.make_frame('products', SCALE)
+
+
+@pytest.fixture(scope='module')
+def rollup(products):
+    return ProductRollup(products)
+
+
+def reference(products, level, regions=None, quarters=None):
+    """Measures per node of a level from the raw rows"""
+    rows = products
+    if regions is not None:
+        rows = rows[rows['region'].isin(regions)]
+    if quarters is not None:
+        rows = rows[rows['quarter'].isin(quarters)]
+    return rows.groupby(LEVELS[:LEVELS.index(level) + 1], observed=True)[MEASURES].sum()
+
+
+@pytest.mark.parametrize('regions,quarters', FILTERS)
+@pytest.mark.parametrize('level', LEVELS)
+def test_levels_match_groupby(benchmark, products, rollup, level, regions, quarters):
+    nodes = benchmark(rollup.by, level, regions, quarters).set_index(LEVELS[:LEVELS.index(level) + 1])
+    expected = reference(products, level, regions, quarters)
+    # every product sells in every region and quarter, so no node of the cube is empty
+    assert len(nodes) == len(expected)
+    nodes = nodes.loc[expected.index]
+    np.testing.assert_allclose(nodes[MEASURES].to_numpy('float64'), expected.to_numpy('float64'), rtol=1e-9)
+    np.testing.assert_allclose(nodes['profit_margin'], expected['profit'] / expected['sales'] * 100, rtol=1e-9)
+
+
+@pytest.mark.parametrize('regions,quarters', FILTERS)
+def test_top_products(products, rollup, regions, quarters):
+    top = rollup.top('product_name', 10, regions=regions, quarters=quarters)
+    expected = reference(products, 'product_name', regions, quarters)['sales'].nlargest(10)
+    np.testing.assert_allclose(top['sales'].to_numpy(), expected.to_numpy(), rtol=1e-9)
+    assert list(top.set_index(LEVELS).index) == [tuple(map(str, key)) for key in expected.index]
+
+
+def test_top_product_labels_are_unique(rollup):
+    # "Footwear" is both a Men's and a Women's product: one bar each
+    top = top_products(rollup, len(rollup.leaves))
+    assert top['product_name'].duplicated().any()
+    assert top['product'].is_unique
+    assert {'Footwear (Men)', 'Footwear (Women)'} <= set(top['product'])
+
+
+def test_by_quarter(products, rollup):
+    quarters = rollup.by_quarter(['East']).set_index('quarter')
+    expected = products[products['region'] == 'East'].groupby('quarter')['sales'].sum()
+    np.testing.assert_allclose(quarters.loc[expected.index, 'sales'], expected, rtol=1e-9)
+    assert rollup.quarters == synthetic.QUARTER_LABELS
+
+
+def test_hierarchy_sums_to_its_parents(rollup):
+    nodes = rollup.hierarchy(3).set_index('id')
+    every = rollup.hierarchy(len(rollup.leaves)).set_index('id')
+    assert nodes.index.is_unique
+    children = nodes[nodes['parent'] != ''].groupby('parent')['sales'].sum()
+    np.testing.assert_allclose(children, nodes.loc[children.index, 'sales'], rtol=1e-9)
+    assert np.isclose(nodes.loc[nodes['parent'] == '', 'sales'].sum(), rollup.cube[0].sum())
+    # product names repeat across subcategories, so leaves are keyed by their full path
+    assert every.index.is_unique
+    assert 'Fashion/Men/Footwear' in every.index and 'Fashion/Women/Footwear' in every.index
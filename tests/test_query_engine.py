@@ -0,0 +1,55 @@
+"""Out-of-core query engines: every query must return what the pandas engine returns"""
+
+import math
+
+import pandas as pd
+import pytest
+
+import data_store
+import query_engine
+import synthetic
+
+ENGINES = {'duckdb': query_engine.HAS_DUCKDB, 'polars': query_engine.HAS_POLARS}
+SCALE = 2  # ~12k campaign rows and 10k customers (peak RSS and latency at scale: benchmarks/query_engines.py)
+
+
+def assert_same(expected, actual):
+    """Identical frames; floats (alone or inside dicts and tuples) to 1e-6 relative"""
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(expected, actual)
+    elif isinstance(expected, (tuple, list)):
+        assert len(expected) == len(actual)
+        for e, a in zip(expected, actual):
+            assert_same(e, a)
+    elif isinstance(expected, dict):
+        assert expected.keys() == actual.keys()
+        for key in expected:
+            assert_same(expected[key], actual[key])
+    elif isinstance(expected, float) or isinstance(actual, float):
+        assert (math.isnan(expected) and math.isnan(actual)) or math.isclose(expected, actual, rel_tol=1e-6)
+    else:
+        assert expected == actual
+
+
+@pytest.fixture(params=['parquet', 'csv'])
+def source(request, data_dir):
+    """Synthetic campaigns and customers, read from fresh Parquet files or (with none) the CSVs"""
+    synthetic.write_all(str(data_dir), scale=SCALE, tables=['campaigns', 'customers'])
+    if request.param == 'parquet':
+        for name in ('campaigns', 'customers'):
+            data_store.convert(name)
+    return request.param
+
+
+@pytest.mark.parametrize('query', query_engine.QUERIES)
+@pytest.mark.parametrize('engine', list(ENGINES))
+def test_engine_matches_pandas(benchmark, source, engine, query):
+    if not ENGINES[engine]:
+        pytest.skip(f"{engine} is not installed")
+    expected = getattr(query_engine.get_engine('pandas', backend=source), query)()
+    actual = benchmark(getattr(query_engine.get_engine(engine), query))
+    assert_same(expected, actual)
+
+
+def test_engines_read_the_fresh_file(source):
+    assert query_engine.source_file('campaigns').endswith(source)
@@ -0,0 +1,36 @@
+"""Synthetic datasets: a seed gives the same files whatever the chunk size or the list of tables"""
+
+import pandas as pd
+import pytest
+
+import synthetic
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # several random-stream blocks per table at a small scale (a multiple of the 40 rows per product)
+    monkeypatch.setattr(synthetic, 'BLOCK_ROWS', 2_000)
+
+
+@pytest.mark.parametrize('name', list(synthetic.CHUNKED))
+def test_same_seed_same_file_for_any_chunk_size(benchmark, tmp_path, small_blocks, name):
+    small, large = tmp_path / 'small', tmp_path / 'large'
+    small.mkdir()
+    large.mkdir()
+    rows = synthetic.write_table(name, str(small), scale=2, seed=7, chunk_rows=700)
+    assert rows == int(synthetic.BASE_ROWS[name] * 2)
+    benchmark.pedantic(synthetic.write_table, args=(name, str(large)), kwargs=dict(scale=2, seed=7, chunk_rows=4_000),
+                       rounds=1, iterations=1)
+    file = synthetic.DATASETS[name]['file']
+    assert (small / file).read_bytes() == (large / file).read_bytes()
+
+
+def test_streams_do_not_depend_on_table_order(monkeypatch):
+    expected = {name: synthetic.make_frame(name, seed=3) for name in ('leads', 'funnel')}
+    monkeypatch.setattr(synthetic, 'TABLES', ['funnel', 'leads'])
+    for name, frame in expected.items():
+        pd.testing.assert_frame_equal(synthetic.make_frame(name, seed=3), frame)
+
+
+def test_seeds_differ():
+    assert not synthetic.make_frame('leads', seed=1).equals(synthetic.make_frame('leads', seed=2))
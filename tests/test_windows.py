@@ -0,0 +1,79 @@
+"""Window KPIs from prefix sums against a pandas groupby over the same rollup rows"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic
+from analytics.campaigns import cohort_comparison, period_comparison
+from rollup import MEASURES, build_campaign_rollup, totals
+from schema import apply_schema
+from windows import KPIS, WindowIndex
+
+# (start, end) windows, the last two reaching past either end of the 2023-2024 history
+WINDOWS = [(date(2024, 3, 1), date(2024, 3, 1)), (date(2023, 6, 10), date(2023, 9, 7)),
+           (date(2024, 1, 1), date(2024, 12, 31)), (date(2022, 12, 1), date(2023, 1, 15)),
+           (date(2024, 12, 20), date(2025, 1, 10))]
+
+
+@pytest.fixture(scope='module')
+def rollup():
+    # 12k campaign rows (200 years of history and scan vs lookup timings: benchmarks/window_queries.py)
+    return build_campaign_rollup(apply_schema('campaigns', synthetic.make_frame('campaigns', 2)))
+
+
+def rows_in(rollup, start, end):
+    return rollup[(rollup['date'] >= pd.Timestamp(start)) & (rollup['date'] <= pd.Timestamp(end))]
+
+
+def test_window_sums_match_groupby(benchmark, rollup):
+    index, cohorts = WindowIndex(rollup), WindowIndex(rollup, by='channel')
+    for start, end in WINDOWS:
+        rows = rows_in(rollup, start, end)
+        np.testing.assert_allclose(index.sums(start, end)[0], rows[MEASURES].sum().to_numpy('float64'))
+        expected = rows.groupby('channel', observed=False)[MEASURES].sum().loc[cohorts.groups]
+        window = cohorts.window(start, end).set_index('channel')
+        np.testing.assert_allclose(window[MEASURES].to_numpy(), expected.to_numpy('float64'))
+    benchmark(index.kpis, *WINDOWS[2])
+
+
+def test_compare_matches_prior_window(benchmark, rollup):
+    index = WindowIndex(rollup)
+    start, end = date(2024, 4, 1), date(2024, 6, 29)
+    table = benchmark(index.compare, start, end).set_index('kpi')
+    current = totals(rows_in(rollup, start, end))
+    previous = totals(rows_in(rollup, date(2024, 1, 2), date(2024, 3, 31)))
+    np.testing.assert_allclose(table.loc[KPIS, 'current'], [current[k] for k in KPIS])
+    np.testing.assert_allclose(table.loc[KPIS, 'previous'], [previous[k] for k in KPIS])
+    np.testing.assert_allclose(table.loc['revenue', 'change'],
+                               (current['revenue'] - previous['revenue']) / previous['revenue'] * 100)
+
+    # a prior window starting before the history has nothing to compare with
+    assert index.compare(date(2023, 1, 1), date(2023, 1, 31))['previous'].isna().all()
+
+
+def test_rolling_matches_pandas(rollup):
+    index = WindowIndex(rollup)
+    daily = rollup.groupby('date')[MEASURES].sum().asfreq('D', fill_value=0)
+    for days in (7, 28):
+        expected = daily.rolling(days).sum().dropna()
+        rolling = index.rolling(days).set_index('date')
+        np.testing.assert_allclose(rolling[MEASURES].to_numpy(), expected[MEASURES].to_numpy('float64'))
+
+
+@pytest.mark.parametrize('by', [None, 'channel'])
+def test_empty_rollup(rollup, by):
+    index = WindowIndex(rollup.iloc[:0], by=by)
+    assert index.empty
+    assert index.last_days(7) is None
+    assert index.compare(None, None)[['current', 'previous', 'change']].isna().all().all()
+    assert not index.window(date(2024, 1, 1), date(2024, 1, 31))[MEASURES].to_numpy().any()
+    assert index.rolling(7).empty
+    if by is None:
+        comparison = period_comparison(index, 28)
+        assert all(np.isnan(comparison[kpi]['current']) for kpi in KPIS)
+        assert np.isnan(period_comparison(index)['revenue']['current'])
+    else:
+        assert cohort_comparison(index, 28).empty
@@ -0,0 +1,149 @@
+"""
+NovaMart Windows
+=============================================
+Period-over-period campaign KPIs from prefix sums.
+
+The campaign rollup is summed once per calendar day (days without rows
+count as zero) and every measure becomes a running total with a leading
+zero, so the sum over any window [start, end] is
+``prefix[end + 1] - prefix[start]``: two lookups, however long the
+history. Ratios (CTR, CVR, ROAS) are recomputed from the window sums,
+never averaged.
+
+With ``by`` (e.g. channel) there is one prefix array per value, so each
+cohort's window is two lookups as well. Rolling 7/28-day series are one
+vectorized subtraction of the prefix array from itself.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from rollup import MEASURES, add_ratios, ratio
+
+# Comparison windows offered on the Executive Overview (days, ending on the latest date)
+PERIODS = {'Last 7 days': 7, 'Last 28 days': 28, 'Last 90 days': 90, 'Last 365 days': 365}
+KPIS = MEASURES + ['CTR', 'CVR', 'ROAS']
+
+
+def _day(value):
+    return np.datetime64(value, 'D')
+
+
+class WindowIndex:
+    """Daily prefix sums of the campaign measures, overall or per value of one dimension"""
+
+    def __init__(self, rollup, by=None):
+        days = rollup['date'].to_numpy().astype('datetime64[D]')
+        self.by = by
+        if len(days) == 0:
+            # nothing ingested (or filtered out): every window sums to zero and has nothing before it
+            self.first = self.last = None
+            self.groups = [None] if by is None else []
+            self.prefix = np.zeros((len(self.groups), 1, len(MEASURES)))
+            return
+        self.first, self.last = days.min(), days.max()
+        n = int((self.last - self.first).astype('int64')) + 1
+        position = (days - self.first).astype('int64')
+        if by is None:
+            codes, self.groups = np.zeros(len(days), dtype='int64'), [None]
+        else:
+            codes, uniques = pd.factorize(rollup[by], sort=True)
+            self.groups = list(uniques)
+        cell = codes * n + position
+        daily = np.stack([
+            np.bincount(cell, weights=rollup[m].to_numpy('float64'), minlength=len(self.groups) * n)
+            .reshape(len(self.groups), n)
+            for m in MEASURES
+        ], axis=-1)
+        # prefix[g, d] = sum of the days before d, so prefix[g, 0] is zero
+        self.prefix = np.concatenate([np.zeros((len(self.groups), 1, len(MEASURES))), np.cumsum(daily, axis=1)], axis=1)
+
+    @property
+    def days(self):
+        return self.prefix.shape[1] - 1
+
+    @property
+    def empty(self):
+        """True when the rollup had no rows"""
+        return self.first is None
+
+    def _position(self, day):
+        """Index into the prefix array of a calendar day (clipped to the history)"""
+        return int(np.clip((_day(day) - self.first).astype('int64'), 0, self.days))
+
+    def covers(self, start, end):
+        """True when the whole window lies inside the history"""
+        return self.first is not None and _day(start) >= self.first and _day(end) <= self.last
+
+    def sums(self, start, end):
+        """Measure sums (groups x measures) over the inclusive calendar window"""
+        if self.first is None or _day(end) < _day(start):
+            return np.zeros((len(self.groups), len(MEASURES)))
+        lo = self._position(start)
+        hi = self._position(_day(end) + 1)
+        return self.prefix[:, hi] - self.prefix[:, lo]
+
+    def kpis(self, start, end):
+        """Measures then ratios (groups x KPIS) over the inclusive calendar window"""
+        sums = self.sums(start, end)
+        impressions, clicks, conversions, spend, revenue = (sums[:, MEASURES.index(m)] for m in (
+            'impressions', 'clicks', 'conversions', 'spend', 'revenue'))
+        ratios = np.column_stack([ratio(clicks, impressions) * 100, ratio(conversions, clicks) * 100,
+                                  ratio(revenue, spend)])
+        return np.hstack([sums, ratios])
+
+    def window(self, start, end):
+        """Measures and ratios over a window (one row per group when indexed by a dimension)"""
+        frame = pd.DataFrame(self.kpis(start, end), columns=KPIS)
+        if self.by is not None:
+            frame.insert(0, self.by, self.groups)
+        return frame
+
+    def last_days(self, days, end=None):
+        """(start, end) of the `days`-day window ending on `end` (default: the latest date); None when empty"""
+        if end is None and self.empty:
+            return None
+        end = self.last if end is None else _day(end)
+        return (end - (days - 1)).astype(object), end.astype(object)
+
+    def compare(self, start, end):
+        """KPIs of a window next to the prior window of equal length: columns current, previous, change (%)"""
+        if self.empty or start is None or end is None:
+            # no rows (or no window): NaN throughout, so the page shows "no data" rather than zeros
+            current = np.full((len(self.groups), len(KPIS)), np.nan)
+            previous = current.copy()
+        else:
+            start, end = _day(start), _day(end)
+            length = (end - start).astype('int64') + 1
+            prior_start, prior_end = start - length, start - 1
+            current = self.kpis(start, end)
+            previous = self.kpis(prior_start, prior_end)
+            if not self.covers(prior_start, prior_end):
+                # part of the prior window is before the history starts: nothing to compare with
+                previous[:] = np.nan
+        change = np.full(current.shape, np.nan)
+        np.divide(current - previous, np.abs(previous), out=change, where=np.isfinite(previous) & (previous != 0))
+        frame = pd.DataFrame({
+            'kpi': np.tile(KPIS, len(self.groups)),
+            'current': current.ravel(), 'previous': previous.ravel(), 'change': change.ravel() * 100,
+        })
+        if self.by is not None:
+            frame.insert(0, self.by, np.repeat(np.asarray(self.groups, dtype=object), len(KPIS)))
+        return frame
+
+    def rolling(self, days):
+        """Trailing `days`-day measures and ratios for every date with a full window behind it"""
+        if self.days < days:
+            return add_ratios(pd.DataFrame(columns=['date'] + MEASURES))
+        sums = self.prefix[:, days:] - self.prefix[:, :-days]
+        dates = pd.date_range(pd.Timestamp(self.first) + timedelta(days=days - 1), periods=sums.shape[1], freq='D')
+        frames = []
+        for i, group in enumerate(self.groups):
+            frame = pd.DataFrame(sums[i], columns=MEASURES)
+            frame.insert(0, 'date', dates)
+            if self.by is not None:
+                frame.insert(0, self.by, group)
+            frames.append(frame)
+        return add_ratios(pd.concat(frames, ignore_index=True))